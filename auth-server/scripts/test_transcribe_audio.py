@@ -0,0 +1,24 @@
+from transcribe_audio import merge_overlap, plan_chunks, stitch_chunks
+
+
+def test_plan_chunks_covers_the_whole_recording() -> None:
+    assert plan_chunks(100, 300) == [(0.0, 100)]
+    assert plan_chunks(301, 300) == [(0.0, 301)]
+    assert plan_chunks(600, 300) == [(0.0, 300.0), (298.0, 600)]
+    chunks = plan_chunks(1000, 300)
+    assert chunks[-1][1] == 1000
+    assert all(prev[1] - cur[0] == 2.0 for prev, cur in zip(chunks, chunks[1:]))
+
+
+def test_merge_overlap_drops_repeated_words() -> None:
+    assert merge_overlap("ram naam satya hai", "Satya hai, jai ho") == "jai ho"
+    assert merge_overlap("om shanti", "hari om tat sat") == "hari om tat sat"
+
+
+def test_stitch_chunks_in_order() -> None:
+    chunks = [(0.0, 300.0), (298.0, 600)]
+    transcript = stitch_chunks(chunks, ["jai shri ram sita ram", "sita ram bolo"])
+
+    assert "[Chunk 1 0.0-300.0s]\njai shri ram sita ram" in transcript
+    assert "[Chunk 2 298.0-600.0s]\nbolo" in transcript
+    assert "[Chunk 2" not in stitch_chunks(chunks, ["jai shri ram", None])
@@ -0,0 +1,9 @@
+from transcribe_daemon import job_workers
+
+
+def test_jobs_use_the_pool_at_its_size() -> None:
+    assert job_workers(None, 4) == 4
+    assert job_workers(2, 4) == 4
+    assert job_workers(8, 4) == 4
+    assert job_workers(1, 4) == 1
+    assert job_workers(None, 1) == 1
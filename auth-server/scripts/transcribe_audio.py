@@ -2,15 +2,29 @@
 """
 Transcribe audio file (MP3/OGG/WAV) from URL using Whisper.
 Returns JSON with transcript formatted as conversation.
+
+Jobs go to the transcription daemon (transcribe_daemon.py) when it is
+running, so the Whisper model is not loaded again for every request; pass
+--no-daemon (or run without a daemon) to transcribe in this process.
+
+Long recordings are cut into overlapping chunks whose boundaries are
+planned up front; with --workers N the chunks are transcribed in parallel
+on a pool of N processes (one loaded model each) and stitched back in
+order. --benchmark reports the real-time factor for 1, 2, 4 and N workers.
 """
 import argparse
 import json
 import logging
+import multiprocessing
 import os
+import shutil
+import socket
 import subprocess
 import sys
 import tempfile
-import requests
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from pathlib import Path
 
@@ -22,171 +36,334 @@ logging.basicConfig(
 )
 logger = logging.getLogger("transcribe_audio")
 
-# Try to import Whisper (supports both openai-whisper and whisper.cpp)
-try:
-    import whisper
-    WHISPER_TYPE = "openai-whisper"
-    logger.info("Using openai-whisper library")
-except ImportError:
-    try:
-        # Try whisper-cpp-py or similar bindings
-        import whisper_cpp
-        WHISPER_TYPE = "whisper-cpp"
-        logger.info("Using whisper-cpp bindings")
-    except ImportError:
-        WHISPER_TYPE = None
-        logger.warning("Whisper not found. Install: pip install openai-whisper")
+# Use 'base' for faster processing, 'large-v3' for best quality
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+DAEMON_SOCKET = os.getenv("TRANSCRIBE_DAEMON_SOCKET", "/tmp/transcribe_daemon.sock")
+# Processes transcribing chunks of one recording in parallel, one model each
+TRANSCRIBE_WORKERS = int(os.getenv("TRANSCRIBE_WORKERS", "1"))
+CHUNK_OVERLAP = 2.0
+
+# Loaded models, so chunks of one recording (and daemon jobs) share one load
+_models = {}
+
+
+def load_whisper_model(model_name: str = None):
+    """Load a Whisper model once per process."""
+    model_name = model_name or WHISPER_MODEL
+    if model_name not in _models:
+        # Imported lazily: torch takes seconds to import, which a daemon client never needs
+        try:
+            import whisper
+        except ImportError:
+            raise ImportError("Whisper not installed. Install with: pip install openai-whisper")
+        logger.info(f"Loading Whisper model '{model_name}' (this may take a moment)...")
+        _models[model_name] = whisper.load_model(model_name)
+    return _models[model_name]
+
 
 def transcribe_with_whisper(audio_path: str, language: str = "hi") -> str:
     """Transcribe audio using Whisper."""
-    if WHISPER_TYPE is None:
-        raise ImportError("Whisper not installed. Install with: pip install openai-whisper")
+    model = load_whisper_model()
+    logger.info(f"Transcribing {audio_path}...")
+    result = model.transcribe(audio_path, language=language)
+    return result["text"].strip()
+
+
+def transcribe_via_daemon(
+    audio_url: str,
+    chunk_duration: int = 300,
+    language: str = "hi",
+    workers: int = None,
+    socket_path: str = DAEMON_SOCKET,
+    timeout: float = 30 * 60,
+):
+    """
+    Run a job on the transcription daemon.
+    Returns the daemon's result dict, or None if no daemon could serve it.
+    """
+    if not os.path.exists(socket_path):
+        return None
+    request = {"audio_url": audio_url, "chunk_duration": chunk_duration, "language": language}
+    if workers:
+        # Otherwise the daemon's own --workers applies
+        request["workers"] = workers
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(5)
+            sock.connect(socket_path)
+            # Jobs wait in line behind the daemon's current one
+            sock.settimeout(timeout)
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+        if not line:
+            raise ConnectionError("daemon closed the connection")
+        logger.info(f"🛰️ Transcribed by daemon at {socket_path}")
+        return json.loads(line)
+    except Exception as e:
+        logger.warning(f"⚠️ Transcription daemon unavailable ({e}), transcribing in-process")
+        return None
+
+
+def plan_chunks(total_duration: float, chunk_duration: float, overlap: float = CHUNK_OVERLAP) -> list:
+    """
+    (start, end) boundaries of all chunks, decided up front from the total duration.
+    Consecutive chunks share `overlap` seconds so no word is cut at a boundary.
+    A remainder of at most `overlap` seconds is added to the last chunk
+    rather than becoming a chunk of its own.
+    """
+    chunks = []
+    start = 0.0
+    while True:
+        end = start + chunk_duration
+        if total_duration - end <= overlap:
+            end = total_duration
+        chunks.append((start, end))
+        if end >= total_duration:
+            break
+        start = end - overlap
+    return chunks
+
+
+def _words(text: str) -> list:
+    return [w.strip(".,;:!?।॥\"'()").lower() for w in text.split()]
+
+
+def merge_overlap(previous: str, current: str, max_words: int = 30, min_words: int = 2) -> str:
+    """
+    Drop the start of `current` that repeats the end of `previous`: the
+    audio overlap between chunks is transcribed twice.
+    """
+    prev_words = _words(previous)[-max_words:]
+    tokens = current.split()
+    cur_words = _words(current)[:max_words]
+    for k in range(min(len(prev_words), len(cur_words)), min_words - 1, -1):
+        if prev_words[-k:] == cur_words[:k]:
+            return " ".join(tokens[k:])
+    return current
+
+
+def stitch_chunks(chunks: list, texts: list) -> str:
+    """Join chunk transcripts in order, with chunk markers and overlap removed."""
+    transcript = ""
+    previous = ""
+    for index, ((start, end), text) in enumerate(zip(chunks, texts)):
+        if text is None:
+            continue
+        text = merge_overlap(previous, text.strip()) if previous else text.strip()
+        transcript += f"\n[Chunk {index+1} {start:.1f}-{end:.1f}s]\n{text}\n"
+        previous = text or previous
+    return transcript
+
+
+def extract_chunk(wav_path: str, start: float, end: float, chunk_file: str):
+    subprocess.run([
+        'ffmpeg', '-ss', f"{start}", '-to', f"{end}",
+        '-i', wav_path,
+        '-acodec', 'pcm_s16le', '-ar', '16000', '-ac', '1',
+        '-avoid_negative_ts', 'make_zero', '-y', chunk_file
+    ], capture_output=True, text=True, timeout=600, check=True)
+
+
+def _transcribe_chunk(wav_path: str, start: float, end: float, chunk_file: str, language: str):
+    """Cut one chunk and transcribe it. Runs in the calling process or a pool worker."""
+    extract_chunk(wav_path, start, end, chunk_file)
+    try:
+        return transcribe_with_whisper(chunk_file, language=language)
+    finally:
+        if os.path.exists(chunk_file):
+            os.unlink(chunk_file)
+
+
+def _init_worker(model_name: str, torch_threads: int):
+    """Pool worker start-up: split the cores between workers and load the model once."""
+    global WHISPER_MODEL
+    WHISPER_MODEL = model_name
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    load_whisper_model(model_name)
+
+
+# Pool kept across jobs in the daemon, so worker models stay loaded
+_pool = None
+_pool_workers = 0
+
+
+def get_worker_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        shutdown_worker_pool()
+        torch_threads = max(1, (os.cpu_count() or 1) // workers)
+        logger.info(f"🧵 Starting {workers} transcription workers ({torch_threads} threads each, model '{WHISPER_MODEL}')")
+        # spawn: forking a process that already holds torch state can deadlock
+        _pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(WHISPER_MODEL, torch_threads),
+        )
+        _pool_workers = workers
+    return _pool
+
+
+def shutdown_worker_pool():
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+    _pool, _pool_workers = None, 0
+
+
+def download_audio(audio_url: str) -> str:
+    """Download audio and convert it to 16 kHz mono WAV. Returns the WAV path."""
+    import requests
+
+    logger.info(f"📥 Downloading audio from: {audio_url}")
+    response = requests.get(audio_url, timeout=600, stream=True)
+    if response.status_code != 200:
+        raise Exception(f"Failed to download audio: HTTP {response.status_code}")
+    
+    # Determine file extension from URL or content-type
+    ext = '.mp3'
+    if '.ogg' in audio_url.lower() or audio_url.lower().endswith('.ogg'):
+        ext = '.ogg'
+    elif '.wav' in audio_url.lower() or audio_url.lower().endswith('.wav'):
+        ext = '.wav'
+    elif '.mp4' in audio_url.lower() or audio_url.lower().endswith('.mp4'):
+        ext = '.mp4'
     
-    if WHISPER_TYPE == "openai-whisper":
-        logger.info(f"Loading Whisper model (this may take a moment)...")
-        model = whisper.load_model("base")  # Use 'base' for faster processing, 'large-v3' for best quality
-        logger.info(f"Transcribing {audio_path}...")
-        result = model.transcribe(audio_path, language=language)
-        return result["text"].strip()
+    with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as temp_audio:
+        for chunk in response.iter_content(chunk_size=8192):
+            temp_audio.write(chunk)
+        temp_audio_path = temp_audio.name
+    
+    logger.info(f"✅ Downloaded to: {temp_audio_path}")
+    
+    # Convert to WAV if needed (Whisper works best with WAV)
+    if ext == '.wav':
+        return temp_audio_path
+    wav_path = temp_audio_path.replace(ext, '.wav')
+    logger.info(f"🔄 Converting {ext} to WAV...")
+    try:
+        subprocess.run([
+            'ffmpeg', '-i', temp_audio_path,
+            '-vn', '-acodec', 'pcm_s16le', '-ar', '16000', '-ac', '1',
+            '-y', wav_path
+        ], capture_output=True, text=True, timeout=600, check=True)
+    finally:
+        # Clean up original file
+        if os.path.exists(temp_audio_path):
+            os.unlink(temp_audio_path)
+    return wav_path
+
+
+def probe_duration(path: str) -> float:
+    result = subprocess.run([
+        'ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+        '-of', 'default=noprint_wrappers=1:nokey=1', path
+    ], capture_output=True, text=True, timeout=30)
+    return float(result.stdout.strip()) if result.returncode == 0 else 0
+
+
+def transcribe_wav(wav_path: str, chunk_duration: int = 300, language: str = "hi", workers: int = 1) -> dict:
+    """
+    Transcribe a local WAV file, chunked if long, on `workers` processes.
+    Returns transcript, duration, chunk count, workers and real-time factor.
+    """
+    started = time.monotonic()
+    total_duration = probe_duration(wav_path)
+    logger.info(f"🎧 Audio total duration: {total_duration:.2f}s")
+    
+    chunks = plan_chunks(total_duration, min(chunk_duration, 300))
+    # The pool keeps its size even when there are fewer chunks: resizing it would reload every model
+    pool_size = max(1, workers)
+    workers = min(pool_size, len(chunks))
+    
+    if len(chunks) == 1:
+        # Short audio - transcribe directly
+        logger.info(f"📝 Transcribing entire audio (no chunking needed)...")
+        transcript = transcribe_with_whisper(wav_path, language=language)
     else:
-        raise NotImplementedError(f"Whisper type {WHISPER_TYPE} not yet implemented")
+        logger.info(f"🔪 Transcribing {len(chunks)} chunks of up to {min(chunk_duration, 300)}s on {workers} worker(s)...")
+        temp_dir = tempfile.mkdtemp()
+        texts = [None] * len(chunks)
+        try:
+            jobs = [
+                (wav_path, start, end, os.path.join(temp_dir, f"chunk_{index:03d}.wav"), language)
+                for index, (start, end) in enumerate(chunks)
+            ]
+            if workers == 1:
+                for index, job in enumerate(jobs):
+                    try:
+                        texts[index] = _transcribe_chunk(*job)
+                    except Exception as e:
+                        logger.error(f"❌ Whisper failed on chunk {index+1}: {e}")
+            else:
+                pool = get_worker_pool(pool_size)
+                futures = {pool.submit(_transcribe_chunk, *job): index for index, job in enumerate(jobs)}
+                for future in as_completed(futures):
+                    index = futures[future]
+                    try:
+                        texts[index] = future.result()
+                        logger.info(f"✅ Chunk {index+1}/{len(chunks)} done")
+                    except BrokenProcessPool as e:
+                        logger.error(f"❌ Worker died on chunk {index+1}: {e}")
+                    except Exception as e:
+                        logger.error(f"❌ Whisper failed on chunk {index+1}: {e}")
+                if any(isinstance(f.exception(), BrokenProcessPool) for f in futures):
+                    # A worker was killed (e.g. out of memory); start a fresh pool next time
+                    shutdown_worker_pool()
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        transcript = stitch_chunks(chunks, texts)
+    
+    elapsed = time.monotonic() - started
+    rtf = elapsed / total_duration if total_duration else None
+    logger.info(f"⏱️ Transcribed {total_duration:.0f}s of audio in {elapsed:.1f}s on {workers} worker(s)"
+                + (f" (RTF {rtf:.3f})" if rtf is not None else ""))
+    return {
+        "transcript": transcript.strip(),
+        "duration": total_duration,
+        "chunks_processed": len(chunks),
+        "workers": workers,
+        "processing_time": round(elapsed, 2),
+        "real_time_factor": round(rtf, 4) if rtf is not None else None,
+    }
 
 
 def process_audio_transcript(
     audio_url: str,
     chunk_duration: int = 300,
-    language: str = "hi"
+    language: str = "hi",
+    workers: int = TRANSCRIBE_WORKERS,
 ) -> dict:
     """
     Process audio transcript: download, extract, chunk, transcribe.
     Returns formatted conversation transcript.
     """
-    temp_audio_path = None
-    temp_dir = None
+    wav_path = None
     
     try:
-        # Step 1: Download audio
-        logger.info(f"📥 Downloading audio from: {audio_url}")
-        response = requests.get(audio_url, timeout=600, stream=True)
-        if response.status_code != 200:
-            raise Exception(f"Failed to download audio: HTTP {response.status_code}")
-        
-        # Determine file extension from URL or content-type
-        ext = '.mp3'
-        if '.ogg' in audio_url.lower() or audio_url.lower().endswith('.ogg'):
-            ext = '.ogg'
-        elif '.wav' in audio_url.lower() or audio_url.lower().endswith('.wav'):
-            ext = '.wav'
-        elif '.mp4' in audio_url.lower() or audio_url.lower().endswith('.mp4'):
-            ext = '.mp4'
-        
-        with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as temp_audio:
-            for chunk in response.iter_content(chunk_size=8192):
-                temp_audio.write(chunk)
-            temp_audio_path = temp_audio.name
-        
-        logger.info(f"✅ Downloaded to: {temp_audio_path}")
-        
-        # Step 2: Convert to WAV if needed (Whisper works best with WAV)
-        wav_path = temp_audio_path.replace(ext, '.wav')
-        if ext != '.wav':
-            logger.info(f"🔄 Converting {ext} to WAV...")
-            subprocess.run([
-                'ffmpeg', '-i', temp_audio_path,
-                '-vn', '-acodec', 'pcm_s16le', '-ar', '16000', '-ac', '1',
-                '-y', wav_path
-            ], capture_output=True, text=True, timeout=600, check=True)
-            # Clean up original file
-            if os.path.exists(temp_audio_path):
-                os.unlink(temp_audio_path)
-        else:
-            wav_path = temp_audio_path
-        
-        # Step 3: Probe total duration
-        result = subprocess.run([
-            'ffprobe', '-v', 'error', '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1', wav_path
-        ], capture_output=True, text=True, timeout=30)
-        
-        total_duration = float(result.stdout.strip()) if result.returncode == 0 else 0
-        logger.info(f"🎧 Audio total duration: {total_duration:.2f}s")
-        
-        # Step 4: Chunk audio (if needed) and transcribe
-        max_chunk_duration = min(chunk_duration, 300)
-        overlap = 2.0
+        wav_path = download_audio(audio_url)
+        result = transcribe_wav(wav_path, chunk_duration=chunk_duration, language=language, workers=workers)
+        transcript = result["transcript"]
         
-        # Initialize chunks_processed
-        chunks_processed = 1
-        
-        if total_duration <= max_chunk_duration:
-            # Short audio - transcribe directly
-            logger.info(f"📝 Transcribing entire audio (no chunking needed)...")
-            transcript = transcribe_with_whisper(wav_path, language=language)
-        else:
-            # Long audio - chunk and process
-            logger.info(f"🔪 Chunking audio into {max_chunk_duration}s segments...")
-            start_time = 0.0
-            chunk_index = 0
-            transcript = ""
-            temp_dir = tempfile.mkdtemp()
-            
-            while True:
-                end_time = start_time + max_chunk_duration
-                if start_time >= total_duration:
-                    logger.info("✅ Reached end of file.")
-                    break
-                
-                chunk_file = os.path.join(temp_dir, f"chunk_{chunk_index:03d}.wav")
-                
-                # Extract chunk
-                cmd = [
-                    'ffmpeg', '-ss', f"{start_time}", '-to', f"{end_time}",
-                    '-i', wav_path,
-                    '-acodec', 'pcm_s16le', '-ar', '16000', '-ac', '1',
-                    '-avoid_negative_ts', 'make_zero', '-y', chunk_file
-                ]
-                subprocess.run(cmd, capture_output=True, text=True, timeout=600)
-                
-                if not os.path.exists(chunk_file) or os.path.getsize(chunk_file) < 1000:
-                    logger.info(f"📭 No more audio at {start_time:.2f}s — stopping chunk loop.")
-                    break
-                
-                # Probe actual chunk duration
-                chunk_info = subprocess.run([
-                    'ffprobe', '-v', 'error', '-show_entries', 'format=duration',
-                    '-of', 'default=noprint_wrappers=1:nokey=1', chunk_file
-                ], capture_output=True, text=True, timeout=30)
-                
-                actual_chunk_duration = float(chunk_info.stdout.strip()) if chunk_info.returncode == 0 else 0
-                logger.info(f"🔪 Chunk {chunk_index+1}: {start_time:.2f}-{end_time:.2f}s (actual {actual_chunk_duration:.2f}s)")
-                
-                try:
-                    part_transcript = transcribe_with_whisper(chunk_file, language=language)
-                    transcript += f"\n[Chunk {chunk_index+1} {start_time:.1f}-{end_time:.1f}s]\n{part_transcript.strip()}\n"
-                except Exception as e:
-                    logger.error(f"❌ Whisper failed on chunk {chunk_index+1}: {e}")
-                
-                # Advance pointer
-                if actual_chunk_duration <= overlap:
-                    logger.info(f"✅ Chunk too short ({actual_chunk_duration:.2f}s <= overlap {overlap}s), ending processing.")
-                    break
-                
-                start_time += actual_chunk_duration - overlap
-                chunk_index += 1
-            
-            chunks_processed = chunk_index + 1
-        
-        # Step 5: Format as conversation
-        conversation = format_transcript_as_conversation(transcript.strip())
+        # Format as conversation
+        conversation = format_transcript_as_conversation(transcript)
         
         return {
             "success": True,
-            "transcript": transcript.strip(),
+            "transcript": transcript,
             "conversation": conversation,
-            "duration": total_duration,
-            "chunks_processed": chunks_processed,
-            "character_count": len(transcript.strip()),
+            "duration": result["duration"],
+            "chunks_processed": result["chunks_processed"],
+            "character_count": len(transcript),
             "language": language,
+            "workers": result["workers"],
+            "processing_time": result["processing_time"],
+            "real_time_factor": result["real_time_factor"],
             "processed_at": datetime.now().isoformat(),
         }
         
@@ -198,20 +375,38 @@ def process_audio_transcript(
         }
     finally:
         # Cleanup
-        for p in [temp_audio_path, wav_path] if 'wav_path' in locals() else [temp_audio_path]:
-            try:
-                if p and os.path.exists(p):
-                    os.unlink(p)
-            except:
-                pass
-        
-        if temp_dir and os.path.exists(temp_dir):
-            try:
-                import shutil
-                shutil.rmtree(temp_dir)
-                logger.info(f"🧹 Cleaned up temp directory: {temp_dir}")
-            except Exception as e:
-                logger.warning(f"⚠️ Failed to clean up temp directory {temp_dir}: {e}")
+        try:
+            if wav_path and os.path.exists(wav_path):
+                os.unlink(wav_path)
+        except OSError:
+            pass
+
+
+def benchmark_workers(audio_url: str, chunk_duration: int = 300, language: str = "hi") -> list:
+    """Real-time factor of the same recording on 1, 2, 4 and one worker per core."""
+    counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    wav_path = download_audio(audio_url)
+    rows = []
+    try:
+        # Every run starts with its models loaded, as in the daemon
+        load_whisper_model()
+        for workers in counts:
+            if workers > 1:
+                # Model loading is a one-off in the daemon; keep it out of the timing
+                pool = get_worker_pool(workers)
+                list(pool.map(time.sleep, [0] * workers))
+            result = transcribe_wav(wav_path, chunk_duration=chunk_duration, language=language, workers=workers)
+            rows.append({key: result[key] for key in ("workers", "duration", "chunks_processed",
+                                                      "processing_time", "real_time_factor")})
+    finally:
+        shutdown_worker_pool()
+        if os.path.exists(wav_path):
+            os.unlink(wav_path)
+    
+    base = rows[0]["processing_time"] or None
+    for row in rows:
+        row["speedup"] = round(base / row["processing_time"], 2) if base and row["processing_time"] else None
+    return rows
 
 
 def format_transcript_as_conversation(transcript: str) -> list:
@@ -290,17 +485,41 @@ def format_transcript_as_conversation(transcript: str) -> list:
 def main():
     parser = argparse.ArgumentParser(description="Transcribe audio from URL using Whisper")
     parser.add_argument("--audio-url", required=True, help="URL of audio file (MP3/OGG/WAV)")
+    parser.add_argument("--workers", type=int,
+                        help=f"Processes transcribing chunks in parallel (default: the daemon's, "
+                             f"or {TRANSCRIBE_WORKERS} in-process)")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Report the real-time factor for 1, 2, 4 and all-core workers, in this process")
     parser.add_argument("--chunk-duration", type=int, default=300, help="Chunk duration in seconds (default: 300)")
     parser.add_argument("--language", default="hi", help="Language code (default: hi for Hindi)")
     parser.add_argument("--output", help="Output JSON file path (optional)")
+    parser.add_argument("--no-daemon", action="store_true", help="Transcribe in this process even if the daemon runs")
+    parser.add_argument("--socket", default=DAEMON_SOCKET, help=f"Daemon socket (default: {DAEMON_SOCKET})")
     
     args = parser.parse_args()
     
-    result = process_audio_transcript(
-        audio_url=args.audio_url,
-        chunk_duration=args.chunk_duration,
-        language=args.language
-    )
+    if args.benchmark:
+        rows = benchmark_workers(args.audio_url, args.chunk_duration, args.language)
+        print(json.dumps({"success": True, "benchmark": rows}, indent=2))
+        for row in rows:
+            logger.info(f"📊 {row['workers']} worker(s): {row['processing_time']}s, "
+                        f"RTF {row['real_time_factor']}, speedup {row['speedup']}x")
+        return
+    
+    result = None
+    if not args.no_daemon:
+        result = transcribe_via_daemon(args.audio_url, args.chunk_duration, args.language, workers=args.workers,
+                                       socket_path=args.socket)
+    if result is None:
+        try:
+            result = process_audio_transcript(
+                audio_url=args.audio_url,
+                chunk_duration=args.chunk_duration,
+                language=args.language,
+                workers=args.workers or TRANSCRIBE_WORKERS
+            )
+        finally:
+            shutdown_worker_pool()
     
     if args.output:
         with open(args.output, 'w', encoding='utf-8') as f:
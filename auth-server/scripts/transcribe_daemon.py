@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Long-lived transcription worker for transcribe_audio.py.
+
+Loads the Whisper model once at startup and runs transcription jobs sent
+over a local Unix socket, one at a time (a second job waits for the model).
+A waiting job whose client has hung up (timed out or killed) is dropped
+before it starts, so abandoned requests do not hold up the ones behind them.
+transcribe_audio.py sends its jobs here when the socket exists and
+transcribes in-process otherwise.
+
+Protocol: one JSON line per connection, answered with one JSON line.
+    {"audio_url": "...", "chunk_duration": 300, "language": "hi", "workers": 4}  -> transcript result
+    {"ping": true}  -> {"ok": true, "model": "base", "busy": false, "jobs_done": 3, "jobs_abandoned": 0}
+
+Usage:
+    python3 scripts/transcribe_daemon.py
+    python3 scripts/transcribe_daemon.py --socket /tmp/transcribe_daemon.sock --model small
+    python3 scripts/transcribe_daemon.py --workers 4   # long recordings on 4 processes
+
+With --workers above 1 the chunk worker pool is kept between jobs, so each
+worker's model is loaded once as well. A job asking for more than one worker
+runs on that pool at its configured size (the pool is never rebuilt per job);
+the daemon's own model is then only loaded on the first job that runs
+in-process (a single chunk, or "workers": 1).
+"""
+import argparse
+import json
+import logging
+import os
+import select
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+from transcribe_audio import (
+    DAEMON_SOCKET,
+    TRANSCRIBE_WORKERS,
+    WHISPER_MODEL,
+    get_worker_pool,
+    load_whisper_model,
+    process_audio_transcript,
+    shutdown_worker_pool,
+)
+
+logger = logging.getLogger("transcribe_daemon")
+
+
+class TranscriptionServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Accepts connections concurrently; the job lock runs jobs one at a time."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, model_name: str, workers: int = 1):
+        self.model_name = model_name
+        self.workers = workers
+        self.job_lock = threading.Lock()
+        self.jobs_done = 0
+        self.jobs_abandoned = 0
+        super().__init__(socket_path, JobHandler)
+
+
+class JobHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline() or b"{}")
+        except ValueError:
+            self._reply({"success": False, "error": "Invalid JSON request"})
+            return
+
+        server = self.server
+        if request.get("ping"):
+            self._reply({"ok": True, "model": server.model_name, "workers": server.workers,
+                         "busy": server.job_lock.locked(), "jobs_done": server.jobs_done,
+                         "jobs_abandoned": server.jobs_abandoned})
+            return
+        if not request.get("audio_url"):
+            self._reply({"success": False, "error": "Missing audio_url"})
+            return
+
+        with server.job_lock:
+            if self._client_gone():
+                server.jobs_abandoned += 1
+                logger.warning(f"⚠️ Skipping job for {request['audio_url'][:80]}: client hung up while it waited")
+                return
+            start = time.monotonic()
+            result = process_audio_transcript(
+                audio_url=request["audio_url"],
+                chunk_duration=int(request.get("chunk_duration", 300)),
+                language=request.get("language", "hi"),
+                workers=job_workers(request.get("workers"), server.workers),
+            )
+            server.jobs_done += 1
+        logger.info(f"✅ Job {server.jobs_done} finished in {time.monotonic() - start:.1f}s "
+                    f"(success={result.get('success')})")
+        self._reply(result)
+
+    def _client_gone(self) -> bool:
+        """True when the client closed its end; it sends nothing after the request line."""
+        try:
+            readable, _, _ = select.select([self.connection], [], [], 0)
+            return bool(readable) and not self.connection.recv(1, socket.MSG_PEEK)
+        except OSError:
+            return True
+
+    def _reply(self, payload: dict):
+        try:
+            self.wfile.write(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+        except OSError as e:
+            # Client gave up (timeout or killed); the next job is unaffected
+            logger.warning(f"⚠️ Could not deliver result: {e}")
+
+
+def job_workers(requested, pool_size: int) -> int:
+    """Workers for a job: 1 (in-process) or the pool's size, so the pool and its models are reused."""
+    requested = int(requested or pool_size)
+    return 1 if requested <= 1 else pool_size
+
+
+def daemon_alive(socket_path: str) -> bool:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(2)
+            sock.connect(socket_path)
+            sock.sendall(b'{"ping": true}\n')
+            return bool(sock.recv(1024))
+    except OSError:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep a Whisper model loaded and serve transcription jobs")
+    parser.add_argument("--socket", default=DAEMON_SOCKET, help=f"Unix socket path (default: {DAEMON_SOCKET})")
+    parser.add_argument("--model", default=WHISPER_MODEL, help=f"Whisper model (default: {WHISPER_MODEL})")
+    parser.add_argument("--workers", type=int, default=TRANSCRIBE_WORKERS,
+                        help=f"Chunk worker processes per job (default: {TRANSCRIBE_WORKERS})")
+    args = parser.parse_args()
+
+    if os.path.exists(args.socket):
+        if daemon_alive(args.socket):
+            logger.error(f"❌ A transcription daemon is already serving {args.socket}")
+            sys.exit(1)
+        # Left behind by a daemon that was killed
+        os.unlink(args.socket)
+
+    # Jobs (and pool workers) use this model
+    import transcribe_audio
+    transcribe_audio.WHISPER_MODEL = args.model
+    start = time.monotonic()
+    if args.workers > 1:
+        # Start the workers (and load their models) before the first job arrives; the
+        # daemon's own copy is loaded lazily, only for jobs that run in-process
+        list(get_worker_pool(args.workers).map(time.sleep, [0] * args.workers))
+        logger.info(f"✅ {args.workers} workers loaded '{args.model}' in {time.monotonic() - start:.1f}s")
+    else:
+        load_whisper_model(args.model)
+        logger.info(f"✅ Whisper model '{args.model}' loaded in {time.monotonic() - start:.1f}s")
+
+    server = TranscriptionServer(args.socket, args.model, args.workers)
+    os.chmod(args.socket, 0o660)
+    logger.info(f"🎧 Transcription daemon listening on {args.socket}")
+    # pm2 stops with SIGTERM; exit through the finally block so the socket is removed
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        shutdown_worker_pool()
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
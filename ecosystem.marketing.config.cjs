@@ -22,5 +22,28 @@ module.exports = {
             merge_logs: true,
             log_date_format: 'YYYY-MM-DD HH:mm:ss Z',
         },
+        {
+            // Keeps the Whisper model loaded for scripts/transcribe_audio.py
+            name: 'transcribe-daemon',
+            script: 'scripts/transcribe_daemon.py',
+            cwd: './marketing-server',
+            interpreter: 'python3',
+            instances: 1,
+            autorestart: true,
+            watch: false,
+            max_memory_restart: '3G',
+            env: {
+                PYTHONUNBUFFERED: '1',
+                WHISPER_MODEL: 'base',
+                // Chunk worker processes per job; pick with transcribe_audio.py --benchmark
+                TRANSCRIBE_WORKERS: '2',
+                TRANSCRIBE_DAEMON_SOCKET: '/tmp/transcribe_daemon.sock',
+            },
+            error_file: './logs/pm2-transcribe-daemon-error.log',
+            out_file: './logs/pm2-transcribe-daemon-out.log',
+            time: true,
+            merge_logs: true,
+            log_date_format: 'YYYY-MM-DD HH:mm:ss Z',
+        },
     ],
 };
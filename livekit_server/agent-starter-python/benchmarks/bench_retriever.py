@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Measure KundliRetriever overhead separately from network time.
+
+Runs the retriever against local_index.InMemoryIndex twice: with no
+injected latency (pure client-side cost: executor hop, response parsing,
+filter evaluation) and with a simulated round trip. Overhead is the
+measured time minus the injected latency for the round trips made.
+
+Usage:
+    python benchmarks/bench_retriever.py
+    python benchmarks/bench_retriever.py --users 500 --latency 0.08 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from jyotish_constants import PLANETS  # noqa: E402
+from local_index import InMemoryIndex  # noqa: E402
+from pinecone_kundli_retriever import (  # noqa: E402
+    DASHA_SYSTEMS,
+    DOSHA_TYPES,
+    KundliRetriever,
+    chart_doc_id,
+    dasha_doc_id,
+    dosha_doc_id,
+    house_doc_id,
+    planet_doc_id,
+)
+
+
+def populate(index: InMemoryIndex, users: int, legacy_users: int):
+    """27 ID-addressed documents per user, plus some charts stored the old way (random IDs)."""
+    vectors = []
+
+    def add(doc_id, metadata):
+        vectors.append({"id": doc_id, "values": [random.random() for _ in range(index.dimension)], "metadata": metadata})
+
+    for n in range(users):
+        user_id = f"user{n}"
+        add(chart_doc_id(user_id), {"userId": user_id, "data_type": "chart", "rashi": "Karka", "lagna": "Mesha"})
+        for planet in PLANETS:
+            add(planet_doc_id(user_id, planet), {"userId": user_id, "data_type": "planet", "planet_name": planet.lower()})
+        for house in range(1, 13):
+            add(house_doc_id(user_id, house), {"userId": user_id, "data_type": "house", "house_number": house})
+        for dasha in DASHA_SYSTEMS:
+            add(dasha_doc_id(user_id, dasha), {"userId": user_id, "data_type": "dasha", "dasha_system": dasha})
+        for dosha in DOSHA_TYPES:
+            add(dosha_doc_id(user_id, dosha), {"userId": user_id, "data_type": "dosha", "dosha_name": dosha})
+    for n in range(legacy_users):
+        add(f"legacy-{n}", {"userId": f"legacy{n}", "rashi": "Simha"})
+
+    for start in range(0, len(vectors), 100):
+        index.upsert(vectors=vectors[start:start + 100])
+
+
+SCENARIOS = {
+    # name: (coroutine factory, round trips per call)
+    "get_user_kundli (fetch)": (lambda r, u: r.get_user_kundli(u), 1),
+    "get_chart_documents (4 docs)": (
+        lambda r, u: r.get_chart_documents(u, planets=["saturn"], houses=[7], dashas=["vimshottari"], doshas=["manglik"]), 1),
+    "load_session_documents (27 docs)": (lambda r, u: r.load_session_documents(u), 1),
+    "legacy chart (filtered query)": (lambda r, u: r.get_user_kundli(u.replace("user", "legacy")), 2),
+}
+
+
+async def run_scenario(retriever, factory, users: int, calls: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = []
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            await factory(retriever, f"user{i % users}")
+            timings.append(time.perf_counter() - start)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(calls)])
+    return timings, time.perf_counter() - wall_start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark KundliRetriever against a local index")
+    parser.add_argument("--users", type=int, default=200, help="Users with ID-addressed documents")
+    parser.add_argument("--legacy-users", type=int, default=200, help="Charts stored under random IDs")
+    parser.add_argument("--dimension", type=int, default=64, help="Vector dimension (smaller keeps memory low)")
+    parser.add_argument("--calls", type=int, default=200, help="Calls per scenario")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent calls")
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated round trip in seconds")
+    args = parser.parse_args()
+
+    random.seed(7)
+    index = InMemoryIndex(dimension=args.dimension)
+    populate(index, args.users, args.legacy_users)
+    print(f"Index: {index.describe_index_stats()['total_vector_count']} vectors, dimension {args.dimension}")
+    print(f"{'scenario':<34} {'p50 local':>10} {'p50 net':>9} {'overhead':>9} {'calls/s':>8}")
+    print("-" * 74)
+
+    for name, (factory, round_trips) in SCENARIOS.items():
+        results = {}
+        for latency in (0.0, args.latency):
+            index.latency = latency
+            retriever = KundliRetriever(index=index, timeout=30)
+            retriever.embedding_dimension = args.dimension
+            results[latency] = await run_scenario(retriever, factory, args.users, args.calls, args.concurrency)
+
+        local_p50 = statistics.median(results[0.0][0]) * 1000
+        net_timings, net_wall = results[args.latency]
+        net_p50 = statistics.median(net_timings) * 1000
+        overhead = net_p50 - args.latency * 1000 * round_trips
+        print(f"{name:<34} {local_p50:>8.2f}ms {net_p50:>7.1f}ms {overhead:>7.2f}ms {args.calls / net_wall:>8.0f}")
+
+    print("-" * 74)
+    print(f"p50 local = no injected latency; overhead = p50 net - {args.latency * 1000:.0f}ms x round trips")
+    print("Overhead includes waiting for a free thread when --concurrency exceeds PINECONE_MAX_WORKERS")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
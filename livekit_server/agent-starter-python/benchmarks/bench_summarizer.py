@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Report tokens saved by astrology_summarizer per endpoint.
+
+Compares the raw JSON a tool would otherwise return against the compact
+projection. The bundled fixture holds hand-written sample responses in the
+shape astrologyapi.com returns; pass --fixtures to measure real ones.
+
+Usage:
+    python benchmarks/bench_summarizer.py
+    python benchmarks/bench_summarizer.py --max-tokens 120 --fixtures my_responses.json --show
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from astrology_summarizer import summarize_response, summary_stats, _ENCODING  # noqa: E402
+
+DEFAULT_FIXTURES = Path(__file__).resolve().parent / "fixtures" / "astrology_responses.json"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark astrology response summaries")
+    parser.add_argument("--fixtures", default=str(DEFAULT_FIXTURES), help="JSON file of {endpoint: response}")
+    parser.add_argument("--max-tokens", type=int, default=None, help="Summary token budget")
+    parser.add_argument("--show", action="store_true", help="Print each summary")
+    args = parser.parse_args()
+
+    with open(args.fixtures, "r", encoding="utf-8") as f:
+        fixtures = json.load(f)
+
+    print(f"Tokenizer: {'tiktoken cl100k_base' if _ENCODING else 'approximate (4 chars/token)'}")
+    print(f"{'endpoint':<36} {'raw':>7} {'summary':>8} {'saved':>7} {'saved%':>7} {'us/call':>8}")
+    print("-" * 78)
+
+    total_raw = total_summary = 0
+    for endpoint, data in fixtures.items():
+        stats = summary_stats(endpoint, data, args.max_tokens)
+
+        runs = 200
+        start = time.perf_counter()
+        for _ in range(runs):
+            summary = summarize_response(endpoint, data, args.max_tokens)
+        per_call_us = (time.perf_counter() - start) / runs * 1e6
+
+        total_raw += stats["raw_tokens"]
+        total_summary += stats["summary_tokens"]
+        saved_pct = 100.0 * stats["saved_tokens"] / max(stats["raw_tokens"], 1)
+        print(
+            f"{endpoint:<36} {stats['raw_tokens']:>7} {stats['summary_tokens']:>8} "
+            f"{stats['saved_tokens']:>7} {saved_pct:>6.1f}% {per_call_us:>8.0f}"
+        )
+        if args.show:
+            print(summary)
+            print()
+
+    print("-" * 78)
+    saved = total_raw - total_summary
+    print(f"{'TOTAL':<36} {total_raw:>7} {total_summary:>8} {saved:>7} {100.0 * saved / max(total_raw, 1):>6.1f}%")
+
+
+if __name__ == "__main__":
+    main()
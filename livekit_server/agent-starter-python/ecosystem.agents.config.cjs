@@ -163,6 +163,52 @@ module.exports = {
             exp_backoff_restart_delay: 100,
             cpu_threshold: 70,
             cpu_restart_delay: 30
+        },
+        {
+            name: "media-cache-server",
+            script: "src/media_cache.py",
+            interpreter: "./venv/bin/python",
+            cwd: ".",
+            env: {
+                PYTHONUNBUFFERED: "1",
+                DOTENV_PATH: ".env.local",
+                MEDIA_CACHE_PORT: "8787"
+            },
+            autorestart: true,
+            watch: false,
+            max_memory_restart: "512M",
+            max_restarts: 10,
+            min_uptime: "10s",
+            restart_delay: 5000
+        },
+        {
+            name: "job-rashifal-precompute",
+            script: "src/rashifal_precompute.py",
+            interpreter: "./venv/bin/python",
+            cwd: ".",
+            env: {
+                PYTHONUNBUFFERED: "1",
+                DOTENV_PATH: ".env.local"
+            },
+            // Nightly batch job: runs once at 00:30 server time, then exits
+            cron_restart: "30 0 * * *",
+            autorestart: false,
+            watch: false
+        },
+        {
+            name: "job-track-pool-refill",
+            script: "src/refill_track_pool.py",
+            interpreter: "./venv/bin/python",
+            cwd: ".",
+            env: {
+                PYTHONUNBUFFERED: "1",
+                DOTENV_PATH: ".env.local",
+                TRACK_POOL_REFILL_BUDGET: "6"
+            },
+            // Off-peak batch job: tops up the instant track pool at 03:00 server time, then exits
+            cron_restart: "0 3 * * *",
+            autorestart: false,
+            watch: false
         }
     ]
 };
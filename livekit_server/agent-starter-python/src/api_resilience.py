@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Resilience policy for upstream HTTP APIs (astrologyapi.com).
+
+Provides:
+- TokenBucket: account-wide rate limiter sized to the API plan, with
+  multiplicative back-off on HTTP 429 and gradual recovery (AIMD)
+- CircuitBreaker: per endpoint family; fails fast while upstream is down
+- LatencyTracker: rolling latency window used for p95-based hedging
+- ResilienceMetrics: counters/gauges exported via get_stats() and
+  Prometheus text format
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Optional, Dict, Any, List
+
+logger = logging.getLogger("api_resilience")
+
+# Circuit breaker states (also the Prometheus gauge value)
+CLOSED = 0
+HALF_OPEN = 1
+OPEN = 2
+_STATE_NAMES = {CLOSED: "closed", HALF_OPEN: "half_open", OPEN: "open"}
+
+
+class UpstreamError(Exception):
+    """Raised for upstream failures that should count against the breaker."""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class TokenBucket:
+    """
+    Async token bucket.
+
+    `rate` adapts: halved on a 429 from upstream (never below `min_rate`) and
+    increased by 5% of the configured rate per success back up to it.
+    """
+
+    def __init__(self, rate_per_sec: float, burst: int, min_rate: Optional[float] = None):
+        self.max_rate = rate_per_sec
+        self.rate = rate_per_sec
+        self.min_rate = min_rate or rate_per_sec / 8
+        self.capacity = burst
+        self.tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, timeout: float) -> bool:
+        """Take one token, waiting at most `timeout` seconds. Returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        while True:
+            # Refill and take without awaiting in between, so no lock is needed and
+            # no caller sleeps on behalf of another; each checks its own deadline
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            wait = (1 - self.tokens) / self.rate
+            if time.monotonic() + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+    def on_throttled(self):
+        self.rate = max(self.min_rate, self.rate / 2)
+        logger.warning(f"Upstream throttled; rate limit reduced to {self.rate:.2f} req/s")
+
+    def on_success(self):
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker.
+
+    Opens after `failure_threshold` consecutive failures, stays open for
+    `recovery_timeout` seconds, then lets a single probe through (half-open).
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+            self.state = HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def cancel_probe(self):
+        """Give back a half-open probe slot that was not used."""
+        if self.state == HALF_OPEN:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        self.failures = 0
+        self.state = CLOSED
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning(f"Circuit opened after {self.failures} failures")
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    @property
+    def state_name(self) -> str:
+        return _STATE_NAMES[self.state]
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies (seconds)."""
+
+    def __init__(self, window: int = 200):
+        self.samples: deque = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class ResilienceMetrics:
+    """Per endpoint family counters, latency and breaker state."""
+
+    COUNTERS = ("requests", "successes", "failures", "timeouts", "throttled",
+                "rate_limited", "short_circuited", "hedged", "hedge_wins",
+                "cache_hits", "stale_fallbacks")
+
+    def __init__(self):
+        self.counters: Dict[str, Dict[str, int]] = {}
+        self.latency: Dict[str, LatencyTracker] = {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    def incr(self, family: str, name: str, amount: int = 1):
+        family_counters = self.counters.setdefault(family, {c: 0 for c in self.COUNTERS})
+        family_counters[name] = family_counters.get(name, 0) + amount
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {}
+        for family in sorted(set(self.counters) | set(self.latency)):
+            tracker = self.latency.get(family)
+            breaker = self.breakers.get(family)
+            p50 = tracker.percentile(50) if tracker else None
+            p95 = tracker.percentile(95) if tracker else None
+            stats[family] = {
+                **self.counters.get(family, {}),
+                "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                "breaker": breaker.state_name if breaker else "closed",
+            }
+        return stats
+
+    def render_prometheus(self, prefix: str = "astrology_api") -> str:
+        """Render metrics in Prometheus text exposition format."""
+        lines: List[str] = []
+        for name in self.COUNTERS:
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            for family in sorted(self.counters):
+                lines.append(f'{prefix}_{name}_total{{endpoint="{family}"}} {self.counters[family].get(name, 0)}')
+        lines.append(f"# TYPE {prefix}_latency_seconds gauge")
+        for family in sorted(self.latency):
+            for quantile in (50, 95, 99):
+                value = self.latency[family].percentile(quantile)
+                if value is not None:
+                    lines.append(
+                        f'{prefix}_latency_seconds{{endpoint="{family}",quantile="0.{quantile}"}} {value:.4f}'
+                    )
+        lines.append(f"# HELP {prefix}_breaker_state 0=closed 1=half_open 2=open")
+        lines.append(f"# TYPE {prefix}_breaker_state gauge")
+        for family in sorted(self.breakers):
+            lines.append(f'{prefix}_breaker_state{{endpoint="{family}"}} {self.breakers[family].state}')
+        return "\n".join(lines) + "\n"
+
+
+class EndpointPolicy:
+    """Timeout and hedging settings for one endpoint family."""
+
+    def __init__(self, timeout: float, hedge: bool = True, min_hedge_delay: float = 0.25, min_samples: int = 20):
+        self.timeout = timeout
+        self.hedge = hedge
+        self.min_hedge_delay = min_hedge_delay
+        self.min_samples = min_samples
+
+
+def endpoint_family(endpoint: str) -> str:
+    """
+    Group parameterized endpoints for metrics and breakers, e.g.
+    "horoscope_prediction/daily/aries" -> "horoscope_prediction/daily".
+    """
+    parts = endpoint.strip("/").split("/")
+    return "/".join(parts[:2]) if parts[0] in ("horoscope_prediction", "planets") else parts[0]
+
+
+async def start_metrics_server(metrics: ResilienceMetrics, port: int, host: str = "127.0.0.1"):
+    """Serve /metrics in Prometheus format. Returns the aiohttp runner (or None if the port is busy)."""
+    from aiohttp import web
+
+    async def handle_metrics(request):
+        return web.Response(text=metrics.render_prometheus(), content_type="text/plain")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, host, port).start()
+    except OSError as e:
+        # Several agent workers may share a host; the first one wins the port
+        logger.warning(f"Metrics server not started on {host}:{port}: {e}")
+        await runner.cleanup()
+        return None
+    logger.info(f"Metrics available at http://{host}:{port}/metrics")
+    return runner
+
+
+def env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
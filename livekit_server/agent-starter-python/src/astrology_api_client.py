@@ -5,10 +5,27 @@ Wrapper for astrologyapi.com REST API endpoints.
 """
 
 import aiohttp
+import asyncio
 import os
+import time
+from datetime import datetime
 from typing import Optional, Dict, Any
 import logging
 
+from astrology_cache import get_cache
+from astrology_summarizer import summarize_response
+from api_resilience import (
+    CircuitBreaker,
+    EndpointPolicy,
+    LatencyTracker,
+    ResilienceMetrics,
+    TokenBucket,
+    UpstreamError,
+    endpoint_family,
+    env_float,
+    start_metrics_server,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,6 +37,12 @@ class AstrologyAPIClient:
     
     BASE_URL = "https://json.astrologyapi.com/v1"
     
+    # Card draws differ per call: never cached, hedged or served stale
+    NON_IDEMPOTENT = {"tarot_predictions", "yes_no_tarot"}
+    
+    # Report endpoints generate long text upstream and need more time
+    SLOW_ENDPOINTS = {"match_making_report", "general_house_report", "general_rashi_report", "pitra_dosha_report"}
+    
     def __init__(self):
         self.user_id = os.getenv("ASTROLOGY_API_USER_ID")
         self.api_key = os.getenv("ASTROLOGY_API_KEY")
@@ -28,14 +51,148 @@ class AstrologyAPIClient:
             logger.warning("Astrology API credentials not found in environment")
         
         self.auth = aiohttp.BasicAuth(self.user_id, self.api_key)
+        
+        # Resilience policy (see api_resilience.py)
+        self.cache = get_cache()
+        self.metrics = ResilienceMetrics()
+        self.bucket = TokenBucket(
+            rate_per_sec=env_float("ASTROLOGY_API_RATE_PER_MIN", 120) / 60.0,
+            burst=int(env_float("ASTROLOGY_API_BURST", 10)),
+        )
+        self.timeout = env_float("ASTROLOGY_API_TIMEOUT", 4.0)
+        self.hedging = os.getenv("ASTROLOGY_API_HEDGING", "true").lower() == "true"
+        self.breaker_threshold = int(env_float("ASTROLOGY_API_BREAKER_FAILURES", 5))
+        self.breaker_recovery = env_float("ASTROLOGY_API_BREAKER_RECOVERY", 30.0)
+        self._policies: Dict[str, EndpointPolicy] = {}
+        
+        # One pooled session per event loop instead of a new session per call
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop = None
+        # /metrics server: started once per process, kept for later jobs
+        self._metrics_runner = None
+        self._metrics_started = False
+    
+    def _policy(self, family: str) -> EndpointPolicy:
+        if family not in self._policies:
+            timeout = self.timeout * 2 if family in self.SLOW_ENDPOINTS else self.timeout
+            self._policies[family] = EndpointPolicy(
+                timeout=timeout,
+                hedge=self.hedging and family not in self.NON_IDEMPOTENT,
+            )
+            self.metrics.breakers[family] = CircuitBreaker(self.breaker_threshold, self.breaker_recovery)
+            self.metrics.latency[family] = LatencyTracker()
+        return self._policies[family]
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            self._session = aiohttp.ClientSession(
+                auth=self.auth,
+                connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300),
+            )
+            self._session_loop = loop
+        return self._session
+    
+    async def close(self):
+        """Close the pooled HTTP session."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def _attempt(self, url: str, data: dict, headers: Optional[dict], timeout: float) -> Optional[dict]:
+        """
+        One HTTP request.
+        
+        Returns the JSON body, or None for a client error (4xx) that retrying
+        cannot fix. Raises UpstreamError / asyncio.TimeoutError for failures
+        that count against the circuit breaker.
+        """
+        session = await self._get_session()
+        async with session.post(
+            url,
+            json=data,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            if response.status == 200:
+                return await response.json()
+            error_text = await response.text()
+            if response.status == 429 or response.status >= 500:
+                raise UpstreamError(f"API error {response.status}: {error_text[:200]}", status=response.status)
+            logger.error(f"API error {response.status}: {error_text}")
+            return None
+    
+    async def _hedged(
+        self,
+        family: str,
+        url: str,
+        data: dict,
+        headers: Optional[dict],
+        policy: EndpointPolicy,
+    ) -> Optional[dict]:
+        """
+        Send a second identical request if the first is slower than the
+        endpoint's recent p95, and return whichever succeeds first.
+        """
+        tracker = self.metrics.latency[family]
+        p95 = tracker.percentile(95)
+        if not policy.hedge or len(tracker.samples) < policy.min_samples or p95 is None:
+            return await self._attempt(url, data, headers, policy.timeout)
+        delay = max(policy.min_hedge_delay, p95)
+        if delay >= policy.timeout:
+            return await self._attempt(url, data, headers, policy.timeout)
+        
+        primary = asyncio.ensure_future(self._attempt(url, data, headers, policy.timeout))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        # Hedges only spend spare rate budget; otherwise keep waiting on the primary
+        if done or not await self.bucket.acquire(timeout=0):
+            return await primary
+        
+        self.metrics.incr(family, "hedged")
+        backup = asyncio.ensure_future(self._attempt(url, data, headers, policy.timeout))
+        pending = {primary, backup}
+        last_error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self.metrics.incr(family, "hedge_wins")
+                        return task.result()
+                    last_error = task.exception()
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    def _fallback(self, family: str, endpoint: str, cache_params: dict) -> Optional[dict]:
+        """Serve the last good response (even if expired) while upstream is failing."""
+        if family in self.NON_IDEMPOTENT:
+            return None
+        stale = self.cache.get_stale(endpoint, **cache_params)
+        if stale is not None:
+            self.metrics.incr(family, "stale_fallbacks")
+            logger.info(f"Serving cached {endpoint} while upstream is unavailable")
+        return stale
     
-    async def _call_api(self, endpoint: str, data: dict) -> Optional[dict]:
+    async def _call_api(
+        self,
+        endpoint: str,
+        data: dict,
+        language: Optional[str] = None
+    ) -> Optional[dict]:
         """
         Make authenticated API call.
         
+        Goes through the resilience policy: fresh cache hit, rate limiter,
+        circuit breaker, then a (possibly hedged) request. When upstream is
+        throttling or down, the last cached response is returned instead.
+        
         Args:
             endpoint: API endpoint (e.g., "birth_details")
             data: Request payload
+            language: Optional response language (e.g., "en", "hi"), sent as Accept-Language
             
         Returns:
             API response as dict, or None on error
@@ -45,24 +202,116 @@ class AstrologyAPIClient:
             return None
         
         url = f"{self.BASE_URL}/{endpoint}"
+        headers = {"Accept-Language": language} if language else None
+        family = endpoint_family(endpoint)
+        policy = self._policy(family)
+        breaker = self.metrics.breakers[family]
+        cache_params = {"payload": data, "language": language}
+        
+        self.metrics.incr(family, "requests")
+        if family not in self.NON_IDEMPOTENT:
+            cached = self.cache.get(endpoint, **cache_params)
+            if cached is not None:
+                self.metrics.incr(family, "cache_hits")
+                return cached
+        
+        if not breaker.allow():
+            self.metrics.incr(family, "short_circuited")
+            return self._fallback(family, endpoint, cache_params)
         
+        if not await self.bucket.acquire(timeout=policy.timeout / 2):
+            breaker.cancel_probe()
+            self.metrics.incr(family, "rate_limited")
+            logger.warning(f"Rate limit reached, not calling {endpoint}")
+            return self._fallback(family, endpoint, cache_params)
+        
+        start = time.monotonic()
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    url,
-                    json=data,
-                    auth=self.auth,
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"API error {response.status}: {error_text}")
-                        return None
+            result = await self._hedged(family, url, data, headers, policy)
+        except UpstreamError as e:
+            if e.status == 429:
+                # Throttling says nothing about the endpoint's health; free the probe slot
+                breaker.cancel_probe()
+                self.bucket.on_throttled()
+                self.metrics.incr(family, "throttled")
+            else:
+                breaker.record_failure()
+                self.metrics.incr(family, "failures")
+            logger.error(f"API call failed for {endpoint}: {e}")
+            return self._fallback(family, endpoint, cache_params)
+        except asyncio.CancelledError:
+            # Caller went away (session ended); a half-open breaker must not wait for this probe forever
+            breaker.cancel_probe()
+            raise
+        except asyncio.TimeoutError:
+            breaker.record_failure()
+            self.metrics.incr(family, "timeouts")
+            logger.error(f"API call timed out for {endpoint} after {policy.timeout:.1f}s")
+            return self._fallback(family, endpoint, cache_params)
         except Exception as e:
+            breaker.record_failure()
+            self.metrics.incr(family, "failures")
             logger.error(f"API call failed for {endpoint}: {e}")
+            return self._fallback(family, endpoint, cache_params)
+        
+        self.metrics.latency[family].record(time.monotonic() - start)
+        self.metrics.incr(family, "successes")
+        breaker.record_success()
+        self.bucket.on_success()
+        if result is not None and family not in self.NON_IDEMPOTENT:
+            self.cache.set(result, endpoint, **cache_params)
+        return result
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Per endpoint request counts, p50/p95 latency and breaker state."""
+        return {
+            "rate_limit_per_sec": round(self.bucket.rate, 2),
+            "cache": self.cache.get_stats(),
+            "endpoints": self.metrics.get_stats(),
+        }
+    
+    def render_prometheus(self) -> str:
+        """Metrics in Prometheus text format."""
+        return self.metrics.render_prometheus()
+    
+    async def start_metrics_server(self, port: int):
+        """
+        Expose /metrics on localhost for Prometheus scraping.
+
+        Only the first call per process binds the port; worker processes run
+        many jobs, and later calls return the runner (None if the bind failed).
+        """
+        if not self._metrics_started:
+            self._metrics_started = True
+            self._metrics_runner = await start_metrics_server(self.metrics, port)
+        return self._metrics_runner
+    
+    async def get_summary(
+        self,
+        endpoint: str,
+        data: dict,
+        max_tokens: Optional[int] = None,
+        language: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Call an endpoint and return a compact text projection for the LLM.
+        
+        Use this instead of passing raw JSON into tool results; see
+        astrology_summarizer for the per-endpoint projections.
+        
+        Args:
+            endpoint: API endpoint (e.g., "planets/extended")
+            data: Request payload
+            max_tokens: Token budget for the summary
+            language: Optional response language
+            
+        Returns:
+            Summary text, or None on error
+        """
+        result = await self._call_api(endpoint, data, language=language)
+        if result is None:
             return None
+        return summarize_response(endpoint, result, max_tokens=max_tokens)
     
     # ============================================
     # BASIC CHART ENDPOINTS
@@ -183,7 +432,8 @@ class AstrologyAPIClient:
     async def get_daily_horoscope(
         self,
         zodiac: str,
-        timezone: float = 5.5
+        timezone: float = 5.5,
+        language: Optional[str] = None
     ) -> Optional[dict]:
         """
         Get daily horoscope prediction.
@@ -191,40 +441,51 @@ class AstrologyAPIClient:
         Args:
             zodiac: Zodiac sign (aries, taurus, etc.)
             timezone: Timezone offset
+            language: Optional response language (e.g., "en", "hi")
         """
         return await self._call_api(
             f"horoscope_prediction/daily/{zodiac.lower()}",
-            {"timezone": timezone}
+            {"timezone": timezone},
+            language=language
         )
     
     async def get_weekly_horoscope(
         self,
         zodiac: str,
-        timezone: float = 5.5
+        timezone: float = 5.5,
+        language: Optional[str] = None
     ) -> Optional[dict]:
         """Get weekly horoscope prediction."""
         return await self._call_api(
             f"horoscope_prediction/weekly/{zodiac.lower()}",
-            {"timezone": timezone}
+            {"timezone": timezone},
+            language=language
         )
     
     async def get_monthly_horoscope(
         self,
         zodiac: str,
-        timezone: float = 5.5
+        timezone: float = 5.5,
+        language: Optional[str] = None
     ) -> Optional[dict]:
         """Get monthly horoscope prediction."""
         return await self._call_api(
             f"horoscope_prediction/monthly/{zodiac.lower()}",
-            {"timezone": timezone}
+            {"timezone": timezone},
+            language=language
         )
     
     async def get_daily_nakshatra_prediction(
         self,
-        birth_data: dict
+        birth_data: dict,
+        language: Optional[str] = None
     ) -> Optional[dict]:
         """Get daily prediction based on Nakshatra."""
-        return await self._call_api("daily_nakshatra_prediction", birth_data)
+        return await self._call_api(
+            "daily_nakshatra_prediction",
+            birth_data,
+            language=language
+        )
     
     # ============================================
     # PANCHANG ENDPOINTS
@@ -342,6 +603,30 @@ class AstrologyAPIClient:
         return await self._call_api("yes_no_tarot", question_data)
 
 
+def birth_data_from_chart(chart: Optional[Dict[str, Any]]) -> Optional[dict]:
+    """
+    Request payload ({day, month, year, hour, min, lat, lon, tzone}) for a
+    saved chart, or None when its birth date, time or place is incomplete.
+    """
+    if not chart or chart.get("latitude") is None or chart.get("longitude") is None:
+        return None
+    birth = None
+    for fmt in ("%d/%m/%Y %H:%M", "%Y-%m-%d %H:%M", "%d-%m-%Y %H:%M"):
+        try:
+            birth = datetime.strptime(f"{chart.get('birthDate', '')} {chart.get('birthTime', '')}".strip(), fmt)
+            break
+        except ValueError:
+            continue
+    if birth is None:
+        return None
+    return {
+        "day": birth.day, "month": birth.month, "year": birth.year,
+        "hour": birth.hour, "min": birth.minute,
+        "lat": float(chart["latitude"]), "lon": float(chart["longitude"]),
+        "tzone": float(chart.get("tzone", 5.5)),
+    }
+
+
 # Singleton instance
 _api_client_instance = None
 
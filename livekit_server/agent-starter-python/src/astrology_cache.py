@@ -4,6 +4,7 @@ In-memory cache for Astrology API responses.
 Reduces API calls and improves response times.
 """
 
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 import logging
@@ -17,17 +18,23 @@ class AstrologyCache:
     """
     Simple in-memory cache for API responses.
     Uses TTL (time-to-live) for automatic expiration.
+    Expired entries stay available to get_stale() for up to max_stale_hours;
+    beyond max_entries the least recently used entries are dropped.
     """
     
-    def __init__(self, ttl_minutes: int = 60):
+    def __init__(self, ttl_minutes: int = 60, max_entries: int = 5000, max_stale_hours: int = 24):
         """
         Initialize cache.
         
         Args:
             ttl_minutes: Time-to-live in minutes (default: 1 hour)
+            max_entries: Entries kept, least recently used dropped first
+            max_stale_hours: Age after which get_stale() no longer serves an entry
         """
-        self.cache: Dict[str, tuple[Any, datetime]] = {}
+        self.cache: "OrderedDict[str, tuple[Any, datetime]]" = OrderedDict()
         self.ttl = timedelta(minutes=ttl_minutes)
+        self.max_entries = max_entries
+        self.max_stale_age = timedelta(hours=max_stale_hours)
         self.hits = 0
         self.misses = 0
     
@@ -67,18 +74,40 @@ class AstrologyCache:
             
             # Check if expired
             if datetime.now() - timestamp < self.ttl:
+                self.cache.move_to_end(key)
                 self.hits += 1
                 logger.debug(f"Cache HIT for {endpoint}")
                 return data
             else:
-                # Expired, remove from cache
-                del self.cache[key]
+                # Expired entries are kept for get_stale() until clear_expired()
                 logger.debug(f"Cache EXPIRED for {endpoint}")
         
         self.misses += 1
         logger.debug(f"Cache MISS for {endpoint}")
         return None
     
+    def get_stale(self, endpoint: str, **params) -> Optional[Any]:
+        """
+        Get cached response ignoring TTL.
+        
+        Used as a fallback while the upstream API is failing or throttled;
+        stale data beats no answer in a live conversation.
+        
+        Args:
+            endpoint: API endpoint
+            **params: Request parameters
+            
+        Returns:
+            Cached data or None if never cached (or too old)
+        """
+        key = self._make_key(endpoint, **params)
+        if key in self.cache:
+            data, timestamp = self.cache[key]
+            if datetime.now() - timestamp < self.max_stale_age:
+                return data
+            del self.cache[key]
+        return None
+    
     def set(self, data: Any, endpoint: str, **params):
         """
         Store data in cache.
@@ -90,6 +119,9 @@ class AstrologyCache:
         """
         key = self._make_key(endpoint, **params)
         self.cache[key] = (data, datetime.now())
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
         logger.debug(f"Cached data for {endpoint}")
     
     def clear(self):
@@ -100,11 +132,11 @@ class AstrologyCache:
         logger.info("Cache cleared")
     
     def clear_expired(self):
-        """Remove expired entries from cache."""
+        """Remove entries too old even for get_stale()."""
         now = datetime.now()
         expired_keys = [
             key for key, (_, timestamp) in self.cache.items()
-            if now - timestamp >= self.ttl
+            if now - timestamp >= self.max_stale_age
         ]
         
         for key in expired_keys:
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Compact projections of astrologyapi.com responses for LLM context.
+
+Raw responses (extended planets, dasha trees, manglik rules, ...) are mostly
+fields the model never uses. Each endpoint gets a projector that keeps the
+facts an astrologer would quote, formatted with the same labels as
+KundliRetriever.get_user_chart_summary, and the result is trimmed to a
+token budget. Output is deterministic for a given response.
+"""
+
+import json
+import logging
+import os
+from typing import Optional, Dict, Any, List, Callable
+
+logger = logging.getLogger("astrology_summarizer")
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None
+
+DEFAULT_MAX_TOKENS = int(os.getenv("ASTRO_SUMMARY_MAX_TOKENS", "250"))
+
+# Longest free-text report sentence kept from an endpoint (characters)
+_MAX_REPORT_CHARS = 280
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count with tiktoken when installed, else ~4 characters per token."""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return (len(text) + 3) // 4
+
+
+def _clip(text: Any, limit: int = _MAX_REPORT_CHARS) -> str:
+    text = " ".join(str(text).split())
+    if len(text) <= limit:
+        return text
+    cut = text[:limit].rsplit(" ", 1)[0]
+    return cut.rstrip(".,;") + "..."
+
+
+def _deg(value: Any) -> str:
+    try:
+        return f"{float(value):.1f}°"
+    except (TypeError, ValueError):
+        return "?"
+
+
+def _yes_no(value: Any) -> str:
+    return "Yes" if str(value).lower() in ("true", "yes", "1") else "No"
+
+
+def _dasha_span(entry: Dict[str, Any]) -> str:
+    start, end = entry.get("start"), entry.get("end")
+    if start and end:
+        return f" ({str(start).split(' ')[0]} to {str(end).split(' ')[0]})"
+    return ""
+
+
+# ============================================
+# PER-ENDPOINT PROJECTORS
+# Each returns lines in priority order; the budget trims from the end.
+# ============================================
+
+def _planets(data: Any) -> List[str]:
+    lines = ["Planetary Positions:"]
+    for planet in data if isinstance(data, list) else []:
+        name = planet.get("name", "?")
+        line = f"- {name}: {planet.get('sign', 'Unknown')} in House {planet.get('house', 'Unknown')}"
+        details = []
+        if planet.get("nakshatra"):
+            pada = planet.get("nakshatra_pad") or planet.get("nakshatraPad")
+            details.append(f"{planet['nakshatra']}" + (f" pada {pada}" if pada else ""))
+        if "normDegree" in planet:
+            details.append(_deg(planet["normDegree"]))
+        if str(planet.get("isRetro", "")).lower() == "true" and name not in ("Rahu", "Ketu"):
+            details.append("retrograde")
+        if details:
+            line += f" ({', '.join(details)})"
+        lines.append(line)
+    return lines
+
+
+def _astro_details(data: Dict[str, Any]) -> List[str]:
+    lines = [
+        f"Rashi (Moon Sign): {data.get('sign', 'Unknown')} (lord {data.get('SignLord', 'Unknown')})",
+        f"Lagna (Ascendant): {data.get('ascendant', 'Unknown')} (lord {data.get('ascendant_lord', 'Unknown')})",
+        # astrologyapi.com spells this key "Naksahtra"
+        f"Nakshatra: {data.get('Naksahtra', data.get('nakshatra', 'Unknown'))} (Pada {data.get('Charan', 'Unknown')})",
+    ]
+    extras = [
+        ("Tithi", "Tithi"), ("Yoga", "Yog"), ("Karana", "Karan"),
+        ("Varna", "Varna"), ("Gana", "Gan"), ("Nadi", "Nadi"),
+        ("Yoni", "Yoni"), ("Tatva", "tatva"), ("Name letters", "name_alphabet"),
+    ]
+    lines.extend(f"{label}: {data[key]}" for label, key in extras if data.get(key))
+    return lines
+
+
+def _birth_details(data: Dict[str, Any]) -> List[str]:
+    return [
+        f"Birth Details: {data.get('day')}/{data.get('month')}/{data.get('year')} "
+        f"{int(data.get('hour', 0)):02d}:{int(data.get('minute', 0)):02d}, "
+        f"lat {data.get('latitude')}, lon {data.get('longitude')}, UTC{float(data.get('timezone', 0)):+g}",
+        f"Sunrise: {data.get('sunrise', 'Unknown')}, Sunset: {data.get('sunset', 'Unknown')}",
+        f"Ayanamsha: {_deg(data.get('ayanamsha'))}",
+    ]
+
+
+def _current_vdasha(data: Dict[str, Any]) -> List[str]:
+    labels = [
+        ("major", "Mahadasha"), ("minor", "Antardasha"), ("sub_minor", "Pratyantar Dasha"),
+        ("sub_sub_minor", "Sookshma Dasha"), ("sub_sub_sub_minor", "Prana Dasha"),
+    ]
+    lines = ["Current Dasha Periods:"]
+    for key, label in labels:
+        level = data.get(key)
+        if not isinstance(level, dict):
+            continue
+        if "dasha_period" in level:
+            # current_vdasha_all: pick the running period from the full list
+            current = next(
+                (p for p in level["dasha_period"] if p.get("planet") == level.get("planet")),
+                level,
+            )
+        else:
+            current = level
+        lines.append(f"- {label}: {current.get('planet', 'Unknown')}{_dasha_span(current)}")
+    return lines
+
+
+def _dasha_list(data: Any) -> List[str]:
+    lines = ["Dasha Periods:"]
+    for entry in data if isinstance(data, list) else []:
+        lines.append(f"- {entry.get('planet', 'Unknown')}{_dasha_span(entry)}")
+    return lines
+
+
+def _manglik(data: Dict[str, Any]) -> List[str]:
+    lines = [
+        f"Manglik Status: {_yes_no(data.get('is_present'))} ({data.get('manglik_status', 'Unknown')})",
+        f"Manglik strength: {data.get('percentage_manglik_present', '?')}%, "
+        f"after cancellation: {data.get('percentage_manglik_after_cancellation', '?')}%",
+    ]
+    if data.get("is_mars_manglik_cancelled"):
+        lines.append(f"Cancelled: {_yes_no(data.get('is_mars_manglik_cancelled'))}")
+    if data.get("manglik_report"):
+        lines.append(f"Report: {_clip(data['manglik_report'])}")
+    return lines
+
+
+def _kalsarpa(data: Dict[str, Any]) -> List[str]:
+    lines = [f"Kaal Sarp Dosha: {_yes_no(data.get('present'))}"]
+    if data.get("present"):
+        lines.append(f"Type: {data.get('name') or data.get('type', 'Unknown')}")
+    if data.get("one_line"):
+        lines.append(_clip(data["one_line"]))
+    report = data.get("report")
+    if isinstance(report, dict) and report.get("report"):
+        lines.append(f"Report: {_clip(report['report'])}")
+    return lines
+
+
+def _sadhesati(data: Dict[str, Any]) -> List[str]:
+    return [
+        f"Sade Sati: {_yes_no(data.get('is_undergoing_sadhesati'))}",
+        f"Moon sign: {data.get('moon_sign', 'Unknown')}, Saturn sign: {data.get('saturn_sign', 'Unknown')}"
+        + (" (Saturn retrograde)" if str(data.get("is_saturn_retrograde")).lower() == "true" else ""),
+        f"Status: {_clip(data.get('sadhesati_status', 'Unknown'))}",
+    ]
+
+
+def _panchang(data: Dict[str, Any]) -> List[str]:
+    fields = [
+        ("Day", "day"), ("Tithi", "tithi"), ("Nakshatra", "nakshatra"),
+        ("Yoga", "yog"), ("Karana", "karan"), ("Sunrise", "sunrise"), ("Sunset", "sunset"),
+    ]
+    lines = []
+    for label, key in fields:
+        value = data.get(key)
+        if isinstance(value, dict):
+            # advanced_panchang nests details, e.g. {"details": {"tithi_name": ...}}
+            details = value.get("details", value)
+            value = next((v for k, v in details.items() if k.endswith("_name") or k == "name"), None)
+        if value:
+            lines.append(f"{label}: {value}")
+    return lines
+
+
+def _muhurta_table(data: Any) -> List[str]:
+    lines = []
+    for period in ("day", "night"):
+        slots = data.get(period) if isinstance(data, dict) else None
+        if not isinstance(slots, list):
+            continue
+        lines.append(f"{period.capitalize()}:")
+        for slot in slots:
+            label = slot.get("muhurta") or slot.get("hora") or "?"
+            lines.append(f"- {slot.get('time', '?')}: {label}")
+    return lines
+
+
+def _ashtakoot(data: Dict[str, Any]) -> List[str]:
+    total = data.get("total", {})
+    conclusion = data.get("conclusion", {})
+    lines = [
+        f"Guna Milan: {total.get('received_points', '?')}/{total.get('total_points', 36)} "
+        f"(minimum {total.get('minimum_required', 18)})",
+    ]
+    if conclusion.get("report"):
+        lines.append(f"Conclusion: {_clip(conclusion['report'])}")
+    for koot, values in data.items():
+        if koot in ("total", "conclusion") or not isinstance(values, dict):
+            continue
+        lines.append(f"- {koot.capitalize()}: {values.get('received_points', '?')}/{values.get('total_points', '?')}")
+    return lines
+
+
+def _gem_suggestion(data: Dict[str, Any]) -> List[str]:
+    lines = []
+    for role, gem in data.items():
+        if not isinstance(gem, dict):
+            continue
+        lines.append(
+            f"{role.capitalize()} stone: {gem.get('name', 'Unknown')} "
+            f"(finger {gem.get('wear_finger', '?')}, metal {gem.get('wear_metal', '?')}, "
+            f"day {gem.get('wear_day', '?')}, deity {gem.get('gem_deity', '?')})"
+        )
+    return lines
+
+
+def _prediction(data: Dict[str, Any]) -> List[str]:
+    prediction = data.get("prediction", data)
+    if isinstance(prediction, dict):
+        return [f"{k.replace('_', ' ').capitalize()}: {_clip(v)}" for k, v in prediction.items() if v]
+    if isinstance(prediction, list):
+        return [_clip(p) for p in prediction if p]
+    return [_clip(prediction)]
+
+
+def _generic(data: Any, prefix: str = "") -> List[str]:
+    """Flatten unknown responses into sorted key: value lines, skipping empties."""
+    lines = []
+    if isinstance(data, dict):
+        for key in sorted(data):
+            value = data[key]
+            if value in (None, "", [], {}):
+                continue
+            label = f"{prefix}{key}"
+            if isinstance(value, (dict, list)):
+                lines.extend(_generic(value, prefix=f"{label}."))
+            elif isinstance(value, float):
+                lines.append(f"{label}: {value:.2f}")
+            else:
+                lines.append(f"{label}: {_clip(value)}")
+    elif isinstance(data, list):
+        for i, item in enumerate(data):
+            lines.extend(_generic(item, prefix=f"{prefix}{i}."))
+    else:
+        lines.append(f"{prefix.rstrip('.')}: {_clip(data)}")
+    return lines
+
+
+_PROJECTORS: Dict[str, Callable[[Any], List[str]]] = {
+    "planets": _planets,
+    "planets/extended": _planets,
+    "astro_details": _astro_details,
+    "birth_details": _birth_details,
+    "current_vdasha": _current_vdasha,
+    "current_vdasha_all": _current_vdasha,
+    "major_vdasha": _dasha_list,
+    "sub_vdasha": _dasha_list,
+    "major_chardasha": _dasha_list,
+    "manglik": _manglik,
+    "kalsarpa_details": _kalsarpa,
+    "sadhesati_current_status": _sadhesati,
+    "basic_panchang": _panchang,
+    "advanced_panchang": _panchang,
+    "hora_muhurta": _muhurta_table,
+    "chaughadiya_muhurta": _muhurta_table,
+    "match_ashtakoot_points": _ashtakoot,
+    "basic_gem_suggestion": _gem_suggestion,
+    "horoscope_prediction/daily": _prediction,
+    "horoscope_prediction/weekly": _prediction,
+    "horoscope_prediction/monthly": _prediction,
+    "daily_nakshatra_prediction": _prediction,
+}
+
+
+def _projector_for(endpoint: str) -> Callable[[Any], List[str]]:
+    # Parameterized endpoints such as "sub_vdasha/Jupiter" or "horoscope_prediction/daily/aries"
+    parts = endpoint.strip("/").split("/")
+    for n in range(len(parts), 0, -1):
+        projector = _PROJECTORS.get("/".join(parts[:n]))
+        if projector:
+            return projector
+    return _generic
+
+
+def _fit_budget(lines: List[str], max_tokens: int) -> str:
+    """Keep leading lines until the budget is reached."""
+    kept: List[str] = []
+    used = 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            kept.append("...")
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept)
+
+
+def summarize_response(endpoint: str, data: Any, max_tokens: Optional[int] = None) -> str:
+    """
+    Project an astrologyapi.com response to compact text for the LLM.
+
+    Args:
+        endpoint: Endpoint the data came from (e.g. "planets/extended")
+        data: Parsed JSON response
+        max_tokens: Token budget (default ASTRO_SUMMARY_MAX_TOKENS)
+
+    Returns:
+        Deterministic text summary within the budget
+    """
+    if data is None:
+        return "No data available."
+    budget = max_tokens or DEFAULT_MAX_TOKENS
+    try:
+        lines = _projector_for(endpoint)(data)
+    except Exception as e:
+        logger.warning(f"Projector failed for {endpoint}, using generic summary: {e}")
+        lines = _generic(data)
+    if len(lines) <= 1:
+        # Only a heading: the data is not shaped like this endpoint's response
+        lines = _generic(data)
+    return _fit_budget(lines, budget)
+
+
+def summary_stats(endpoint: str, data: Any, max_tokens: Optional[int] = None) -> Dict[str, int]:
+    """Raw vs. summarized token counts for one response."""
+    raw_tokens = estimate_tokens(json.dumps(data, ensure_ascii=False))
+    summary_tokens = estimate_tokens(summarize_response(endpoint, data, max_tokens))
+    return {
+        "raw_tokens": raw_tokens,
+        "summary_tokens": summary_tokens,
+        "saved_tokens": raw_tokens - summary_tokens,
+    }
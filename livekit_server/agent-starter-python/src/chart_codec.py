@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Compact encoding for chart document metadata.
+
+Charts used to be stored as ~25 loose string fields per vector
+(`sun_sign`, `sun_house`, ... `ketu_house`, `mahadasha`, ...). Schema 1 packs
+them into one base64 string holding a small header plus a sign, house and
+nakshatra byte per planet:
+
+    header   version, flags, lagna, rashi, nakshatra, pada,
+             mahadasha, antardasha, manglik                       9 bytes
+    planets  (sign, house, nakshatra) x 9 in PLANETS order        27 bytes
+
+Signs are 1-12 (Aries..Pisces), nakshatras 1-27, planets 1-9 (PLANETS order),
+manglik 1=no / 2=yes; 0 always means "not recorded". Flag bit 0 records that
+sign names were Sanskrit (Mesha) rather than English (Aries) so decoding
+gives the same spelling back.
+
+Pinecone metadata cannot hold integer arrays, hence base64. Fields the codec
+cannot represent (unrecognized names, birth details, yogas, userId, ...)
+stay as ordinary metadata fields, so decode(encode(m)) only normalizes
+spelling and number types.
+"""
+
+import base64
+from typing import Optional, Dict, Any, List
+
+from jyotish_constants import RASHIS, NAKSHATRAS, PLANETS, normalize_rashi, normalize_nakshatra
+
+CHART_SCHEMA_VERSION = 1
+PACKED_FIELD = "chart_packed"
+SCHEMA_FIELD = "chart_schema"
+
+_FLAG_SANSKRIT = 1
+_HEADER_SIZE = 9
+_PACKED_SIZE = _HEADER_SIZE + 3 * len(PLANETS)
+
+_ZODIAC_KEYS = [zodiac for zodiac, _, _ in RASHIS]
+_PLANET_NAMES = [planet.capitalize() for planet in PLANETS]
+
+_TRUE_VALUES = {"true", "yes", "1"}
+_FALSE_VALUES = {"false", "no", "0"}
+
+
+# ============================================
+# FIELD CODECS
+# Each returns 0 when the value cannot be packed, which leaves the field loose.
+# ============================================
+
+def _sign_code(value: Any) -> int:
+    zodiac = normalize_rashi(str(value)) if isinstance(value, str) else None
+    return _ZODIAC_KEYS.index(zodiac) + 1 if zodiac else 0
+
+
+def _is_sanskrit(value: Any) -> bool:
+    return isinstance(value, str) and any(value.strip().lower() == sanskrit.lower() for _, sanskrit, _ in RASHIS)
+
+
+def _small_int_code(value: Any, upper: int) -> int:
+    if isinstance(value, bool):
+        return 0
+    if isinstance(value, (int, float)) and float(value).is_integer():
+        number = int(value)
+    elif isinstance(value, str) and value.strip().isdigit():
+        number = int(value.strip())
+    else:
+        return 0
+    return number if 1 <= number <= upper else 0
+
+
+def _nakshatra_code(value: Any) -> int:
+    index = normalize_nakshatra(value) if isinstance(value, str) else None
+    return index + 1 if index is not None else 0
+
+
+def _planet_code(value: Any) -> int:
+    if not isinstance(value, str):
+        return 0
+    key = value.strip().lower()
+    return PLANETS.index(key) + 1 if key in PLANETS else 0
+
+
+def _manglik_code(value: Any) -> int:
+    if isinstance(value, bool):
+        return 2 if value else 1
+    if isinstance(value, str):
+        if value.strip().lower() in _TRUE_VALUES:
+            return 2
+        if value.strip().lower() in _FALSE_VALUES:
+            return 1
+    return 0
+
+
+def _sign_name(code: int, sanskrit: bool) -> str:
+    zodiac, sanskrit_name, _ = RASHIS[code - 1]
+    return sanskrit_name if sanskrit else zodiac.capitalize()
+
+
+# ============================================
+# ENCODE / DECODE
+# ============================================
+
+def _field_layout() -> List[tuple]:
+    """(metadata field, byte offset, encoder) for every packable field."""
+    layout = [
+        ("lagna", 2, _sign_code),
+        ("rashi", 3, _sign_code),
+        ("nakshatra", 4, _nakshatra_code),
+        ("nakshatraPada", 5, lambda v: _small_int_code(v, 4)),
+        ("mahadasha", 6, _planet_code),
+        ("antardasha", 7, _planet_code),
+        ("manglik", 8, _manglik_code),
+    ]
+    for i, planet in enumerate(PLANETS):
+        base = _HEADER_SIZE + 3 * i
+        layout.append((f"{planet}_sign", base, _sign_code))
+        layout.append((f"{planet}_house", base + 1, lambda v: _small_int_code(v, 12)))
+        layout.append((f"{planet}_nakshatra", base + 2, _nakshatra_code))
+    return layout
+
+
+_LAYOUT = _field_layout()
+# Every chart field the codec knows, for callers that whitelist chart metadata
+CHART_FIELDS = tuple(field for field, _, _ in _LAYOUT)
+_SIGN_FIELDS = {field for field, _, encoder in _LAYOUT if encoder is _sign_code}
+
+
+def is_packed(metadata: Optional[Dict[str, Any]]) -> bool:
+    return bool(metadata) and PACKED_FIELD in metadata
+
+
+def encode_chart(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return chart metadata with packable fields replaced by `chart_packed`.
+
+    Already-packed or non-chart metadata is returned unchanged.
+    """
+    if is_packed(metadata) or metadata.get("data_type", "chart") != "chart":
+        return metadata
+
+    # One naming style per chart; signs spelled the other way stay loose
+    signs = [metadata[f] for f in _SIGN_FIELDS if f in metadata]
+    sanskrit = sum(_is_sanskrit(v) for v in signs) * 2 > len(signs)
+
+    packed = bytearray(_PACKED_SIZE)
+    packed[0] = CHART_SCHEMA_VERSION
+    packed[1] = _FLAG_SANSKRIT if sanskrit else 0
+    loose = dict(metadata)
+    for field, offset, encoder in _LAYOUT:
+        if field not in metadata:
+            continue
+        code = encoder(metadata[field])
+        if code and (field not in _SIGN_FIELDS or _is_sanskrit(metadata[field]) == sanskrit):
+            packed[offset] = code
+            del loose[field]
+
+    if len(loose) == len(metadata):
+        return metadata
+    loose[PACKED_FIELD] = base64.b64encode(bytes(packed)).decode("ascii")
+    loose[SCHEMA_FIELD] = CHART_SCHEMA_VERSION
+    return loose
+
+
+def decode_chart(metadata: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Expand `chart_packed` back into loose fields; other metadata is returned as is."""
+    if not is_packed(metadata):
+        return metadata
+    packed = base64.b64decode(metadata[PACKED_FIELD])
+    version = packed[0]
+    if version != CHART_SCHEMA_VERSION:
+        raise ValueError(f"Unsupported chart schema version {version}")
+    sanskrit = bool(packed[1] & _FLAG_SANSKRIT)
+
+    chart = {k: v for k, v in metadata.items() if k not in (PACKED_FIELD, SCHEMA_FIELD)}
+    for field, offset, encoder in _LAYOUT:
+        code = packed[offset]
+        if not code:
+            continue
+        if encoder is _sign_code:
+            chart[field] = _sign_name(code, sanskrit)
+        elif encoder is _nakshatra_code:
+            chart[field] = NAKSHATRAS[code - 1][0]
+        elif encoder is _planet_code:
+            chart[field] = _PLANET_NAMES[code - 1]
+        elif encoder is _manglik_code:
+            chart[field] = code == 2
+        else:
+            chart[field] = code
+    return chart
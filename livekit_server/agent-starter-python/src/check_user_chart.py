@@ -7,6 +7,7 @@ import os
 import asyncio
 from pathlib import Path
 from dotenv import load_dotenv
+from chart_codec import decode_chart
 from pinecone_kundli_retriever import KundliRetriever
 
 # Load environment variables
@@ -26,7 +27,8 @@ async def check_user_data(user_id: str):
         
         # Get user's Kundli
         print(f"\n🔍 Fetching Kundli for: {user_id}")
-        kundli = await retriever.get_user_kundli(user_id)
+        # Expand chart_packed so the fields print by name (a no-op for loose charts)
+        kundli = decode_chart(await retriever.get_user_kundli(user_id))
         
         if kundli:
             print(f"\n✅ FOUND CHART DATA")
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Embedding service shared by everything that writes vectors to Pinecone.
+
+- One reused AsyncOpenAI client per process
+- Content-addressed cache on local disk (SQLite): the key is a hash of the
+  model and the exact text, so re-saving unchanged data never calls the API.
+  Reads and writes run on a worker thread; oldest entries are dropped above
+  EMBEDDING_CACHE_MAX_ENTRIES
+- Micro-batcher: concurrent embed() calls made within a few milliseconds of
+  each other are sent as a single embeddings.create request
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from array import array
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Iterable, Set, Tuple
+
+logger = logging.getLogger("embedding_service")
+
+DEFAULT_MODEL = "text-embedding-3-small"
+# OpenAI accepts at most 2048 inputs per embeddings request
+MAX_API_BATCH = 2048
+# ~300 MB of 1536-d vectors
+DEFAULT_CACHE_MAX_ENTRIES = 50000
+
+_DEFAULT_CACHE_PATH = Path(__file__).resolve().parent / "cache" / "embeddings.sqlite"
+
+
+def content_key(model: str, text: str) -> str:
+    """Cache key for one text under one model."""
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent key -> vector store.
+
+    Vectors are stored as float32 blobs (6 KB for a 1536-d embedding).
+    Above `max_entries` the oldest written entries are deleted.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_entries: Optional[int] = None):
+        self.path = Path(path or os.getenv("EMBEDDING_CACHE_PATH", _DEFAULT_CACHE_PATH))
+        self.max_entries = max_entries or int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", DEFAULT_CACHE_MAX_ENTRIES))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        keys = list(keys)
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+        return found
+
+    def set_many(self, items: Dict[str, List[float]]):
+        if not items:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, array("f", vector).tobytes()) for key, vector in items.items()],
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            if count > self.max_entries:
+                # Trim to 90% so the next writes do not trim again; rowid follows write order
+                excess = count - int(self.max_entries * 0.9)
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE rowid IN (SELECT rowid FROM embeddings ORDER BY rowid LIMIT ?)",
+                    (excess,),
+                )
+                logger.info(f"Embedding cache trimmed by {excess} entries")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class EmbeddingService:
+    """
+    Cached, batched text embeddings.
+
+    Usage:
+        service = get_embedding_service()
+        vector = await service.embed("Birth chart for ...")
+        vectors = await service.embed_many(texts)
+    """
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        client=None,
+        cache: Optional[EmbeddingCache] = None,
+        max_batch: Optional[int] = None,
+        max_wait: Optional[float] = None,
+    ):
+        """
+        Args:
+            model: Embedding model (default EMBEDDING_MODEL or text-embedding-3-small)
+            client: AsyncOpenAI-compatible client; created on first use if omitted
+            cache: Vector cache (default: SQLite file under src/cache)
+            max_batch: Most texts per API request (default EMBEDDING_MAX_BATCH or 256)
+            max_wait: Seconds to wait for more requests before sending a batch
+        """
+        self.model = model or os.getenv("EMBEDDING_MODEL", DEFAULT_MODEL)
+        self._client = client
+        self.cache = cache if cache is not None else EmbeddingCache()
+        self.max_batch = min(max_batch or int(os.getenv("EMBEDDING_MAX_BATCH", "256")), MAX_API_BATCH)
+        self.max_wait = max_wait if max_wait is not None else float(os.getenv("EMBEDDING_MAX_WAIT", "0.01"))
+
+        # Texts waiting for the next batch, and the future each caller awaits
+        self._queue: List[Tuple[str, str]] = []
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # Running _send tasks; the loop only keeps weak references
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.stats = {"cache_hits": 0, "cache_misses": 0, "api_calls": 0, "texts_embedded": 0}
+
+    @property
+    def client(self):
+        if self._client is None:
+            from openai import AsyncOpenAI
+            self._client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        return self._client
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed a single text."""
+        return (await self.embed_many([text]))[0]
+
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts, preserving order.
+
+        Cached texts are answered from disk; the rest join the current batch.
+        Identical texts already in flight share one result.
+        """
+        loop = asyncio.get_running_loop()
+        keys = [content_key(self.model, text) for text in texts]
+        # SQLite on a worker thread: a cold page read must not stall the audio loop
+        vectors = await loop.run_in_executor(None, self.cache.get_many, set(keys))
+
+        waiting: Dict[str, asyncio.Future] = {}
+        for key, text in zip(keys, texts):
+            if key in vectors or key in waiting:
+                continue
+            future = self._pending.get(key)
+            if future is None:
+                future = loop.create_future()
+                self._pending[key] = future
+                self._queue.append((key, text))
+            waiting[key] = future
+
+        self.stats["cache_hits"] += len(keys) - len(waiting)
+        self.stats["cache_misses"] += len(waiting)
+
+        if len(self._queue) >= self.max_batch:
+            self._flush()
+        elif self._queue and self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+
+        if waiting:
+            # shield: one caller being cancelled must not fail the shared batch
+            results = await asyncio.gather(*[asyncio.shield(f) for f in waiting.values()])
+            vectors.update(zip(waiting.keys(), results))
+        return [vectors[key] for key in keys]
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        while self._queue:
+            batch, self._queue = self._queue[:self.max_batch], self._queue[self.max_batch:]
+            task = asyncio.ensure_future(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: List[Tuple[str, str]]):
+        try:
+            self.stats["api_calls"] += 1
+            response = await self.client.embeddings.create(
+                input=[text for _, text in batch],
+                model=self.model,
+            )
+            # Results come back with an index into the input list
+            ordered = sorted(response.data, key=lambda item: item.index)
+            vectors = {key: list(item.embedding) for (key, _), item in zip(batch, ordered)}
+            self.stats["texts_embedded"] += len(vectors)
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self.cache.set_many, vectors)
+            except Exception as e:
+                logger.warning(f"Could not write embedding cache: {e}")
+            for key, vector in vectors.items():
+                future = self._pending.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_result(vector)
+        except Exception as e:
+            logger.error(f"Embedding request for {len(batch)} texts failed: {e}")
+            for key, _ in batch:
+                future = self._pending.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
+
+
+class HashingEmbedder:
+    """
+    Deterministic offline embedder with the EmbeddingService interface.
+
+    Vectors are derived from a hash of the text, so they carry no meaning;
+    use it only for dry runs and tests against a local index.
+    """
+
+    def __init__(self, dimension: int = 1536):
+        self.dimension = dimension
+
+    def _vector(self, text: str) -> List[float]:
+        seed = hashlib.sha256(text.encode("utf-8")).digest()
+        raw = (seed * (self.dimension * 4 // len(seed) + 1))[:self.dimension * 4]
+        values = array("i", raw)
+        norm = sum(v * v for v in values) ** 0.5 or 1.0
+        return [v / norm for v in values]
+
+    async def embed(self, text: str) -> List[float]:
+        return self._vector(text)
+
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        return [self._vector(text) for text in texts]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {}
+
+
+# Singleton instance
+_service_instance: Optional[EmbeddingService] = None
+
+
+def get_embedding_service() -> EmbeddingService:
+    """Get singleton embedding service instance."""
+    global _service_instance
+    if _service_instance is None:
+        _service_instance = EmbeddingService()
+    return _service_instance
@@ -7,7 +7,8 @@ import os
 import asyncio
 from pathlib import Path
 from dotenv import load_dotenv
-from pinecone import Pinecone
+from chart_codec import decode_chart
+from local_index import open_index
 
 # Load environment variables
 env_path = Path(__file__).resolve().parent.parent / ".env.local"
@@ -20,8 +21,7 @@ async def find_complete_charts():
     print("SEARCHING FOR USERS WITH COMPLETE CHART DATA")
     print("=" * 70)
     
-    pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
-    index = pc.Index(os.getenv("PINECONE_INDEX"))
+    index = open_index(os.getenv("PINECONE_INDEX"))
     
     # Sample vectors to find charts
     print("\n🔍 Sampling vectors from database...")
@@ -44,7 +44,7 @@ async def find_complete_charts():
         charts_by_completeness = []
         
         for match in result.matches:
-            metadata = match.metadata
+            metadata = decode_chart(match.metadata) or {}
             user_id = metadata.get('userId', 'N/A')
             
             # Count how many astrology fields are present and not "Unknown"
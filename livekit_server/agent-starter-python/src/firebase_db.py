@@ -1,8 +1,16 @@
 import firebase_admin
 from firebase_admin import credentials, firestore
+import asyncio
 import os
 import logging
 from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+try:
+    from .firestore_executor import get_firestore_executor
+except ImportError:
+    from firestore_executor import get_firestore_executor
 
 logger = logging.getLogger("firebase_db")
 
@@ -110,6 +118,7 @@ class FirebaseDB:
         except Exception as e:
             logger.error(f"Failed to get tracks: {e}")
             return []
+
     def get_satsang_plan(self, plan_id: str):
         """Get a pre-generated satsang plan."""
         if not self.db:
@@ -123,3 +132,32 @@ class FirebaseDB:
         except Exception as e:
             logger.error(f"Failed to get satsang plan: {e}")
             return None
+
+
+class AsyncFirebaseDB:
+    """
+    Non-blocking facade over FirebaseDB for use inside agents.
+
+    Reads run on the dedicated Firestore thread pool.
+    """
+
+    def __init__(self, sync_db: Optional[FirebaseDB] = None):
+        self._sync = sync_db or FirebaseDB()
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_firestore_executor(), fn, *args)
+
+    async def get_satsang_plan(self, plan_id: str):
+        """Get a pre-generated satsang plan."""
+        return await self._run(self._sync.get_satsang_plan, plan_id)
+
+
+_async_db: Optional[AsyncFirebaseDB] = None
+
+
+def get_async_firebase_db() -> AsyncFirebaseDB:
+    global _async_db
+    if _async_db is None:
+        _async_db = AsyncFirebaseDB()
+    return _async_db
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Thread pool for the synchronous Firestore client.
+
+Agents run Firestore reads and listener setup here instead of on the
+default executor, so a slow Firestore call never queues behind other
+blocking work (or the other way round).
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+# The Firestore Python client is synchronous; all its calls run on this pool
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_firestore_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("FIRESTORE_MAX_WORKERS", "4")),
+            thread_name_prefix="firestore",
+        )
+    return _executor
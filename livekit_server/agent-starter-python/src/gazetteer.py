@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+"""
+Offline gazetteer for resolving birth places to coordinates and timezones.
+
+City data is bundled in data/cities.tsv. On first use it is compiled into a
+compact binary index (sorted name keys for exact/prefix search plus a
+trigram posting table for fuzzy search) under cache/, which is then
+memory-mapped read-only so forked agent workers share the same pages.
+
+Timezone offsets are resolved from the IANA database for the actual birth
+date, so historical changes (e.g. India's +6:30 war time in 1942-45) are
+handled.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import unicodedata
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger("gazetteer")
+
+_SRC_DIR = Path(__file__).resolve().parent
+_DEFAULT_SOURCE_PATH = _SRC_DIR / "data" / "cities.tsv"
+_DEFAULT_INDEX_PATH = _SRC_DIR / "cache" / "gazetteer.idx"
+
+_MAGIC = b"GAZIDX01"
+# magic, source size, source mtime, record/key/gram counts, section offsets
+_HEADER = struct.Struct("<8sQdIIIQQQQQ")
+# latitude, longitude, population, name, country, admin1, timezone string offsets
+_RECORD = struct.Struct("<ddIIIII")
+# key string offset, record index, distinct trigram count
+_KEY = struct.Struct("<III")
+# trigram hash, first posting, posting count
+_GRAM = struct.Struct("<III")
+_POSTING = struct.Struct("<I")
+_STRLEN = struct.Struct("<H")
+
+FUZZY_THRESHOLD = 0.45
+# resolve() answers None below this: "Sitapur" is not Anantapur (0.45)
+MIN_CONFIDENCE = 0.5
+
+COUNTRY_NAMES: Dict[str, List[str]] = {
+    "IN": ["India", "Bharat", "Hindustan", "भारत", "हिंदुस्तान"],
+    "PK": ["Pakistan", "पाकिस्तान"],
+    "BD": ["Bangladesh", "बांग्लादेश"],
+    "NP": ["Nepal", "नेपाल"],
+    "BT": ["Bhutan", "भूटान"],
+    "LK": ["Sri Lanka", "Ceylon", "श्रीलंका"],
+    "MV": ["Maldives", "मालदीव"],
+    "AF": ["Afghanistan", "अफगानिस्तान"],
+    "MM": ["Myanmar", "Burma", "म्यांमार"],
+    "AE": ["United Arab Emirates", "UAE", "Emirates", "यूएई"],
+    "OM": ["Oman", "ओमान"],
+    "QA": ["Qatar", "कतर"],
+    "SA": ["Saudi Arabia", "Saudi", "सऊदी अरब"],
+    "KW": ["Kuwait", "कुवैत"],
+    "BH": ["Bahrain", "बहरीन"],
+    "IR": ["Iran", "ईरान"],
+    "SG": ["Singapore", "सिंगापुर"],
+    "MY": ["Malaysia", "मलेशिया"],
+    "TH": ["Thailand", "थाईलैंड"],
+    "ID": ["Indonesia", "इंडोनेशिया"],
+    "HK": ["Hong Kong"],
+    "CN": ["China", "चीन"],
+    "JP": ["Japan", "जापान"],
+    "KR": ["South Korea", "Korea", "कोरिया"],
+    "PH": ["Philippines", "फिलीपींस"],
+    "AU": ["Australia", "ऑस्ट्रेलिया"],
+    "NZ": ["New Zealand", "न्यूज़ीलैंड"],
+    "FJ": ["Fiji", "फिजी"],
+    "GB": ["United Kingdom", "UK", "England", "Britain", "Great Britain", "Scotland", "इंग्लैंड", "ब्रिटेन"],
+    "IE": ["Ireland", "आयरलैंड"],
+    "FR": ["France", "फ्रांस"],
+    "DE": ["Germany", "जर्मनी"],
+    "NL": ["Netherlands", "Holland", "नीदरलैंड"],
+    "BE": ["Belgium", "बेल्जियम"],
+    "CH": ["Switzerland", "स्विट्ज़रलैंड"],
+    "IT": ["Italy", "इटली"],
+    "ES": ["Spain", "स्पेन"],
+    "PT": ["Portugal", "पुर्तगाल"],
+    "AT": ["Austria", "ऑस्ट्रिया"],
+    "SE": ["Sweden", "स्वीडन"],
+    "NO": ["Norway", "नॉर्वे"],
+    "DK": ["Denmark", "डेनमार्क"],
+    "FI": ["Finland", "फिनलैंड"],
+    "PL": ["Poland", "पोलैंड"],
+    "CZ": ["Czech Republic", "Czechia"],
+    "GR": ["Greece", "ग्रीस"],
+    "TR": ["Turkey", "Turkiye", "तुर्की"],
+    "RU": ["Russia", "रूस"],
+    "EG": ["Egypt", "मिस्र"],
+    "KE": ["Kenya", "केन्या"],
+    "TZ": ["Tanzania", "तंज़ानिया"],
+    "UG": ["Uganda", "युगांडा"],
+    "ZA": ["South Africa", "दक्षिण अफ्रीका"],
+    "NG": ["Nigeria", "नाइजीरिया"],
+    "MU": ["Mauritius", "मॉरीशस"],
+    "US": ["United States", "USA", "US", "America", "अमेरिका"],
+    "CA": ["Canada", "कनाडा"],
+    "MX": ["Mexico", "मेक्सिको"],
+    "BR": ["Brazil", "ब्राज़ील"],
+    "AR": ["Argentina", "अर्जेंटीना"],
+    "TT": ["Trinidad and Tobago", "Trinidad", "त्रिनिदाद"],
+    "GY": ["Guyana", "गयाना"],
+    "SR": ["Suriname", "सूरीनाम"],
+}
+
+# Abbreviations commonly used for Indian states in "City, State" input
+ADMIN1_ALIASES: Dict[str, str] = {
+    "up": "Uttar Pradesh",
+    "mp": "Madhya Pradesh",
+    "ap": "Andhra Pradesh",
+    "hp": "Himachal Pradesh",
+    "tn": "Tamil Nadu",
+    "wb": "West Bengal",
+    "mh": "Maharashtra",
+    "uk": "Uttarakhand",
+    "jk": "Jammu and Kashmir",
+    "j k": "Jammu and Kashmir",
+    "cg": "Chhattisgarh",
+    "ka": "Karnataka",
+    "gj": "Gujarat",
+    "rj": "Rajasthan",
+    "br": "Bihar",
+    "jh": "Jharkhand",
+    "od": "Odisha",
+    "orissa": "Odisha",
+    "ts": "Telangana",
+    "pb": "Punjab",
+    "hr": "Haryana",
+    "ncr": "Delhi",
+    "ny": "New York",
+    "nj": "New Jersey",
+    "ca": "California",
+    "tx": "Texas",
+    "on": "Ontario",
+    "bc": "British Columbia",
+}
+
+
+def normalize_place(text: str) -> str:
+    """
+    Normalize a place name for matching.
+
+    Latin diacritics are stripped ("São Paulo" -> "sao paulo") while
+    Devanagari vowel signs are kept, punctuation collapses to single spaces.
+    """
+    out = []
+    prev_base = ""
+    for ch in unicodedata.normalize("NFKD", text or ""):
+        if unicodedata.combining(ch) and prev_base and prev_base < "ɐ":
+            continue
+        if ch.isalnum() or unicodedata.category(ch).startswith("M"):
+            out.append(ch.lower())
+        else:
+            out.append(" ")
+        if not unicodedata.combining(ch):
+            prev_base = ch
+    return " ".join("".join(out).split())
+
+
+def _trigrams(key: str) -> List[int]:
+    padded = f" {key} "
+    return sorted({zlib.crc32(padded[i:i + 3].encode("utf-8")) for i in range(len(padded) - 2)})
+
+
+def _load_rows(source_path: Path) -> List[Dict[str, Any]]:
+    rows = []
+    with open(source_path, "r", encoding="utf-8") as f:
+        header = f.readline().rstrip("\n").split("\t")
+        for line in f:
+            line = line.rstrip("\n")
+            if not line or line.startswith("#"):
+                continue
+            row = dict(zip(header, line.split("\t")))
+            rows.append(row)
+    return rows
+
+
+def build_index(source_path: Path, index_path: Path):
+    """
+    Compile the TSV gazetteer into the binary index format.
+
+    Written to a temporary file and renamed into place so concurrent
+    workers never map a half-written index.
+    """
+    rows = _load_rows(source_path)
+    stat = source_path.stat()
+
+    strings = bytearray()
+    string_offsets: Dict[str, int] = {}
+
+    def add_string(value: str) -> int:
+        if value not in string_offsets:
+            encoded = value.encode("utf-8")
+            string_offsets[value] = len(strings)
+            strings.extend(_STRLEN.pack(len(encoded)))
+            strings.extend(encoded)
+        return string_offsets[value]
+
+    records = bytearray()
+    keys = set()
+    for record_id, row in enumerate(rows):
+        records.extend(_RECORD.pack(
+            float(row["latitude"]),
+            float(row["longitude"]),
+            int(row.get("population") or 0),
+            add_string(row["name"]),
+            add_string(row["country"]),
+            add_string(row.get("admin1", "")),
+            add_string(row["timezone"]),
+        ))
+        names = [row["name"]] + [n for n in row.get("alternate_names", "").split("|") if n]
+        for name in names:
+            key = normalize_place(name)
+            if key:
+                # Shared names (e.g. two Hyderabads) keep one entry per place
+                keys.add((key, record_id))
+
+    sorted_keys = sorted(keys, key=lambda k: (k[0].encode("utf-8"), k[1]))
+    key_table = bytearray()
+    postings_by_gram: Dict[int, List[int]] = {}
+    for key_id, (key, record_id) in enumerate(sorted_keys):
+        grams = _trigrams(key)
+        key_table.extend(_KEY.pack(add_string(key), record_id, len(grams)))
+        for gram in grams:
+            postings_by_gram.setdefault(gram, []).append(key_id)
+
+    gram_table = bytearray()
+    postings = bytearray()
+    posting_count = 0
+    for gram in sorted(postings_by_gram):
+        key_ids = postings_by_gram[gram]
+        gram_table.extend(_GRAM.pack(gram, posting_count, len(key_ids)))
+        for key_id in key_ids:
+            postings.extend(_POSTING.pack(key_id))
+        posting_count += len(key_ids)
+
+    off_records = _HEADER.size
+    off_keys = off_records + len(records)
+    off_grams = off_keys + len(key_table)
+    off_postings = off_grams + len(gram_table)
+    off_strings = off_postings + len(postings)
+    header = _HEADER.pack(
+        _MAGIC, stat.st_size, stat.st_mtime,
+        len(rows), len(sorted_keys), len(postings_by_gram),
+        off_records, off_keys, off_grams, off_postings, off_strings,
+    )
+
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        for section in (header, records, key_table, gram_table, postings, strings):
+            f.write(section)
+    os.replace(tmp_path, index_path)
+    logger.info(f"Built gazetteer index: {len(rows)} places, {len(sorted_keys)} names -> {index_path}")
+
+
+class Gazetteer:
+    """
+    Memory-mapped place index.
+
+    Lookups are binary searches and trigram posting scans directly over the
+    mapped bytes; nothing is deserialized up front.
+    """
+
+    def __init__(self, source_path: Optional[Path] = None, index_path: Optional[Path] = None):
+        self.source_path = Path(source_path or os.getenv("GAZETTEER_SOURCE_PATH", _DEFAULT_SOURCE_PATH))
+        self.index_path = Path(index_path or os.getenv("GAZETTEER_INDEX_PATH", _DEFAULT_INDEX_PATH))
+        self._ensure_index()
+
+        with open(self.index_path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            _, _, _,
+            self.n_records, self.n_keys, self.n_grams,
+            self._off_records, self._off_keys, self._off_grams, self._off_postings, self._off_strings,
+        ) = _HEADER.unpack_from(self._mm, 0)
+
+        self._country_aliases: Dict[str, str] = {}
+        for code, names in COUNTRY_NAMES.items():
+            self._country_aliases[code.lower()] = code
+            for name in names:
+                self._country_aliases[normalize_place(name)] = code
+        self._admin1_names: Optional[set] = None
+
+    def _ensure_index(self):
+        """Build the index if it is missing or older than the bundled TSV."""
+        try:
+            stat = self.source_path.stat()
+            with open(self.index_path, "rb") as f:
+                magic, size, mtime = _HEADER.unpack(f.read(_HEADER.size))[:3]
+            if magic == _MAGIC and size == stat.st_size and mtime == stat.st_mtime:
+                return
+        except (FileNotFoundError, struct.error):
+            pass
+        build_index(self.source_path, self.index_path)
+
+    # --- raw accessors over the mapped file ---
+
+    def _string(self, offset: int) -> str:
+        start = self._off_strings + offset
+        (length,) = _STRLEN.unpack_from(self._mm, start)
+        start += _STRLEN.size
+        return self._mm[start:start + length].decode("utf-8")
+
+    def _key(self, key_id: int) -> Tuple[str, int, int]:
+        str_off, record_id, gram_count = _KEY.unpack_from(self._mm, self._off_keys + key_id * _KEY.size)
+        return self._string(str_off), record_id, gram_count
+
+    def _key_bytes(self, key_id: int) -> bytes:
+        (str_off,) = struct.unpack_from("<I", self._mm, self._off_keys + key_id * _KEY.size)
+        start = self._off_strings + str_off
+        (length,) = _STRLEN.unpack_from(self._mm, start)
+        start += _STRLEN.size
+        return self._mm[start:start + length]
+
+    def _record(self, record_id: int) -> Dict[str, Any]:
+        lat, lon, population, name, country, admin1, tz = _RECORD.unpack_from(
+            self._mm, self._off_records + record_id * _RECORD.size
+        )
+        return {
+            "name": self._string(name),
+            "country": self._string(country),
+            "admin1": self._string(admin1),
+            "latitude": lat,
+            "longitude": lon,
+            "timezone": self._string(tz),
+            "population": population,
+        }
+
+    def _lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, self.n_keys
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _gram_postings(self, gram: int) -> List[int]:
+        lo, hi = 0, self.n_grams
+        while lo < hi:
+            mid = (lo + hi) // 2
+            (value,) = struct.unpack_from("<I", self._mm, self._off_grams + mid * _GRAM.size)
+            if value < gram:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self.n_grams:
+            return []
+        value, first, count = _GRAM.unpack_from(self._mm, self._off_grams + lo * _GRAM.size)
+        if value != gram:
+            return []
+        start = self._off_postings + first * _POSTING.size
+        return list(struct.unpack_from(f"<{count}I", self._mm, start))
+
+    # --- search ---
+
+    def _candidates(self, key: str, limit: int) -> Dict[int, float]:
+        """Score records for a normalized name: exact 1.0, prefix < 1.0, fuzzy by Dice."""
+        scores: Dict[int, float] = {}
+        encoded = key.encode("utf-8")
+
+        i = self._lower_bound(encoded)
+        while i < self.n_keys and len(scores) < limit:
+            candidate = self._key_bytes(i)
+            if not candidate.startswith(encoded):
+                break
+            _, record_id, _ = self._key(i)
+            score = 1.0 if candidate == encoded else 0.6 + 0.3 * len(encoded) / len(candidate)
+            scores[record_id] = max(scores.get(record_id, 0.0), score)
+            i += 1
+        if scores:
+            return scores
+
+        grams = _trigrams(key)
+        hits: Dict[int, int] = {}
+        for gram in grams:
+            for key_id in self._gram_postings(gram):
+                hits[key_id] = hits.get(key_id, 0) + 1
+        for key_id, shared in hits.items():
+            _, record_id, gram_count = self._key(key_id)
+            dice = 2.0 * shared / (len(grams) + gram_count)
+            if dice >= FUZZY_THRESHOLD:
+                scores[record_id] = max(scores.get(record_id, 0.0), dice * 0.9)
+        return scores
+
+    def _matches_qualifier(self, record: Dict[str, Any], qualifier: str) -> bool:
+        if self._country_aliases.get(qualifier) == record["country"]:
+            return True
+        admin1 = normalize_place(record["admin1"])
+        return admin1 == qualifier or normalize_place(ADMIN1_ALIASES.get(qualifier, "")) == admin1
+
+    def _is_region(self, qualifier: str) -> bool:
+        """True if qualifier names a country or state we know (not a district or typo)."""
+        if qualifier in self._country_aliases or qualifier in ADMIN1_ALIASES:
+            return True
+        if self._admin1_names is None:
+            self._admin1_names = {normalize_place(self._record(i)["admin1"]) for i in range(self.n_records)}
+        return qualifier in self._admin1_names
+
+    def lookup(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Find places matching free text such as "Mumbai", "Banaras, UP" or
+        "Brampton, Canada".
+
+        Returns:
+            Matching place dicts (best first), each with a "score" in 0..1
+        """
+        parts = [normalize_place(p) for p in (query or "").split(",")]
+        parts = [p for p in parts if p]
+        if not parts:
+            return []
+        name, qualifiers = parts[0], parts[1:]
+
+        scores = self._candidates(name, limit=50)
+        if not qualifiers and " " in name:
+            # "Varanasi India" without a comma: retry with the last word as qualifier
+            head, tail = name.rsplit(" ", 1)
+            if tail in self._country_aliases or not any(s == 1.0 for s in scores.values()):
+                head_scores = self._candidates(head, limit=50)
+                if head_scores and max(head_scores.values()) >= max(scores.values(), default=0.0):
+                    scores, qualifiers = head_scores, [tail]
+
+        results = []
+        for record_id, score in scores.items():
+            record = self._record(record_id)
+            if qualifiers:
+                matches = [self._matches_qualifier(record, q) for q in qualifiers]
+                if any(not ok and self._is_region(q) for q, ok in zip(qualifiers, matches)):
+                    # "Hyderabad, Pakistan" is not Hyderabad, India
+                    continue
+                matched = sum(matches)
+                score = min(1.0, score + 0.05 * matched) if matched else score * 0.8
+            record["score"] = round(score, 3)
+            results.append(record)
+        results.sort(key=lambda r: (r["score"], r["population"]), reverse=True)
+        return results[:limit]
+
+    def resolve(self, query: str) -> Optional[Dict[str, Any]]:
+        """Best single match for a place, or None if nothing is close enough."""
+        results = self.lookup(query, limit=1)
+        if not results or results[0]["score"] < MIN_CONFIDENCE:
+            return None
+        return results[0]
+
+
+def timezone_offset(tz_name: str, local_dt: datetime) -> float:
+    """
+    UTC offset in hours for a wall-clock time in an IANA timezone.
+
+    Uses the offset in force on that date, so a 1943 birth in Kolkata
+    gets +6.5 and a summer birth in London gets +1.
+    """
+    offset = local_dt.replace(tzinfo=ZoneInfo(tz_name)).utcoffset()
+    return offset.total_seconds() / 3600.0
+
+
+def resolve_birth_place(
+    place: str,
+    birth_date: Optional[str] = None,
+    birth_time: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Resolve a birth place to the lat/lon/tzone astrology endpoints need.
+
+    Args:
+        place: Free-text place (e.g. "Mumbai, India")
+        birth_date: DD/MM/YYYY or YYYY-MM-DD; today if omitted
+        birth_time: HH:MM (24-hour); noon if omitted
+
+    Returns:
+        Dict with place, latitude, longitude, timezone (IANA) and tzone
+        (offset hours), or None if the place is not recognized
+    """
+    try:
+        match = get_gazetteer().resolve(place)
+    except Exception as e:
+        logger.error(f"Gazetteer lookup failed for '{place}': {e}")
+        return None
+    if not match:
+        logger.warning(f"Could not resolve place: {place}")
+        return None
+
+    local_dt = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+    if birth_date:
+        for fmt in ("%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y"):
+            try:
+                local_dt = datetime.strptime(birth_date.strip(), fmt).replace(hour=12)
+                break
+            except ValueError:
+                continue
+    if birth_time:
+        try:
+            parsed = datetime.strptime(birth_time.strip(), "%H:%M")
+            local_dt = local_dt.replace(hour=parsed.hour, minute=parsed.minute)
+        except ValueError:
+            pass
+
+    country = COUNTRY_NAMES.get(match["country"], [match["country"]])[0]
+    label = ", ".join(p for p in (match["name"], match["admin1"], country) if p)
+    return {
+        "place": label,
+        "latitude": round(match["latitude"], 4),
+        "longitude": round(match["longitude"], 4),
+        "timezone": match["timezone"],
+        "tzone": timezone_offset(match["timezone"], local_dt),
+    }
+
+
+# Singleton instance
+_gazetteer_instance = None
+
+
+def get_gazetteer() -> Gazetteer:
+    """Get singleton gazetteer instance."""
+    global _gazetteer_instance
+    if _gazetteer_instance is None:
+        _gazetteer_instance = Gazetteer()
+    return _gazetteer_instance
@@ -21,10 +21,10 @@ from livekit.agents import (
     RunContext,
 )
 try:
-    from .firebase_db import FirebaseDB
+    from .satsang_plan_cache import get_satsang_plan_cache
 except ImportError:
     # Fallback for when running as a script
-    from firebase_db import FirebaseDB
+    from satsang_plan_cache import get_satsang_plan_cache
 # from livekit.plugins import noise_cancellation, silero
 
 # Configure logging
@@ -585,6 +585,21 @@ async def entrypoint(ctx: JobContext):
                 all_participants = list(ctx.room.remote_participants.values())
                 logger.info(f"🔍 Participants: {[p.identity for p in all_participants]}")
                 
+                # Start loading any satsang plan right away; it completes while
+                # metadata parsing and STT setup run
+                for participant in all_participants:
+                    try:
+                        md = json.loads(participant.metadata) if participant.metadata else {}
+                    except ValueError:
+                        continue
+                    if md.get('planId') or md.get('satsang_plan'):
+                        embedded_plan = md.get('satsang_plan') or None
+                        get_satsang_plan_cache().prefetch(
+                            md.get('planId') or (embedded_plan or {}).get('id'),
+                            md.get('guruId'),
+                            embedded_plan,
+                        )
+                
                 for participant in all_participants:
                     logger.info(f"🔍 Checking participant: {participant.identity}")
                     
@@ -666,85 +681,7 @@ async def entrypoint(ctx: JobContext):
             except:
                 pass
 
-    hosted_instructions = None
-
-    # If we have ID but no full plan, try DB (Fallback)
-    if plan_id and not satsang_plan:
-        logger.info(f"Loading satsang plan {plan_id} from DB...")
-        try:
-            db = FirebaseDB()
-            satsang_plan = db.get_satsang_plan(plan_id)
-        except Exception as e:
-            logger.error(f"❌ Failed to load plan from DB: {e}")
-
-    if satsang_plan:
-        logger.info("✅ Satsang Plan loaded successfully")
-        
-        # CALCULATE INSTRUCTIONS FOR HOSTED MODE
-        logger.info("🔒 Activating STRICT HOSTED SATSANG MODE")
-        
-        # Load profile specific details for persona injection
-        try:
-            profile_path = Path(__file__).parent / "guru_profiles" / f"{guru_id}.json"
-            if profile_path.exists():
-                with open(profile_path, 'r', encoding='utf-8') as f:
-                    guru_profile = json.load(f)
-            else:
-                 guru_profile = {}
-        except:
-            guru_profile = {}
-
-        guru_name_display = guru_profile.get('name', guru_id.replace('_', ' ').title())
-        guru_tone = guru_profile.get('personality', {}).get('tone', 'Wise and compassionate')
-        guru_philosophy = guru_profile.get('teachings', {}).get('core_philosophy', 'Spiritual wisdom')
-        guru_signature = guru_profile.get('personality', {}).get('signature_phrases', ["Om Shanti"])[0]
-
-        intro_text = satsang_plan.get('intro_text', '')
-        bhajan_query = satsang_plan.get('bhajan_query', '')
-        pravachan_points = satsang_plan.get('pravachan_points', [])
-        closing_text = satsang_plan.get('closing_text', '')
-        bhajan_title = satsang_plan.get('bhajan_title', bhajan_query)
-        bhajan_vid = satsang_plan.get('bhajan_video_id', '')
-
-        pravachan_text = "\\n".join([f"- {p}" for p in pravachan_points])
-
-        hosted_instructions = f"""
-IMPORTANT: YOU ARE IN **HOSTED SATSANG MODE**.
-You are NOT a general assistant. You are executing a formal spiritual session.
-
-IDENTITY & PERSONA (MAINTAIN AT ALL TIMES):
-- You are **{guru_name_display}**.
-- Core Philosophy: {guru_philosophy}
-- Tone: {guru_tone}
-- Speak as {guru_name_display} would, using first-person perspective.
-- Even while following the plan below, embody the wisdom, warmth, and specific style of your character.
-- Signature closing/blessing if appropriate: "{guru_signature}"
-
-SESSION TOPIC: {satsang_plan.get('topic', 'Satsang')}
-
---- HOSTED SESSION RULES ---
-1. **SILENCE ON CONNECT**: Do NOT say "Namaste" or "Hello" when you join. Wait specifically for the 'START' signal from the host.
-2. **STRICT PHASE EXECUTION**:
-   - **INTRO**: When the session starts (you receive START signal), read the INTRO text below with warmth.
-   - **BHAJAN**: When asked for bhajan, play exactly: "{bhajan_title}" (ID: {bhajan_vid}).
-   - **PRAVACHAN**: Deliver the discourse points below. Expand on them using your unique persona ({guru_name_display}) and philosophy.
-   - **CLOSING**: End with the closing message.
-3. **NO SMALL TALK**: Do not ask "How are you?" or "What else can I do?". You are the Guru delivering a sermon.
-
---- CONTENT TO DELIVER ---
-INTRO TEXT:
-"{intro_text}"
-
-PRAVACHAN POINTS (Discourse) - EXPAND ON THESE AS {guru_name_display}:
-{pravachan_text}
-
-CLOSING TEXT:
-"{closing_text}"
-"""
-    else:
-         pass # No instructions needed for non-hosted mode yet, or logic handled elsewhere
-
-    logger.info(f"✅ Final configuration: Guru={guru_id}, Language={user_language}, Plan={bool(satsang_plan)}")
+    logger.info(f"✅ Final configuration: Guru={guru_id}, Language={user_language}, Plan={bool(plan_id or satsang_plan)}")
     
     # Initialize STT based on detected language
     # Use Sarvam for Hindi (best for Indian languages) with AssemblyAI fallback
@@ -783,6 +720,22 @@ CLOSING TEXT:
         stt = inference.STT(model="assemblyai/universal-streaming", language="en")
 
 
+    hosted_instructions = None
+    plan_entry = None
+
+    # Plan, resolved bhajan and hosted instructions come from the plan cache
+    # (usually already loaded by the prefetch above)
+    if plan_id or satsang_plan:
+        plan_entry = await get_satsang_plan_cache().get(plan_id, guru_id, satsang_plan)
+        satsang_plan = plan_entry["plan"] if plan_entry else None
+
+    if satsang_plan:
+        logger.info("✅ Satsang Plan loaded successfully")
+        logger.info("🔒 Activating STRICT HOSTED SATSANG MODE")
+
+        hosted_instructions = plan_entry["instructions"][guru_id]
+        intro_text = satsang_plan.get('intro_text', '')
+
     # Create agent with the correct guru and instructions
     final_agent = HinduismAgent(
         guru_id=guru_id,
@@ -841,8 +794,10 @@ CLOSING TEXT:
             # 1. Speak Intro
             await session.say(intro_text)
             
-            # 2. Auto-play Bhajan
-            if 'bhajan_vid' in locals() and bhajan_vid:
+            # 2. Auto-play Bhajan (a slow YouTube lookup may have finished during the intro)
+            bhajan_title = plan_entry["bhajan"]["title"]
+            bhajan_vid = plan_entry["bhajan"]["video_id"]
+            if bhajan_vid:
                 logger.info(f"🎶 Auto-playing Bhajan: {bhajan_vid}")
                 # We can trigger the tool-like behavior directly or instruct the agent
                 # Direct trigger is safer for hosted mode
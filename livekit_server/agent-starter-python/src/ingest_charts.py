@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Bulk chart ingestion into Pinecone.
+
+Streams chart records from a JSONL file, a JSON export (a list of records or
+a {document_id: record} map as written by Firestore export tools) or a live
+Firestore collection. Records are embedded in batches and upserted 100 vectors
+at a time, with several upserts in flight. Progress is checkpointed after
+every batch, so an interrupted run resumes where it stopped.
+
+Each record needs a userId (or uid/id). Only chart and birth fields become
+the chart document's metadata, the same as KundliRetriever.save_basic_chart
+writes; everything else on a user record (email, phone, name, ...) is left out.
+
+Usage:
+    python src/ingest_charts.py charts.jsonl
+    python src/ingest_charts.py users_export.json --batch-size 100 --concurrency 4
+    python src/ingest_charts.py --firestore users
+    python src/ingest_charts.py charts.jsonl --local        # in-memory index, offline embeddings
+    python src/ingest_charts.py charts.jsonl --restart      # ignore the checkpoint
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from functools import partial
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Iterable, Iterator, Tuple
+
+from dotenv import load_dotenv
+
+from chart_codec import CHART_FIELDS, encode_chart
+from embedding_service import HashingEmbedder, get_embedding_service
+from local_index import InMemoryIndex, open_index
+from pinecone_kundli_retriever import chart_embedding_text, document_id
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+)
+logger = logging.getLogger("ingest_charts")
+
+# Load environment variables
+env_path = Path(__file__).resolve().parent.parent / ".env.local"
+load_dotenv(str(env_path))
+
+_DEFAULT_CHECKPOINT = Path(__file__).resolve().parent / "cache" / "ingest_checkpoint.json"
+
+# Pinecone's recommended upsert size for 1536-d vectors (stays under the 2 MB request limit)
+DEFAULT_BATCH_SIZE = 100
+UPSERT_ATTEMPTS = 3
+UPSERT_RETRY_DELAY = 1.0  # seconds, doubled per attempt
+
+_ID_FIELDS = ("userId", "uid", "id")
+_NESTED_CHART_FIELDS = ("chart", "kundli", "birthChart")
+
+# Metadata whitelist. User records carry PII that must not reach the vector store.
+_BIRTH_FIELDS = ("birthDate", "birthTime", "birthPlace", "latitude", "longitude", "timezone", "tzone")
+_CHART_EXTRA_FIELDS = ("ascendant", "yogas", "chart_packed", "chart_schema")
+_SECTION_KEY_FIELDS = ("data_type", "planet_name", "house_number", "dasha_system", "dosha_name")
+# Computed fields of planet/house/dasha/dosha documents
+_SECTION_FIELDS = (
+    "sign", "house", "nakshatra", "nakshatra_pada", "degree", "lord", "is_retro",
+    "planets", "mahadasha", "antardasha", "pratyantardasha", "start", "end",
+    "is_present", "percentage", "status", "description", "report", "remedies",
+)
+_METADATA_FIELDS = frozenset(
+    CHART_FIELDS + _BIRTH_FIELDS + _CHART_EXTRA_FIELDS + _SECTION_KEY_FIELDS + _SECTION_FIELDS
+)
+
+
+# ============================================
+# SOURCES
+# Each yields (source_id, record); source_id is what a resume skips past.
+# ============================================
+
+def read_jsonl(path: str, skip: int = 0) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """`skip` counts records (non-blank lines), the unit ingest() checkpoints in."""
+    position = 0
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f):
+            if not line.strip():
+                continue
+            position += 1
+            if position <= skip:
+                continue
+            try:
+                yield str(line_number), json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"Skipping line {line_number + 1}: {e}")
+                yield str(line_number), {}
+
+
+def read_json(path: str, skip: int = 0) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        items = [({"id": doc_id, **record} if isinstance(record, dict) else {}) for doc_id, record in data.items()]
+    else:
+        items = list(data)
+    for position, record in enumerate(items):
+        if position >= skip:
+            yield str(position), record
+
+
+def read_firestore(collection: str, start_after: Optional[str] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Stream a collection in document ID order, optionally after a given document."""
+    from firebase_admin import firestore
+    from firebase_db import FirebaseDB
+
+    db = FirebaseDB().db
+    if db is None:
+        raise RuntimeError("Firebase is not initialized")
+    query = db.collection(collection).order_by(firestore.FieldPath.document_id())
+    if start_after:
+        query = query.start_after(db.collection(collection).document(start_after).get())
+    for doc in query.stream():
+        yield doc.id, {"id": doc.id, **(doc.to_dict() or {})}
+
+
+def normalize_record(record: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Return (user_id, metadata) for a record, or None if it has no user ID."""
+    user_id = next((str(record[f]) for f in _ID_FIELDS if record.get(f)), None)
+    if not user_id:
+        return None
+    fields = {k: v for k, v in record.items() if k not in _ID_FIELDS}
+    for nested in _NESTED_CHART_FIELDS:
+        if isinstance(fields.get(nested), dict):
+            fields.update(fields.pop(nested))
+    # Pinecone metadata accepts strings, numbers, booleans and lists of strings
+    metadata = {}
+    for key, value in fields.items():
+        if key not in _METADATA_FIELDS:
+            continue
+        if isinstance(value, (str, int, float, bool)):
+            metadata[key] = value
+        elif isinstance(value, list) and all(isinstance(v, str) for v in value):
+            metadata[key] = value
+    metadata["userId"] = user_id
+    metadata.setdefault("data_type", "chart")
+    try:
+        document_id(user_id, metadata)
+    except KeyError as e:
+        logger.warning(f"Skipping {metadata['data_type']} record for {user_id}: missing {e}")
+        return None
+    return user_id, metadata
+
+
+# ============================================
+# CHECKPOINT
+# ============================================
+
+class Checkpoint:
+    """Position of the last fully upserted record for one source."""
+
+    def __init__(self, path: Path, source: str):
+        self.path = Path(path)
+        self.source = source
+        self.position = 0
+        self.last_id: Optional[str] = None
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return
+        if saved.get("source") != self.source:
+            logger.warning(f"Checkpoint is for {saved.get('source')}, not {self.source}; starting from the beginning")
+            return
+        self.position = saved.get("position", 0)
+        self.last_id = saved.get("last_id")
+
+    def save(self, position: int, last_id: Optional[str]):
+        self.position, self.last_id = position, last_id
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"source": self.source, "position": position, "last_id": last_id,
+                       "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S")}, f)
+        os.replace(tmp_path, self.path)
+
+
+# ============================================
+# PIPELINE
+# ============================================
+
+def _next_batch(records: Iterator, size: int) -> List:
+    batch = []
+    for item in records:
+        batch.append(item)
+        if len(batch) >= size:
+            break
+    return batch
+
+
+async def _upsert(index, vectors: List[Dict[str, Any]]):
+    loop = asyncio.get_running_loop()
+    for attempt in range(1, UPSERT_ATTEMPTS + 1):
+        try:
+            return await loop.run_in_executor(None, partial(index.upsert, vectors=vectors))
+        except Exception as e:
+            if attempt == UPSERT_ATTEMPTS:
+                raise
+            logger.warning(f"Upsert of {len(vectors)} vectors failed (attempt {attempt}): {e}")
+            await asyncio.sleep(UPSERT_RETRY_DELAY * 2 ** (attempt - 1))
+
+
+async def ingest(
+    records: Iterable[Tuple[str, Dict[str, Any]]],
+    index,
+    embedder,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    concurrency: int = 4,
+    checkpoint: Optional[Checkpoint] = None,
+    start_position: int = 0,
+    log_every: int = 10,
+) -> Dict[str, Any]:
+    """
+    Embed and upsert records.
+
+    At most `concurrency` batches are in flight, so memory stays bounded no
+    matter how large the source is. The checkpoint only advances past a batch
+    once it and every batch before it has been upserted.
+
+    Returns:
+        Stats dict: records, upserted, skipped, batches, seconds, records_per_sec
+    """
+    loop = asyncio.get_running_loop()
+    source = iter(records)
+    semaphore = asyncio.Semaphore(concurrency)
+    stats = {"records": 0, "upserted": 0, "skipped": 0, "batches": 0}
+    finished: Dict[int, Tuple[int, Optional[str]]] = {}
+    next_to_commit = 0
+    failures: List[BaseException] = []
+    tasks = set()
+    start = time.perf_counter()
+
+    def commit_finished():
+        nonlocal next_to_commit
+        while next_to_commit in finished:
+            position, last_id = finished.pop(next_to_commit)
+            next_to_commit += 1
+            if checkpoint is not None:
+                checkpoint.save(position, last_id)
+
+    async def process(seq: int, documents: List[Tuple[str, Dict[str, Any]]], end: Tuple[int, Optional[str]]):
+        try:
+            if documents:
+                vectors = await embedder.embed_many([chart_embedding_text(uid, meta) for uid, meta in documents])
+                await _upsert(index, [
+                    {"id": document_id(uid, meta), "values": vector, "metadata": encode_chart(meta)}
+                    for (uid, meta), vector in zip(documents, vectors)
+                ])
+                stats["upserted"] += len(documents)
+            finished[seq] = end
+            commit_finished()
+            stats["batches"] += 1
+            if stats["batches"] % log_every == 0:
+                elapsed = time.perf_counter() - start
+                logger.info(f"{stats['records']} records read, {stats['upserted']} upserted, "
+                            f"{stats['upserted'] / elapsed:.1f} records/s")
+        except Exception as e:
+            logger.error(f"Batch {seq} failed: {e}")
+            failures.append(e)
+        finally:
+            semaphore.release()
+
+    position = start_position
+    seq = 0
+    while not failures:
+        await semaphore.acquire()
+        # Reading (a file or a Firestore page) can block, so it runs off the loop too
+        batch = await loop.run_in_executor(None, _next_batch, source, batch_size)
+        if not batch:
+            semaphore.release()
+            break
+        documents = []
+        for _, record in batch:
+            normalized = normalize_record(record) if isinstance(record, dict) else None
+            if normalized is None:
+                stats["skipped"] += 1
+            else:
+                documents.append(normalized)
+        stats["records"] += len(batch)
+        position += len(batch)
+        task = asyncio.create_task(process(seq, documents, (position, batch[-1][0])))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        seq += 1
+
+    if tasks:
+        await asyncio.gather(*tasks)
+
+    elapsed = time.perf_counter() - start
+    stats["seconds"] = round(elapsed, 2)
+    stats["records_per_sec"] = round(stats["upserted"] / elapsed, 1) if elapsed > 0 else 0.0
+    if failures:
+        stats["error"] = str(failures[0])
+    return stats
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Bulk-ingest chart records into Pinecone")
+    parser.add_argument("source", nargs="?", help="JSONL or JSON file of chart records")
+    parser.add_argument("--firestore", metavar="COLLECTION", help="Read records from a Firestore collection instead")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Vectors per upsert (default: 100)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Batches in flight (default: 4)")
+    parser.add_argument("--checkpoint", default=str(_DEFAULT_CHECKPOINT), help="Checkpoint file")
+    parser.add_argument("--restart", action="store_true", help="Ignore any saved checkpoint")
+    parser.add_argument("--local", action="store_true", help="Use an in-memory index and offline embeddings")
+    args = parser.parse_args()
+
+    if bool(args.source) == bool(args.firestore):
+        parser.error("Give either a source file or --firestore COLLECTION")
+
+    source_name = f"firestore:{args.firestore}" if args.firestore else str(Path(args.source).resolve())
+    checkpoint = Checkpoint(Path(args.checkpoint), source_name)
+    if not args.restart:
+        checkpoint.load()
+    if checkpoint.position:
+        logger.info(f"Resuming after {checkpoint.position} records")
+
+    if args.firestore:
+        records = read_firestore(args.firestore, start_after=checkpoint.last_id)
+    elif args.source.endswith(".jsonl"):
+        records = read_jsonl(args.source, skip=checkpoint.position)
+    else:
+        records = read_json(args.source, skip=checkpoint.position)
+
+    if args.local:
+        index, embedder = InMemoryIndex(), HashingEmbedder()
+    else:
+        index, embedder = open_index(), get_embedding_service()
+
+    stats = await ingest(
+        records,
+        index,
+        embedder,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        checkpoint=checkpoint,
+        start_position=checkpoint.position,
+    )
+
+    logger.info(
+        f"Done: {stats['upserted']} upserted, {stats['skipped']} skipped in {stats['seconds']}s "
+        f"({stats['records_per_sec']} records/s)"
+    )
+    if embedder.get_stats():
+        logger.info(f"Embeddings: {embedder.get_stats()}")
+    if "error" in stats:
+        logger.error(f"Stopped early: {stats['error']}. Re-run to resume from the checkpoint.")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,124 @@
+"""
+Shared Jyotish reference data: Rashis, Nakshatras and Grahas.
+
+Used by the rashifal precompute job and the Vedic astrology agent so that
+sign/nakshatra names are normalized the same way everywhere.
+"""
+
+from typing import Optional, Dict, List
+
+# (astrologyapi.com zodiac key, Sanskrit name, Hindi name)
+RASHIS: List[tuple] = [
+    ("aries", "Mesha", "मेष"),
+    ("taurus", "Vrishabha", "वृषभ"),
+    ("gemini", "Mithuna", "मिथुन"),
+    ("cancer", "Karka", "कर्क"),
+    ("leo", "Simha", "सिंह"),
+    ("virgo", "Kanya", "कन्या"),
+    ("libra", "Tula", "तुला"),
+    ("scorpio", "Vrishchika", "वृश्चिक"),
+    ("sagittarius", "Dhanu", "धनु"),
+    ("capricorn", "Makara", "मकर"),
+    ("aquarius", "Kumbha", "कुंभ"),
+    ("pisces", "Meena", "मीन"),
+]
+
+# (Name, ruling graha) in zodiacal order starting from 0° Aries
+NAKSHATRAS: List[tuple] = [
+    ("Ashwini", "Ketu"),
+    ("Bharani", "Venus"),
+    ("Krittika", "Sun"),
+    ("Rohini", "Moon"),
+    ("Mrigashira", "Mars"),
+    ("Ardra", "Rahu"),
+    ("Punarvasu", "Jupiter"),
+    ("Pushya", "Saturn"),
+    ("Ashlesha", "Mercury"),
+    ("Magha", "Ketu"),
+    ("Purva Phalguni", "Venus"),
+    ("Uttara Phalguni", "Sun"),
+    ("Hasta", "Moon"),
+    ("Chitra", "Mars"),
+    ("Swati", "Rahu"),
+    ("Vishakha", "Jupiter"),
+    ("Anuradha", "Saturn"),
+    ("Jyeshtha", "Mercury"),
+    ("Mula", "Ketu"),
+    ("Purva Ashadha", "Venus"),
+    ("Uttara Ashadha", "Sun"),
+    ("Shravana", "Moon"),
+    ("Dhanishta", "Mars"),
+    ("Shatabhisha", "Rahu"),
+    ("Purva Bhadrapada", "Jupiter"),
+    ("Uttara Bhadrapada", "Saturn"),
+    ("Revati", "Mercury"),
+]
+
+# Planet keys as used in Pinecone chart metadata (e.g. "sun_sign", "sun_house")
+PLANETS: List[str] = [
+    "sun", "moon", "mars", "mercury", "jupiter",
+    "venus", "saturn", "rahu", "ketu",
+]
+
+NAKSHATRA_SPAN = 360.0 / 27  # 13°20'
+
+# Common alternate spellings heard from STT / typed by users
+_RASHI_ALIASES: Dict[str, str] = {
+    "mesh": "aries",
+    "vrishabh": "taurus",
+    "vrish": "taurus",
+    "vrishab": "taurus",
+    "mithun": "gemini",
+    "kark": "cancer",
+    "karkata": "cancer",
+    "singh": "leo",
+    "simh": "leo",
+    "kanyaa": "virgo",
+    "tulaa": "libra",
+    "vrishchik": "scorpio",
+    "vrischika": "scorpio",
+    "dhanus": "sagittarius",
+    "dhanur": "sagittarius",
+    "makar": "capricorn",
+    "kumbh": "aquarius",
+    "meen": "pisces",
+    "mina": "pisces",
+}
+
+
+def normalize_rashi(name: str) -> Optional[str]:
+    """
+    Map a Rashi name in English, Sanskrit (romanized) or Hindi to the
+    astrologyapi.com zodiac key (e.g. "Mesha" -> "aries").
+
+    Returns None if the name is not recognized.
+    """
+    if not name:
+        return None
+    key = name.strip().lower()
+    for zodiac, sanskrit, hindi in RASHIS:
+        if key in (zodiac, sanskrit.lower()) or name.strip() == hindi:
+            return zodiac
+    return _RASHI_ALIASES.get(key)
+
+
+def normalize_nakshatra(name: str) -> Optional[int]:
+    """
+    Map a Nakshatra name to its 0-based index, tolerating spacing and case
+    differences (e.g. "purvaphalguni" -> 10).
+    """
+    if not name:
+        return None
+    key = name.strip().lower().replace(" ", "").replace("-", "")
+    for i, (nakshatra, _) in enumerate(NAKSHATRAS):
+        if nakshatra.lower().replace(" ", "") == key:
+            return i
+    return None
+
+
+def nakshatra_rashis(index: int) -> List[str]:
+    """Return the zodiac keys of the Rashis a Nakshatra spans (one or two)."""
+    start = index * NAKSHATRA_SPAN
+    end = start + NAKSHATRA_SPAN - 1e-9
+    first, last = int(start // 30), int(end // 30)
+    return [RASHIS[i][0] for i in range(first, last + 1)]
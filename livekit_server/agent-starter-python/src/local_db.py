@@ -1,73 +1,126 @@
 import json
 import os
 import logging
+import sqlite3
+import threading
 from datetime import datetime
 from pathlib import Path
 
 logger = logging.getLogger("local_db")
 
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS music_tracks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    userId TEXT NOT NULL,
+    createdAt TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_music_tracks_user_created ON music_tracks (userId, createdAt);
+"""
+
+
 class LocalDB:
+    """
+    Local fallback store for generated music tracks.
+
+    SQLite in WAL mode: each save is one atomic INSERT, readers never block
+    the writer, and several agent processes can share the file.
+    get_user_tracks is a range read on the (userId, createdAt) index.
+    """
+
     _instance = None
-    _db_file = Path(__file__).parent / "music_tracks.json"
+    _db_file = Path(__file__).parent / "cache" / "music_tracks.sqlite3"
+    # Older versions rewrote this whole JSON file on every save
+    _legacy_json_file = Path(__file__).parent / "music_tracks.json"
 
-    def __new__(cls):
+    def __new__(cls, *args, **kwargs):
         if cls._instance is None:
             cls._instance = super(LocalDB, cls).__new__(cls)
+            cls._instance._initialized = False
         return cls._instance
 
-    def __init__(self):
-        self._ensure_db_exists()
-
-    def _ensure_db_exists(self):
-        if not self._db_file.exists():
-            try:
-                with open(self._db_file, "w") as f:
-                    json.dump([], f)
-                logger.info(f"Created local DB at {self._db_file}")
-            except Exception as e:
-                logger.error(f"Failed to create local DB: {e}")
+    def __init__(self, db_file: Path = None, legacy_json_file: Path = None):
+        if self._initialized:
+            return
 
-    def _read_db(self):
+        self._db_file = Path(db_file or os.getenv("LOCAL_DB_PATH", self._db_file))
+        self._legacy_json_file = Path(legacy_json_file or self._legacy_json_file)
+        self._lock = threading.Lock()
+        self._conn = None
         try:
-            if not self._db_file.exists():
-                return []
-            with open(self._db_file, "r") as f:
-                return json.load(f)
+            self._db_file.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self._db_file), timeout=10, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+            self._migrate_legacy_json()
+            self._initialized = True
+            logger.info(f"Local DB ready at {self._db_file}")
         except Exception as e:
-            logger.error(f"Failed to read local DB: {e}")
-            return []
+            logger.error(f"Failed to open local DB: {e}")
 
-    def _write_db(self, data):
-        try:
-            with open(self._db_file, "w") as f:
-                json.dump(data, f, indent=2, default=str)
-        except Exception as e:
-            logger.error(f"Failed to write local DB: {e}")
+    def _migrate_legacy_json(self):
+        """One-shot import of music_tracks.json; the file is renamed afterwards."""
+        if not self._legacy_json_file.exists():
+            return
+        migrated_file = self._legacy_json_file.with_suffix(".json.migrated")
+        with self._lock:
+            # Write lock first, so two processes starting together import only once
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if not self._legacy_json_file.exists():
+                    self._conn.rollback()
+                    return
+                with open(self._legacy_json_file, "r") as f:
+                    tracks = json.load(f)
+                rows = [
+                    (t.get("userId", ""), str(t.get("createdAt", "")), json.dumps(t, default=str))
+                    for t in tracks if isinstance(t, dict)
+                ]
+                self._conn.executemany("INSERT INTO music_tracks (userId, createdAt, data) VALUES (?, ?, ?)", rows)
+                os.replace(self._legacy_json_file, migrated_file)
+                try:
+                    self._conn.commit()
+                except Exception:
+                    os.replace(migrated_file, self._legacy_json_file)
+                    raise
+            except Exception as e:
+                self._conn.rollback()
+                logger.error(f"Failed to migrate legacy local DB {self._legacy_json_file}: {e}")
+                return
+        logger.info(f"Migrated {len(rows)} tracks from {self._legacy_json_file}")
 
     def save_music_track(self, user_id: str, track_data: dict):
-        """Save a generated music track to local JSON file."""
+        """Save a generated music track to the local store."""
+        if not self._conn:
+            logger.warning("Local DB not available, skipping save")
+            return
         try:
-            tracks = self._read_db()
-            
             # Add metadata
             track_data["createdAt"] = datetime.utcnow().isoformat()
             track_data["userId"] = user_id
-            
-            tracks.append(track_data)
-            self._write_db(tracks)
+
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT INTO music_tracks (userId, createdAt, data) VALUES (?, ?, ?)",
+                    (user_id, track_data["createdAt"], json.dumps(track_data, default=str)),
+                )
             logger.info(f"Saved track {track_data.get('title')} locally")
         except Exception as e:
             logger.error(f"Failed to save track locally: {e}")
 
     def get_user_tracks(self, user_id: str, limit: int = 5):
         """Get recent tracks for a user."""
+        if not self._conn:
+            return []
         try:
-            tracks = self._read_db()
-            # Filter by user_id
-            user_tracks = [t for t in tracks if t.get("userId") == user_id]
-            # Sort by createdAt desc
-            user_tracks.sort(key=lambda x: x.get("createdAt", ""), reverse=True)
-            return user_tracks[:limit]
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT data FROM music_tracks WHERE userId = ? ORDER BY createdAt DESC, id DESC LIMIT ?",
+                    (user_id, limit),
+                ).fetchall()
+            return [json.loads(data) for (data,) in rows]
         except Exception as e:
             logger.error(f"Failed to get tracks locally: {e}")
             return []
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+In-process stand-in for a Pinecone index.
+
+Implements the part of the Pinecone Index API our code uses (query, fetch,
+upsert, delete, list, list_paginated, describe_index_stats) with the same
+response shapes, so the retriever and the maintenance scripts can run in CI
+and in benchmarks without network access.
+
+Use open_index() to get either the real index or the local one:
+    PINECONE_BACKEND=local python src/check_user_chart.py <user_id>
+"""
+
+import bisect
+import logging
+import os
+import random
+import threading
+import time
+from typing import Optional, Dict, Any, List, Iterable, Iterator, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy ships with torch in our installs
+    np = None
+
+logger = logging.getLogger("local_index")
+
+
+class _Response(dict):
+    """Dict with attribute access, like the Pinecone SDK's response objects."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+# ============================================
+# METADATA FILTERS
+# Pinecone filter language: bare values mean $eq; $and/$or combine clauses.
+# ============================================
+
+def _compare(value: Any, operator: str, operand: Any) -> bool:
+    if operator == "$exists":
+        return (value is not None) == bool(operand)
+    if value is None:
+        return operator in ("$ne", "$nin")
+    if operator == "$eq":
+        return value in operand if isinstance(value, list) else value == operand
+    if operator == "$ne":
+        return operand not in value if isinstance(value, list) else value != operand
+    if operator == "$in":
+        return any(v in operand for v in value) if isinstance(value, list) else value in operand
+    if operator == "$nin":
+        return not any(v in operand for v in value) if isinstance(value, list) else value not in operand
+    try:
+        if operator == "$gt":
+            return value > operand
+        if operator == "$gte":
+            return value >= operand
+        if operator == "$lt":
+            return value < operand
+        if operator == "$lte":
+            return value <= operand
+    except TypeError:
+        return False
+    raise ValueError(f"Unsupported filter operator: {operator}")
+
+
+def matches_filter(metadata: Dict[str, Any], filter: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate a Pinecone metadata filter against one vector's metadata."""
+    if not filter:
+        return True
+    for key, condition in filter.items():
+        if key == "$and":
+            if not all(matches_filter(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_filter(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            if not all(_compare(value, op, operand) for op, operand in condition.items()):
+                return False
+        elif not _compare(metadata.get(key), "$eq", condition):
+            return False
+    return True
+
+
+class InMemoryIndex:
+    """
+    Dict-backed index; thread-safe because callers run it on executors.
+
+    Args:
+        dimension: Vector dimension enforced on upsert
+        latency: Seconds each call sleeps, to model a network round trip.
+            Either one number or a per-operation dict, e.g. {"query": 0.08, "fetch": 0.03}
+        jitter: Extra uniformly random delay of up to this many seconds
+    """
+
+    def __init__(
+        self,
+        dimension: int = 1536,
+        latency: Union[float, Dict[str, float]] = 0.0,
+        jitter: float = 0.0,
+    ):
+        self.dimension = dimension
+        self.latency = latency
+        self.jitter = jitter
+        self.calls: Dict[str, int] = {}
+        # Per-namespace sorted ID list for list pagination, rebuilt after writes
+        self._sorted_ids: Dict[str, List[str]] = {}
+        self._namespaces: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # Per-namespace (ids, normalized matrix) for cosine queries, rebuilt after writes
+        self._matrices: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _simulate(self, operation: str):
+        self.calls[operation] = self.calls.get(operation, 0) + 1
+        delay = self.latency.get(operation, 0.0) if isinstance(self.latency, dict) else self.latency
+        if self.jitter:
+            delay += random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _namespace(self, namespace: Optional[str]) -> Dict[str, Dict[str, Any]]:
+        return self._namespaces.setdefault(namespace or "", {})
+
+    def _matrix(self, namespace: str):
+        cached = self._matrices.get(namespace)
+        if cached is None:
+            store = self._namespace(namespace)
+            ids = list(store)
+            if np is not None:
+                matrix = np.array([store[i]["values"] for i in ids], dtype=np.float32).reshape(len(ids), self.dimension)
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+            else:
+                matrix = [_normalize(store[i]["values"]) for i in ids]
+            cached = self._matrices[namespace] = (ids, matrix)
+        return cached
+
+    def upsert(self, vectors: List[Any], namespace: Optional[str] = None, **kwargs) -> _Response:
+        self._simulate("upsert")
+        records = []
+        for vector in vectors:
+            if isinstance(vector, dict):
+                record = {"id": vector["id"], "values": list(vector["values"]), "metadata": vector.get("metadata") or {}}
+            else:
+                vector_id, values, *rest = vector
+                record = {"id": vector_id, "values": list(values), "metadata": rest[0] if rest else {}}
+            if len(record["values"]) != self.dimension:
+                raise ValueError(
+                    f"Vector dimension {len(record['values'])} does not match the dimension of the index {self.dimension}"
+                )
+            records.append(record)
+        with self._lock:
+            store = self._namespace(namespace)
+            for record in records:
+                store[record["id"]] = record
+            self._matrices.pop(namespace or "", None)
+            self._sorted_ids.pop(namespace or "", None)
+        return _Response(upserted_count=len(records))
+
+    def fetch(self, ids: Iterable[str], namespace: Optional[str] = None, **kwargs) -> _Response:
+        self._simulate("fetch")
+        with self._lock:
+            store = self._namespace(namespace)
+            found = {i: _Response(store[i]) for i in ids if i in store}
+        return _Response(vectors=found, namespace=namespace or "", usage=_Response(read_units=1))
+
+    def query(
+        self,
+        vector: Optional[List[float]] = None,
+        id: Optional[str] = None,
+        top_k: int = 10,
+        filter: Optional[Dict[str, Any]] = None,
+        include_values: bool = False,
+        include_metadata: bool = False,
+        namespace: Optional[str] = None,
+        **kwargs,
+    ) -> _Response:
+        self._simulate("query")
+        namespace = namespace or ""
+        with self._lock:
+            store = self._namespace(namespace)
+            if vector is None:
+                if id not in store:
+                    return _Response(matches=[], namespace=namespace)
+                vector = store[id]["values"]
+            ids, matrix = self._matrix(namespace)
+            if np is not None:
+                query = np.asarray(vector, dtype=np.float32)
+                norm = np.linalg.norm(query)
+                scores = matrix @ (query / norm) if norm > 0 else np.zeros(len(ids), dtype=np.float32)
+                order = np.argsort(-scores, kind="stable")
+            else:
+                unit = _normalize(vector)
+                scores = [sum(a * b for a, b in zip(row, unit)) for row in matrix]
+                order = sorted(range(len(ids)), key=lambda i: -scores[i])
+
+            matches = []
+            for position in order:
+                record = store[ids[position]]
+                if not matches_filter(record["metadata"], filter):
+                    continue
+                match = _Response(id=record["id"], score=float(scores[position]))
+                match["values"] = list(record["values"]) if include_values else []
+                match["metadata"] = dict(record["metadata"]) if include_metadata else None
+                matches.append(match)
+                if len(matches) >= top_k:
+                    break
+        return _Response(matches=matches, namespace=namespace)
+
+    def delete(
+        self,
+        ids: Optional[Iterable[str]] = None,
+        delete_all: bool = False,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: Optional[str] = None,
+        **kwargs,
+    ) -> _Response:
+        self._simulate("delete")
+        with self._lock:
+            store = self._namespace(namespace)
+            if delete_all:
+                store.clear()
+            else:
+                doomed = set(ids or ())
+                if filter:
+                    doomed.update(i for i, r in store.items() if matches_filter(r["metadata"], filter))
+                for vector_id in doomed:
+                    store.pop(vector_id, None)
+            self._matrices.pop(namespace or "", None)
+            self._sorted_ids.pop(namespace or "", None)
+        return _Response()
+
+    def list_paginated(
+        self,
+        prefix: Optional[str] = None,
+        limit: int = 100,
+        pagination_token: Optional[str] = None,
+        namespace: Optional[str] = None,
+        **kwargs,
+    ) -> _Response:
+        """One page of vector IDs in ID order; the token is the last ID returned."""
+        self._simulate("list")
+        with self._lock:
+            ids = self._sorted_ids.get(namespace or "")
+            if ids is None:
+                ids = self._sorted_ids[namespace or ""] = sorted(self._namespace(namespace))
+        start = bisect.bisect_right(ids, pagination_token) if pagination_token else 0
+        if prefix:
+            start = max(start, bisect.bisect_left(ids, prefix))
+        page = []
+        for vector_id in ids[start:start + limit + 1]:
+            if prefix and not vector_id.startswith(prefix):
+                break
+            page.append(vector_id)
+        next_token = page[limit - 1] if len(page) > limit else None
+        page = page[:limit]
+        return _Response(
+            vectors=[_Response(id=i) for i in page],
+            pagination=_Response(next=next_token) if next_token else None,
+            namespace=namespace or "",
+        )
+
+    def list(self, prefix: Optional[str] = None, limit: int = 100, namespace: Optional[str] = None, **kwargs) -> Iterator[List[str]]:
+        """Yield pages of vector IDs, like Index.list()."""
+        token = None
+        while True:
+            page = self.list_paginated(prefix=prefix, limit=limit, pagination_token=token, namespace=namespace)
+            if page.vectors:
+                yield [v.id for v in page.vectors]
+            if not page.pagination:
+                return
+            token = page.pagination.next
+
+    def describe_index_stats(self, **kwargs) -> _Response:
+        with self._lock:
+            namespaces = {name: _Response(vector_count=len(store)) for name, store in self._namespaces.items()}
+        return _Response(
+            dimension=self.dimension,
+            namespaces=namespaces,
+            total_vector_count=sum(ns["vector_count"] for ns in namespaces.values()),
+        )
+
+
+def _normalize(values: List[float]) -> List[float]:
+    norm = sum(v * v for v in values) ** 0.5
+    return [v / norm for v in values] if norm > 0 else [0.0] * len(values)
+
+
+# Shared local index, so every component in one process sees the same data
+_local_index: Optional[InMemoryIndex] = None
+
+
+def open_index(name: Optional[str] = None):
+    """
+    Open the configured vector index.
+
+    PINECONE_BACKEND=local returns a process-wide InMemoryIndex (latency from
+    LOCAL_INDEX_LATENCY, seconds); anything else connects to Pinecone.
+    """
+    global _local_index
+    if os.getenv("PINECONE_BACKEND", "pinecone").lower() == "local":
+        if _local_index is None:
+            _local_index = InMemoryIndex(latency=float(os.getenv("LOCAL_INDEX_LATENCY", "0")))
+            logger.info("Using in-memory local index")
+        return _local_index
+
+    from pinecone import Pinecone
+
+    api_key = os.getenv("PINECONE_API_KEY")
+    if not api_key:
+        raise ValueError("PINECONE_API_KEY not set")
+    return Pinecone(api_key=api_key).Index(name or os.getenv("PINECONE_INDEX", "rraasi-rag"))
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Local library of devotional lyrics, indexed by deity, theme, language and style.
+
+Most generate_lyrics requests are variations of a few combinations
+(Krishna / devotion / Hindi / Bhajan), so the music agent looks here first
+and only calls the LLM for customizations or when nothing fits. The
+library starts from traditional public-domain texts (data/lyrics_seed.json)
+and grows as users approve lyrics: every library lyric, or uncustomized
+generated lyric, a user turns into a track is recorded, and repeat approvals
+rank it higher. Past tracks are not imported: their lyrics carry no
+language and may have been customized for one user.
+
+Approved lyrics live in SQLite (cache/lyrics_library.sqlite3); the seed file
+is never written to.
+
+Usage:
+    python src/lyrics_library.py --find krishna devotion hindi bhajan
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+try:
+    from .lyrics_prevalidator import normalize_lyrics
+except ImportError:
+    from lyrics_prevalidator import normalize_lyrics
+
+logger = logging.getLogger("lyrics_library")
+
+_SEED_FILE = Path(__file__).parent / "data" / "lyrics_seed.json"
+
+# Canonical deity -> names users and lyrics use for it
+DEITY_ALIASES = {
+    "krishna": {"krishna", "govinda", "gopala", "gopal", "shyam", "kanha", "murari", "madhav", "keshav", "radhe", "radha"},
+    "rama": {"rama", "ram", "raghupati", "raghava", "sita ram", "siya ram"},
+    "shiva": {"shiva", "shiv", "mahadev", "shankar", "bholenath", "shambhu", "omkara"},
+    "hanuman": {"hanuman", "bajrang", "bajrangbali", "pavan kumar", "anjaneya"},
+    "ganesha": {"ganesha", "ganesh", "ganpati", "ganapati", "vinayak"},
+    "devi": {"devi", "durga", "maa", "ambe", "amba", "gauri", "lakshmi", "saraswati", "kali", "mata"},
+    "vishnu": {"vishnu", "narayan", "narayana", "jagdish", "hari"},
+    "divine": {"divine", "god", "bhagwan", "ishwar", "om", "universe", "meditation", "healing"},
+}
+
+# Scores of a candidate against a request
+_DEITY_WEIGHT = 4.0
+_STYLE_WEIGHT = 2.0
+_LANGUAGE_WEIGHT = 2.0
+_THEME_WEIGHT = 1.5
+_MOOD_WEIGHT = 0.5
+# A match must agree on language (hindi/sanskrit count as one) and score at
+# least what deity + language agreement gives
+MIN_SCORE = _DEITY_WEIGHT + _LANGUAGE_WEIGHT
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lyrics (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    deity TEXT NOT NULL,
+    themes TEXT NOT NULL,
+    language TEXT NOT NULL,
+    style TEXT NOT NULL,
+    mood TEXT NOT NULL,
+    lyrics TEXT NOT NULL,
+    source TEXT NOT NULL,
+    approvals INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lyrics_params ON lyrics (deity, language, style);
+"""
+
+
+def normalize_deity(name: str) -> str:
+    key = (name or "").strip().lower()
+    for deity, aliases in DEITY_ALIASES.items():
+        if key == deity or key in aliases:
+            return deity
+    return key or "divine"
+
+
+def infer_deity(lyrics: str) -> str:
+    """Deity whose names occur most often in the lyrics."""
+    text = f" {normalize_lyrics(lyrics).replace(chr(10), ' ')} "
+    counts = {
+        deity: sum(text.count(f" {alias} ") for alias in aliases)
+        for deity, aliases in DEITY_ALIASES.items() if deity != "divine"
+    }
+    best = max(counts, key=counts.get)
+    return best if counts[best] else "divine"
+
+
+def lyrics_id(lyrics: str) -> str:
+    return hashlib.sha256(normalize_lyrics(lyrics).encode("utf-8")).hexdigest()[:16]
+
+
+def _norm(value: str) -> str:
+    return (value or "").strip().lower()
+
+
+class LyricsLibrary:
+    """
+    Seed texts plus approved lyrics, all held in memory for ranking.
+
+    Args:
+        db_file: SQLite file for approved lyrics
+        seed_file: JSON list of traditional texts
+    """
+
+    _default_file = Path(__file__).parent / "cache" / "lyrics_library.sqlite3"
+
+    def __init__(self, db_file: Optional[Path] = None, seed_file: Optional[Path] = None):
+        self.db_file = Path(db_file or os.getenv("LYRICS_LIBRARY_PATH", self._default_file))
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._conn = None
+
+        for entry in self._load_seed(Path(seed_file or _SEED_FILE)):
+            self._entries[entry["id"]] = entry
+        try:
+            self.db_file.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_file), timeout=10, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+            for row in self._conn.execute(
+                "SELECT id, title, deity, themes, language, style, mood, lyrics, source, approvals FROM lyrics"
+            ):
+                entry = dict(zip(("id", "title", "deity", "themes", "language", "style", "mood", "lyrics",
+                                  "source", "approvals"), row))
+                entry["themes"] = json.loads(entry["themes"])
+                self._entries[entry["id"]] = entry
+        except Exception as e:
+            logger.error(f"Failed to open lyrics library DB: {e}")
+            self._conn = None
+        logger.info(f"Lyrics library ready with {len(self._entries)} entries")
+
+    @staticmethod
+    def _load_seed(path: Path) -> List[Dict[str, Any]]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                seed = json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load lyrics seed {path}: {e}")
+            return []
+        return [
+            dict(entry, deity=normalize_deity(entry["deity"]), themes=[_norm(t) for t in entry.get("themes", [])],
+                 language=_norm(entry["language"]), style=_norm(entry["style"]), mood=_norm(entry.get("mood", "")),
+                 source="traditional", approvals=0)
+            for entry in seed
+        ]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _score(self, entry: Dict[str, Any], deity: str, theme: str, language: str, style: str, mood: str) -> float:
+        if entry["deity"] == deity:
+            score = _DEITY_WEIGHT
+        elif entry["deity"] == "divine":
+            # Universal chants (Gayatri, Asato Ma) suit any deity, but never beat the deity's own texts
+            score = _DEITY_WEIGHT / 2
+        else:
+            return 0.0
+        if entry["language"] == language:
+            score += _LANGUAGE_WEIGHT
+        elif {entry["language"], language} == {"hindi", "sanskrit"}:
+            # Romanized Sanskrit chants are sung in Hindi bhajans all the time
+            score += _LANGUAGE_WEIGHT / 2
+        elif language:
+            # Lyrics in another language are no answer, however well the rest fits
+            return 0.0
+        if entry["style"] == style:
+            score += _STYLE_WEIGHT
+        if theme and theme in entry["themes"]:
+            score += _THEME_WEIGHT
+        if mood and mood == entry["mood"]:
+            score += _MOOD_WEIGHT
+        # Lyrics users keep approving rank first among equals
+        return score + 0.25 * math.log1p(entry.get("approvals", 0))
+
+    def find(
+        self,
+        deity: str,
+        theme: str = "",
+        language: str = "",
+        style: str = "",
+        mood: str = "",
+        limit: int = 3,
+    ) -> List[Dict[str, Any]]:
+        """Best matching entries, highest score first; each carries its "score"."""
+        deity, theme, language, style, mood = normalize_deity(deity), _norm(theme), _norm(language), _norm(style), _norm(mood)
+        scored = [
+            (self._score(entry, deity, theme, language, style, mood), entry)
+            for entry in self._entries.values()
+        ]
+        ranked = sorted((item for item in scored if item[0] >= MIN_SCORE), key=lambda item: item[0], reverse=True)
+        return [dict(entry, score=round(score, 2)) for score, entry in ranked[:limit]]
+
+    def record_approval(
+        self,
+        lyrics: str,
+        deity: str,
+        theme: str = "",
+        language: str = "",
+        style: str = "",
+        mood: str = "",
+        title: str = "",
+        source: str = "generated",
+    ) -> Optional[str]:
+        """Add approved lyrics, or count another approval of known ones. Returns the entry ID."""
+        if not normalize_lyrics(lyrics):
+            return None
+        entry_id = lyrics_id(lyrics)
+        existing = self._entries.get(entry_id) or next(
+            (e for e in self._entries.values() if lyrics_id(e["lyrics"]) == entry_id), None
+        )
+        if existing:
+            entry = dict(existing, approvals=existing.get("approvals", 0) + 1)
+        else:
+            entry = {
+                "id": entry_id, "title": title or lyrics.strip().splitlines()[0][:60],
+                "deity": normalize_deity(deity) if deity else infer_deity(lyrics),
+                "themes": [_norm(theme)] if theme else [], "language": _norm(language), "style": _norm(style),
+                "mood": _norm(mood), "lyrics": lyrics.strip(), "source": source, "approvals": 1,
+            }
+        self._entries[entry["id"]] = entry
+        if self._conn:
+            try:
+                with self._lock, self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO lyrics (id, title, deity, themes, language, style, mood, lyrics, "
+                        "source, approvals, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (entry["id"], entry["title"], entry["deity"], json.dumps(entry["themes"]), entry["language"],
+                         entry["style"], entry["mood"], entry["lyrics"], entry["source"], entry["approvals"], time.time()),
+                    )
+            except Exception as e:
+                logger.error(f"Failed to save approved lyrics: {e}")
+        logger.info(f"Recorded approval of '{entry['title']}' ({entry['deity']}/{entry['style']}, "
+                    f"{entry['approvals']} approvals)")
+        return entry["id"]
+
+
+# Singleton instance
+_library = None
+
+
+def get_lyrics_library() -> LyricsLibrary:
+    """Get singleton lyrics library instance."""
+    global _library
+    if _library is None:
+        _library = LyricsLibrary()
+    return _library
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Devotional lyrics library")
+    parser.add_argument("--find", nargs="+", metavar=("DEITY", "THEME"), help="deity [theme] [language] [style]")
+    args = parser.parse_args()
+
+    library = get_lyrics_library()
+    if args.find:
+        for entry in library.find(*args.find[:4]):
+            print(f"{entry['score']:5.2f}  {entry['title']}  [{entry['deity']}/{entry['language']}/{entry['style']}, "
+                  f"{entry['source']}, {entry['approvals']} approvals]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Local pre-validation of song lyrics before the LLM rubric check.
+
+validate_lyrics used to send every candidate to gpt-4o-mini, including
+lyrics generate_lyrics had just written and input that is plainly not
+lyrics (two words, or a style description pasted as lyrics). The local
+scorer looks at line count, refrains, script and style vocabulary and
+settles the clear cases. Anything in between goes to the LLM, and its
+verdict is cached by a hash of the normalized lyrics, style and language.
+"""
+
+import hashlib
+import logging
+import re
+import unicodedata
+from collections import Counter, OrderedDict
+from typing import Optional, Dict, Any, Callable, Awaitable
+
+logger = logging.getLogger("lyrics_prevalidator")
+
+MIN_WORDS = 8
+MIN_LINES = 2
+MAX_LINES = 80
+
+# Suno and the rubric want at least a short verse + refrain for a clear pass
+PASS_MIN_LINES = 4
+PASS_MAX_LINES = 40
+
+# Words that describe music rather than being sung
+_STYLE_WORDS = {
+    "style", "genre", "tempo", "bpm", "instrumental", "instruments", "vocals", "vocal",
+    "beats", "track", "create", "generate", "melody", "background",
+    "flute", "bansuri", "sitar", "tabla", "harmonium", "piano", "guitar", "drums", "bowls",
+    "ambient", "slow", "fast", "upbeat", "lofi", "remix", "432hz", "528hz",
+}
+
+# Devotional vocabulary (romanized and Devanagari)
+_DEVOTIONAL_WORDS = {
+    "om", "aum", "jai", "jaya", "hari", "ram", "rama", "raam", "krishna", "govinda", "gopala",
+    "radhe", "radha", "shiva", "shiv", "shankar", "mahadev", "namah", "namo", "narayan",
+    "narayana", "devi", "maa", "durga", "ganesh", "ganesha", "ganpati", "hanuman", "prabhu",
+    "bhagwan", "bhagavan", "murari", "keshav", "madhav", "shyam", "vitthal", "sai", "guru",
+    "lord", "divine", "grace", "soul", "prayer", "surrender",
+    "ॐ", "ओम", "जय", "हरि", "राम", "कृष्ण", "गोविंद", "गोपाल", "राधे", "शिव", "शंकर",
+    "नमः", "नारायण", "माँ", "मां", "दुर्गा", "गणेश", "हनुमान", "प्रभु", "भगवान", "श्याम", "गुरु",
+}
+
+# Scripts a language may be written in (romanized Indic lyrics are common)
+_EXPECTED_SCRIPTS = {
+    "hindi": {"devanagari", "latin"},
+    "sanskrit": {"devanagari", "latin"},
+    "tamil": {"tamil", "latin"},
+    "english": {"latin"},
+}
+
+_WORD_SPLIT = re.compile(r"[^\s,.;:!?'\"()\-|।॥]+")
+
+
+def _normalize_line(line: str) -> str:
+    return " ".join(_WORD_SPLIT.findall(unicodedata.normalize("NFC", line).lower()))
+
+
+def normalize_lyrics(lyrics: str) -> str:
+    """Lowercased lyrics without punctuation, blank lines or extra whitespace."""
+    lines = (_normalize_line(line) for line in (lyrics or "").splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def lyrics_key(lyrics: str, music_style: str = "", language: str = "") -> str:
+    payload = "\x00".join([normalize_lyrics(lyrics), _normalize_line(music_style), _normalize_line(language)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def detect_script(text: str) -> str:
+    """devanagari, tamil, latin, mixed (no script over 80% of letters) or unknown."""
+    counts = Counter()
+    for char in text:
+        code = ord(char)
+        if 0x0900 <= code <= 0x097F:
+            counts["devanagari"] += 1
+        elif 0x0B80 <= code <= 0x0BFF:
+            counts["tamil"] += 1
+        elif char.isascii() and char.isalpha():
+            counts["latin"] += 1
+    total = sum(counts.values())
+    if not total:
+        return "unknown"
+    script, count = counts.most_common(1)[0]
+    return script if count / total >= 0.8 else "mixed"
+
+
+def analyze(lyrics: str) -> Dict[str, Any]:
+    """Structural features of a lyrics text."""
+    lines = normalize_lyrics(lyrics).splitlines()
+    words = [word for line in lines for word in line.split()]
+    line_counts = Counter(lines)
+    return {
+        "line_count": len(lines),
+        "word_count": len(words),
+        "words_per_line": len(words) / len(lines) if lines else 0.0,
+        "unique_line_ratio": len(line_counts) / len(lines) if lines else 0.0,
+        "refrain_lines": sum(1 for count in line_counts.values() if count > 1),
+        "script": detect_script(lyrics or ""),
+        "style_word_ratio": sum(word in _STYLE_WORDS for word in words) / len(words) if words else 0.0,
+        "devotional_words": sum(word in _DEVOTIONAL_WORDS for word in words),
+    }
+
+
+def _verdict(is_valid: bool, score: float, feedback: str, suggestions: str = "") -> Dict[str, Any]:
+    return {"is_valid": is_valid, "overall_score": score, "feedback": feedback, "suggestions": suggestions}
+
+
+def prevalidate(lyrics: str, music_style: str, language: str, generated: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Settle clear cases locally.
+
+    Returns:
+        A verdict in the LLM's format (is_valid, overall_score, feedback,
+        suggestions), or None when the LLM has to decide.
+    """
+    features = analyze(lyrics)
+    expected_scripts = _EXPECTED_SCRIPTS.get((language or "").strip().lower())
+
+    too_short = features["word_count"] < MIN_WORDS or features["line_count"] < MIN_LINES
+    # Short mantras ("Om Namah Shivaya" chanted twice) are valid lyrics; let the LLM judge those
+    if too_short and not features["devotional_words"]:
+        return _verdict(False, 2.0, "These lyrics are too short to sing as a full track.",
+                        "Write at least a few lines, ideally a verse and a repeating refrain.")
+    if features["line_count"] > MAX_LINES:
+        return _verdict(False, 4.0, f"These lyrics have {features['line_count']} lines, too long for one track.",
+                        f"Keep them under {MAX_LINES} lines.")
+    if features["style_word_ratio"] >= 0.3 and not features["devotional_words"]:
+        return _verdict(False, 2.0, "This reads like a description of the music rather than words to be sung.",
+                        "Put the genre and instruments in the style, and only the sung words in the lyrics.")
+    if expected_scripts and features["script"] not in expected_scripts | {"mixed", "unknown"}:
+        return _verdict(False, 3.0, f"The lyrics are written in {features['script']} script, not {language}.",
+                        f"Write the lyrics in {language} (Roman transliteration is fine).")
+
+    structured = (
+        PASS_MIN_LINES <= features["line_count"] <= PASS_MAX_LINES
+        and 2 <= features["words_per_line"] <= 14
+        and features["style_word_ratio"] < 0.15
+    )
+    if structured and generated:
+        return _verdict(True, 8.0, "Freshly generated lyrics with a singable structure.")
+    if structured and features["refrain_lines"] and features["devotional_words"] >= 2:
+        return _verdict(True, 8.0, "Clear devotional lyrics with a refrain and a singable line length.")
+    return None
+
+
+class LyricsPrevalidator:
+    """
+    Front of validate_lyrics: local verdicts, cached LLM verdicts, then the LLM.
+
+    Args:
+        cache_size: LLM verdicts (and generated-lyrics hashes) kept per process
+    """
+
+    def __init__(self, cache_size: int = 512):
+        self.cache_size = cache_size
+        self._verdicts: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._generated: "OrderedDict[str, None]" = OrderedDict()
+        self.stats = {"local_pass": 0, "local_fail": 0, "cache_hits": 0, "llm_calls": 0}
+
+    def remember_generated(self, lyrics: str):
+        """Mark lyrics written by generate_lyrics so they skip the rubric check."""
+        self._generated[hashlib.sha256(normalize_lyrics(lyrics).encode("utf-8")).hexdigest()] = None
+        if len(self._generated) > self.cache_size:
+            self._generated.popitem(last=False)
+
+    def _is_generated(self, lyrics: str) -> bool:
+        return hashlib.sha256(normalize_lyrics(lyrics).encode("utf-8")).hexdigest() in self._generated
+
+    @property
+    def llm_calls_avoided(self) -> int:
+        return self.stats["local_pass"] + self.stats["local_fail"] + self.stats["cache_hits"]
+
+    async def validate(
+        self,
+        lyrics: str,
+        music_style: str,
+        language: str,
+        llm_validate: Callable[[], Awaitable[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        """
+        Verdict for lyrics; "source" says whether it came from local, cache or llm.
+
+        llm_validate is only awaited when neither the local scorer nor the
+        cache can answer. Exceptions from it propagate (callers fail open).
+        """
+        verdict = prevalidate(lyrics, music_style, language, generated=self._is_generated(lyrics))
+        if verdict is not None:
+            self.stats["local_pass" if verdict["is_valid"] else "local_fail"] += 1
+            return self._report(dict(verdict, source="local"))
+
+        key = lyrics_key(lyrics, music_style, language)
+        if key in self._verdicts:
+            self._verdicts.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            return self._report(dict(self._verdicts[key], source="cache"))
+
+        self.stats["llm_calls"] += 1
+        verdict = await llm_validate()
+        self._verdicts[key] = verdict
+        if len(self._verdicts) > self.cache_size:
+            self._verdicts.popitem(last=False)
+        return self._report(dict(verdict, source="llm"))
+
+    def _report(self, verdict: Dict[str, Any]) -> Dict[str, Any]:
+        logger.info(f"Lyrics verdict from {verdict['source']}: valid={verdict.get('is_valid')} "
+                    f"(LLM calls avoided: {self.llm_calls_avoided}, made: {self.stats['llm_calls']})")
+        return verdict
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, llm_calls_avoided=self.llm_calls_avoided, cached_verdicts=len(self._verdicts))
+
+
+# Singleton instance
+_prevalidator = None
+
+
+def get_lyrics_prevalidator() -> LyricsPrevalidator:
+    """Get singleton pre-validator instance."""
+    global _prevalidator
+    if _prevalidator is None:
+        _prevalidator = LyricsPrevalidator()
+    return _prevalidator
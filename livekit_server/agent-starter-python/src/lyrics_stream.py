@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Line-by-line consumption of a streamed lyrics completion.
+
+generate_lyrics used to wait for the whole completion. stream_lyrics reads
+the token deltas, hands every finished line to on_line as soon as its
+newline arrives (for on-screen display), and calls on_first_stanza once the
+first stanza is complete so the agent can start reading it aloud while the
+rest is still generating. Time-to-first-line is recorded per call and kept
+in a rolling window for get_lyrics_stream_stats().
+"""
+
+import inspect
+import logging
+import statistics
+import time
+from collections import deque
+from typing import Optional, Dict, Any, List, Callable, AsyncIterator
+
+logger = logging.getLogger("lyrics_stream")
+
+# A stanza ends at a blank line; without blank lines, after this many lines
+FIRST_STANZA_MAX_LINES = 4
+
+_ttfl_samples: deque = deque(maxlen=200)
+
+
+async def _call(fn: Optional[Callable], *args):
+    if fn is None:
+        return
+    result = fn(*args)
+    if inspect.isawaitable(result):
+        await result
+
+
+async def stream_lyrics(
+    deltas: AsyncIterator[str],
+    on_line: Optional[Callable[[int, str], Any]] = None,
+    on_first_stanza: Optional[Callable[[List[str]], Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Consume text deltas of a lyrics completion.
+
+    Args:
+        deltas: Async iterator of text fragments (any size, may span lines)
+        on_line: Called with (index, line) for each non-blank line
+        on_first_stanza: Called once with the lines of the first stanza
+
+    Returns:
+        Dict with text, lines, time_to_first_line_ms and total_ms
+    """
+    start = time.perf_counter()
+    first_line_at = None
+    buffer = ""
+    text_parts = []
+    lines: List[str] = []
+    stanza: Optional[List[str]] = []  # None once the first stanza was handed out
+
+    async def finish_line(raw: str):
+        nonlocal first_line_at, stanza
+        line = raw.strip()
+        if not line:
+            if stanza:
+                await _call(on_first_stanza, stanza)
+                stanza = None
+            return
+        if first_line_at is None:
+            first_line_at = time.perf_counter()
+        lines.append(line)
+        await _call(on_line, len(lines) - 1, line)
+        if stanza is not None:
+            stanza.append(line)
+            if len(stanza) >= FIRST_STANZA_MAX_LINES:
+                await _call(on_first_stanza, stanza)
+                stanza = None
+
+    async for delta in deltas:
+        if not delta:
+            continue
+        text_parts.append(delta)
+        buffer += delta
+        while "\n" in buffer:
+            raw, buffer = buffer.split("\n", 1)
+            await finish_line(raw)
+    if buffer:
+        await finish_line(buffer)
+    if stanza:
+        await _call(on_first_stanza, stanza)
+
+    total_ms = (time.perf_counter() - start) * 1000
+    ttfl_ms = (first_line_at - start) * 1000 if first_line_at is not None else None
+    if ttfl_ms is not None:
+        _ttfl_samples.append(ttfl_ms)
+    logger.info(f"Lyrics streamed: {len(lines)} lines, first line after "
+                f"{ttfl_ms if ttfl_ms is None else round(ttfl_ms)}ms, total {total_ms:.0f}ms")
+    return {
+        "text": "".join(text_parts).strip(),
+        "lines": lines,
+        "time_to_first_line_ms": ttfl_ms,
+        "total_ms": total_ms,
+    }
+
+
+def get_lyrics_stream_stats() -> Dict[str, Any]:
+    """Time-to-first-line over the recent window."""
+    samples = sorted(_ttfl_samples)
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "ttfl_p50_ms": round(statistics.median(samples), 1),
+        "ttfl_p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1),
+    }
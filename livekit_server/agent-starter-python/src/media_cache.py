@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Local cache of remote audio (Suno tracks, Osho discourse MP3s) with an HTTP
+range server in front of it.
+
+Agents publish audio URLs of slow third-party hosts (Suno CDN,
+oshoworld.com). rewrite_url() returns the local server's URL when a copy is
+cached, and otherwise starts a background download so the next play is
+served locally. Downloads are bounded per process; the cache is evicted
+least-recently-used under a disk quota.
+
+Files and the SQLite index live under cache/media/, shared by every agent
+process and the server. The server (pm2: media-cache-server) answers
+GET/HEAD /media/<key> with Range support and long-lived caching headers;
+the content behind a key never changes.
+
+Env:
+    MEDIA_CACHE_PUBLIC_URL   Base URL the frontend reaches the server at;
+                             rewriting is off when unset
+    MEDIA_CACHE_MAX_MB       Disk quota (default 5000)
+
+Usage:
+    python src/media_cache.py --port 8787
+    python src/media_cache.py --status
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any
+from urllib.parse import urlparse
+
+import aiohttp
+
+logger = logging.getLogger("media_cache")
+
+MEDIA_CACHE_MAX_DOWNLOADS = 3
+# A single discourse is 50-150 MB; anything larger is not audio we publish
+MEDIA_CACHE_MAX_FILE_MB = 300
+DOWNLOAD_TIMEOUT = 600
+_CHUNK_SIZE = 1 << 16
+
+_CONTENT_TYPES = {".mp3": "audio/mpeg", ".m4a": "audio/mp4", ".wav": "audio/wav", ".ogg": "audio/ogg"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS media (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    content_type TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_media_lru ON media (last_access);
+"""
+
+
+def media_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+
+
+def _extension(url: str) -> str:
+    ext = os.path.splitext(urlparse(url).path)[1].lower()
+    return ext if ext in _CONTENT_TYPES else ".mp3"
+
+
+class MediaCache:
+    """
+    Disk cache of remote audio files, indexed in SQLite.
+
+    Args:
+        cache_dir: Directory for the files and index
+        max_bytes: Disk quota; least recently used files are evicted above it
+        public_url: Base URL of the range server; None disables rewriting
+        max_downloads: Concurrent downloads per process
+    """
+
+    _default_dir = Path(__file__).parent / "cache" / "media"
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        max_bytes: Optional[int] = None,
+        public_url: Optional[str] = None,
+        max_downloads: int = MEDIA_CACHE_MAX_DOWNLOADS,
+    ):
+        self.cache_dir = Path(cache_dir or os.getenv("MEDIA_CACHE_DIR", self._default_dir))
+        self.max_bytes = max_bytes or int(os.getenv("MEDIA_CACHE_MAX_MB", "5000")) * 1024 * 1024
+        self.public_url = (public_url or os.getenv("MEDIA_CACHE_PUBLIC_URL") or "").rstrip("/") or None
+        self.max_downloads = max_downloads
+        self._lock = threading.Lock()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._conn = None
+        self.stats = {"hits": 0, "misses": 0, "downloads": 0, "download_failures": 0, "evictions": 0}
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.cache_dir / "index.sqlite3"), timeout=10, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+        except Exception as e:
+            logger.error(f"Failed to open media cache index: {e}")
+            self._conn = None
+
+    def lookup(self, key: str, touch: bool = True) -> Optional[Dict[str, Any]]:
+        """Index entry ({"path", "size", "content_type", "url"}) of a cached file, or None."""
+        if not self._conn:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, filename, size, content_type FROM media WHERE key = ?", (key,)
+            ).fetchone()
+            if row and touch:
+                with self._conn:
+                    self._conn.execute("UPDATE media SET last_access = ? WHERE key = ?", (time.time(), key))
+        if not row:
+            return None
+        path = self.cache_dir / row[1]
+        if not path.exists():
+            # Removed behind our back (manual cleanup); forget it
+            self._forget(key)
+            return None
+        return {"url": row[0], "path": path, "size": row[2], "content_type": row[3]}
+
+    def local_url(self, url: str) -> Optional[str]:
+        """Server URL of a cached copy of url, or None."""
+        if not self.public_url or not url:
+            return None
+        key = media_key(url)
+        if not self.lookup(key):
+            return None
+        return f"{self.public_url}/media/{key}{_extension(url)}"
+
+    def rewrite_url(self, url: str) -> str:
+        """
+        URL to publish for url: the local copy when cached, else url itself.
+
+        A miss starts a background download (when called inside an event
+        loop), so the following plays are served locally.
+        """
+        local = self.local_url(url)
+        if local:
+            self.stats["hits"] += 1
+            return local
+        if self.public_url and url and urlparse(url).scheme in ("http", "https"):
+            self.stats["misses"] += 1
+            try:
+                asyncio.get_running_loop()
+                self.prefetch(url)
+            except RuntimeError:
+                pass
+        return url
+
+    def prefetch(self, url: str) -> asyncio.Task:
+        """Start downloading url in the background; one download per URL at a time."""
+        key = media_key(url)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self.fetch(url))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t, k=key: self._inflight.pop(k, None))
+        return task
+
+    async def fetch(self, url: str) -> Optional[Path]:
+        """Download url into the cache (if not cached yet). Returns the file path, or None on failure."""
+        key = media_key(url)
+        entry = self.lookup(key)
+        if entry:
+            return entry["path"]
+        if not self._conn:
+            return None
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_downloads)
+
+        filename = f"{key}{_extension(url)}"
+        tmp_path = self.cache_dir / f".{filename}.{os.getpid()}.part"
+        max_file_bytes = MEDIA_CACHE_MAX_FILE_MB * 1024 * 1024
+        async with self._semaphore:
+            start = time.monotonic()
+            try:
+                if self._session is None or self._session.closed:
+                    self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=DOWNLOAD_TIMEOUT))
+                async with self._session.get(url) as response:
+                    if response.status != 200:
+                        raise ValueError(f"HTTP {response.status}")
+                    content_type = response.content_type if response.content_type.startswith("audio/") \
+                        else _CONTENT_TYPES[_extension(url)]
+                    size = 0
+                    with open(tmp_path, "wb") as f:
+                        async for chunk in response.content.iter_chunked(_CHUNK_SIZE):
+                            size += len(chunk)
+                            if size > max_file_bytes:
+                                raise ValueError(f"larger than {MEDIA_CACHE_MAX_FILE_MB} MB")
+                            f.write(chunk)
+                os.replace(tmp_path, self.cache_dir / filename)
+            except Exception as e:
+                self.stats["download_failures"] += 1
+                logger.warning(f"Failed to cache {url[:80]}: {e}")
+                return None
+            finally:
+                # Failed or cancelled (agent shutdown) downloads leave no partial file
+                tmp_path.unlink(missing_ok=True)
+
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO media (key, url, filename, size, content_type, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, url, filename, size, content_type, now, now),
+            )
+        self.stats["downloads"] += 1
+        logger.info(f"Cached {url[:80]} ({size / 1e6:.1f} MB in {time.monotonic() - start:.1f}s)")
+        self.evict()
+        return self.cache_dir / filename
+
+    def evict(self) -> int:
+        """Delete least recently used files until the cache fits its quota. Returns files removed."""
+        if not self._conn:
+            return 0
+        with self._lock:
+            rows = self._conn.execute("SELECT key, filename, size FROM media ORDER BY last_access DESC").fetchall()
+        total, evicted = 0, []
+        for key, filename, size in rows:
+            total += size
+            if total > self.max_bytes:
+                evicted.append((key, filename))
+        for key, filename in evicted:
+            (self.cache_dir / filename).unlink(missing_ok=True)
+            self._forget(key)
+        if evicted:
+            self.stats["evictions"] += len(evicted)
+            logger.info(f"Evicted {len(evicted)} files from media cache")
+        return len(evicted)
+
+    def sweep_partial_downloads(self, max_age: float = DOWNLOAD_TIMEOUT) -> int:
+        """Delete .part files older than any live download (left by killed processes). Returns files removed."""
+        cutoff = time.time() - max_age
+        removed = 0
+        for path in self.cache_dir.glob(".*.part"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                pass
+        if removed:
+            logger.info(f"Removed {removed} partial downloads from media cache")
+        return removed
+
+    def _forget(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM media WHERE key = ?", (key,))
+
+    def get_stats(self) -> Dict[str, Any]:
+        files, size = 0, 0
+        if self._conn:
+            with self._lock:
+                files, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM media").fetchone()
+        return dict(self.stats, files=files, size_mb=round(size / 1e6, 1), quota_mb=round(self.max_bytes / 1e6),
+                    enabled=bool(self.public_url))
+
+    async def close(self):
+        for task in list(self._inflight.values()):
+            task.cancel()
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+def create_app(cache: MediaCache):
+    """aiohttp app serving cached files at /media/<key>[.ext]."""
+    from aiohttp import web
+
+    async def handle_media(request):
+        key = request.match_info["name"].split(".", 1)[0]
+        entry = cache.lookup(key)
+        if not entry:
+            raise web.HTTPNotFound()
+        # FileResponse answers Range (206/416), If-None-Match and If-Modified-Since itself
+        return web.FileResponse(entry["path"], headers={
+            "Content-Type": entry["content_type"],
+            "Cache-Control": "public, max-age=31536000, immutable",
+            "Access-Control-Allow-Origin": "*",
+        })
+
+    async def handle_stats(request):
+        return web.json_response(cache.get_stats())
+
+    app = web.Application()
+    app.router.add_get("/media/{name}", handle_media)
+    app.router.add_get("/stats", handle_stats)
+    return app
+
+
+# Singleton instance
+_media_cache = None
+
+
+def get_media_cache() -> MediaCache:
+    """Get singleton media cache instance."""
+    global _media_cache
+    if _media_cache is None:
+        _media_cache = MediaCache()
+    return _media_cache
+
+
+async def main():
+    from aiohttp import web
+    from dotenv import load_dotenv
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    load_dotenv(str(Path(__file__).resolve().parent.parent / ".env.local"))
+
+    parser = argparse.ArgumentParser(description="Serve cached audio with HTTP range support")
+    parser.add_argument("--host", default=os.getenv("MEDIA_CACHE_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("MEDIA_CACHE_PORT", "8787")))
+    parser.add_argument("--status", action="store_true", help="Print cache stats and exit")
+    args = parser.parse_args()
+
+    cache = get_media_cache()
+    if args.status:
+        print(json.dumps(cache.get_stats(), indent=2))
+        return
+
+    runner = web.AppRunner(create_app(cache))
+    await runner.setup()
+    await web.TCPSite(runner, args.host, args.port).start()
+    logger.info(f"Media cache serving {cache.cache_dir} on http://{args.host}:{args.port}")
+    while True:
+        await asyncio.sleep(3600)
+        # Agents only evict after their own downloads; keep the quota after manual copies too
+        cache.evict()
+        cache.sweep_partial_downloads()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Migrate chart documents to the packed chart metadata schema (chart_codec).
+
+Pages through every vector ID, fetches a page at a time and re-upserts the
+chart documents that still use loose fields, with the same vector values and
+packed metadata. Upserts replace the whole metadata; `update` would only merge
+fields and leave the loose ones behind.
+
+Before a page is written, the original metadata of each changed document is
+appended to a JSONL backup. `--rollback` restores from it. The migration
+skips documents that are already packed, so re-running after an interruption
+picks up where it stopped.
+
+Usage:
+    python src/migrate_chart_metadata.py --dry-run
+    python src/migrate_chart_metadata.py --limit 100                  # canary
+    python src/migrate_chart_metadata.py --concurrency 4
+    python src/migrate_chart_metadata.py --rollback src/cache/chart_migration_backup.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from functools import partial
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Iterator
+
+from dotenv import load_dotenv
+
+from chart_codec import encode_chart, is_packed
+from local_index import open_index
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+)
+logger = logging.getLogger("migrate_chart_metadata")
+
+# Load environment variables
+env_path = Path(__file__).resolve().parent.parent / ".env.local"
+load_dotenv(str(env_path))
+
+_DEFAULT_BACKUP = Path(__file__).resolve().parent / "cache" / "chart_migration_backup.jsonl"
+
+DEFAULT_PAGE_SIZE = 100
+
+
+def _vectors(result) -> Dict[str, Any]:
+    vectors = result.get("vectors", {}) if isinstance(result, dict) else getattr(result, "vectors", {})
+    return vectors or {}
+
+
+def _field(vector, name: str):
+    return vector.get(name) if isinstance(vector, dict) else getattr(vector, name, None)
+
+
+def _payload_bytes(metadata: Dict[str, Any]) -> int:
+    return len(json.dumps(metadata, separators=(",", ":")))
+
+
+class MigrationStats:
+    def __init__(self):
+        self.scanned = 0
+        self.migrated = 0
+        self.already_packed = 0
+        self.bytes_before = 0
+        self.bytes_after = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        saved = self.bytes_before - self.bytes_after
+        return {
+            "scanned": self.scanned,
+            "migrated": self.migrated,
+            "already_packed": self.already_packed,
+            "metadata_bytes_before": self.bytes_before,
+            "metadata_bytes_after": self.bytes_after,
+            "saved_pct": round(100.0 * saved / self.bytes_before, 1) if self.bytes_before else 0.0,
+        }
+
+
+def _prepare_page(index, ids: List[str]):
+    """Fetch one page; returns (updates, already_packed) where updates are (new vector, original metadata)."""
+    updates = []
+    already_packed = 0
+    for vector_id, vector in _vectors(index.fetch(ids=ids)).items():
+        metadata = _field(vector, "metadata") or {}
+        if is_packed(metadata):
+            already_packed += 1
+            continue
+        packed = encode_chart(metadata)
+        if packed is metadata:
+            continue  # not a chart document, or nothing packable
+        updates.append(({"id": vector_id, "values": list(_field(vector, "values")), "metadata": packed}, metadata))
+    return updates, already_packed
+
+
+async def migrate(
+    index,
+    backup,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    concurrency: int = 4,
+    dry_run: bool = False,
+    limit: Optional[int] = None,
+) -> MigrationStats:
+    loop = asyncio.get_running_loop()
+    stats = MigrationStats()
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = set()
+    start = time.perf_counter()
+    pages: Iterator[List[str]] = index.list(limit=page_size)
+
+    async def run_page(ids: List[str]):
+        try:
+            updates, already_packed = await loop.run_in_executor(None, _prepare_page, index, ids)
+            if limit is not None:
+                updates = updates[:max(0, limit - stats.migrated)]
+            stats.already_packed += already_packed
+            stats.migrated += len(updates)
+            for vector, original in updates:
+                stats.bytes_before += _payload_bytes(original)
+                stats.bytes_after += _payload_bytes(vector["metadata"])
+            if updates and not dry_run:
+                # Backup first: a crash after this leaves restorable originals
+                for vector, original in updates:
+                    backup.write(json.dumps({"id": vector["id"], "metadata": original}) + "\n")
+                backup.flush()
+                await loop.run_in_executor(None, partial(index.upsert, vectors=[v for v, _ in updates]))
+        finally:
+            semaphore.release()
+
+    while limit is None or stats.migrated < limit:
+        await semaphore.acquire()
+        ids = await loop.run_in_executor(None, next, pages, None)
+        if ids is None:
+            semaphore.release()
+            break
+        ids = list(ids)
+        stats.scanned += len(ids)
+        task = asyncio.create_task(run_page(ids))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+
+    logger.info(f"{'Would migrate' if dry_run else 'Migrated'} {stats.migrated} documents "
+                f"in {time.perf_counter() - start:.1f}s")
+    return stats
+
+
+def rollback(index, backup_path: Path, page_size: int = DEFAULT_PAGE_SIZE) -> int:
+    """
+    Restore original metadata from a backup file.
+
+    Vector values are fetched from the index (the migration never changed
+    them). If an ID was backed up more than once, the first copy wins.
+    """
+    originals: Dict[str, Dict[str, Any]] = {}
+    restored = 0
+
+    def flush():
+        nonlocal restored
+        fetched = _vectors(index.fetch(ids=list(originals)))
+        vectors = [
+            {"id": vector_id, "values": list(_field(fetched[vector_id], "values")), "metadata": metadata}
+            for vector_id, metadata in originals.items() if vector_id in fetched
+        ]
+        if vectors:
+            index.upsert(vectors=vectors)
+        restored += len(vectors)
+        originals.clear()
+
+    seen = set()
+    with open(backup_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if entry["id"] in seen:
+                continue
+            seen.add(entry["id"])
+            originals[entry["id"]] = entry["metadata"]
+            if len(originals) >= page_size:
+                flush()
+    if originals:
+        flush()
+    logger.info(f"Restored {restored} documents from {backup_path}")
+    return restored
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Pack chart metadata into the compact chart schema")
+    parser.add_argument("--backup", default=str(_DEFAULT_BACKUP), help="JSONL file of original metadata")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="IDs per page / upsert")
+    parser.add_argument("--concurrency", type=int, default=4, help="Pages in flight")
+    parser.add_argument("--limit", type=int, help="Migrate at most this many documents")
+    parser.add_argument("--dry-run", action="store_true", help="Report savings without writing")
+    parser.add_argument("--rollback", metavar="BACKUP", help="Restore original metadata from a backup file")
+    args = parser.parse_args()
+
+    index = open_index()
+    if args.rollback:
+        rollback(index, Path(args.rollback), args.page_size)
+        return
+
+    backup_path = Path(args.backup)
+    backup_path.parent.mkdir(parents=True, exist_ok=True)
+    # Append: a resumed run must not overwrite the originals saved earlier
+    with open(backup_path, "a", encoding="utf-8") as backup:
+        stats = await migrate(index, backup, args.page_size, args.concurrency, args.dry_run, args.limit)
+
+    print(json.dumps(stats.as_dict(), indent=2))
+    if not args.dry_run and stats.migrated:
+        print(f"\nBackup: {backup_path}")
+        print(f"Roll back with: python src/migrate_chart_metadata.py --rollback {backup_path}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Muhurta (auspicious time window) search.
+
+Builds Panchang arrays for a date window locally (see panchang.py), removes
+inauspicious periods with interval arithmetic and ranks what is left by
+choghadiya, hora, nakshatra and tithi quality for the requested activity.
+A 30-day search completes in a few milliseconds, so it can run inside a
+voice turn without calling astrologyapi.com.
+"""
+
+import bisect
+import logging
+from datetime import date, timedelta
+from typing import Optional, Dict, List, Tuple, Iterable
+
+from jyotish_constants import NAKSHATRAS, normalize_nakshatra
+from panchang import (
+    day_panchang,
+    find_transitions,
+    jd_to_local,
+    nakshatra_index,
+    tithi_index,
+    tithi_name,
+    VARAS,
+)
+
+logger = logging.getLogger("muhurta")
+
+Interval = Tuple[float, float]
+
+CHOGHADIYA_SCORES = {
+    "Amrit": 3.0,
+    "Shubh": 2.5,
+    "Labh": 2.5,
+    "Char": 1.0,
+    "Udveg": -2.0,
+    "Kaal": -3.0,
+    "Rog": -3.0,
+}
+GOOD_CHOGHADIYA = {name for name, score in CHOGHADIYA_SCORES.items() if score > 0}
+
+# Rikta tithis (4th, 9th, 14th of each paksha) and Amavasya
+RIKTA_TITHIS = {3, 8, 13, 18, 23, 28, 29}
+
+# Activity presets: preferred nakshatras (indices), preferred hora lords,
+# tithis to avoid and whether night-time windows are acceptable.
+ACTIVITY_RULES: Dict[str, dict] = {
+    "general": {
+        "nakshatras": [],
+        "hora_lords": ["Jupiter", "Venus", "Mercury", "Moon"],
+        "avoid_tithis": RIKTA_TITHIS,
+        "allow_night": False,
+    },
+    "marriage": {
+        "nakshatras": ["Rohini", "Mrigashira", "Magha", "Uttara Phalguni", "Hasta", "Swati",
+                       "Anuradha", "Mula", "Uttara Ashadha", "Uttara Bhadrapada", "Revati"],
+        "hora_lords": ["Venus", "Jupiter", "Moon"],
+        "avoid_tithis": RIKTA_TITHIS,
+        "allow_night": True,
+    },
+    "griha_pravesh": {
+        "nakshatras": ["Rohini", "Mrigashira", "Uttara Phalguni", "Chitra", "Anuradha",
+                       "Uttara Ashadha", "Dhanishta", "Shatabhisha", "Uttara Bhadrapada", "Revati"],
+        "hora_lords": ["Jupiter", "Venus", "Moon"],
+        "avoid_tithis": RIKTA_TITHIS,
+        "allow_night": False,
+    },
+    "business": {
+        "nakshatras": ["Ashwini", "Rohini", "Pushya", "Hasta", "Chitra", "Anuradha",
+                       "Shravana", "Revati"],
+        "hora_lords": ["Mercury", "Jupiter", "Venus"],
+        "avoid_tithis": RIKTA_TITHIS,
+        "allow_night": False,
+    },
+    "travel": {
+        "nakshatras": ["Ashwini", "Mrigashira", "Punarvasu", "Pushya", "Hasta", "Anuradha",
+                       "Shravana", "Dhanishta", "Revati"],
+        "hora_lords": ["Moon", "Mercury", "Venus"],
+        "avoid_tithis": RIKTA_TITHIS,
+        "allow_night": True,
+    },
+    "vehicle_purchase": {
+        "nakshatras": ["Ashwini", "Rohini", "Punarvasu", "Pushya", "Hasta", "Chitra",
+                       "Swati", "Shravana", "Dhanishta", "Revati"],
+        "hora_lords": ["Venus", "Mercury", "Jupiter"],
+        "avoid_tithis": RIKTA_TITHIS,
+        "allow_night": False,
+    },
+    "education": {
+        "nakshatras": ["Ashwini", "Punarvasu", "Pushya", "Hasta", "Chitra", "Swati",
+                       "Shravana", "Dhanishta", "Shatabhisha", "Revati"],
+        "hora_lords": ["Mercury", "Jupiter"],
+        "avoid_tithis": RIKTA_TITHIS,
+        "allow_night": False,
+    },
+}
+
+
+# ============================================
+# INTERVAL ARITHMETIC
+# ============================================
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Union of intervals as a sorted, non-overlapping list."""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(base: List[Interval], cuts: Iterable[Interval]) -> List[Interval]:
+    """Remove `cuts` from a sorted, non-overlapping `base` list."""
+    cuts = merge_intervals(cuts)
+    result: List[Interval] = []
+    j = 0
+    for start, end in base:
+        while j < len(cuts) and cuts[j][1] <= start:
+            j += 1
+        k = j
+        cursor = start
+        while k < len(cuts) and cuts[k][0] < end:
+            if cuts[k][0] > cursor:
+                result.append((cursor, cuts[k][0]))
+            cursor = max(cursor, cuts[k][1])
+            k += 1
+        if cursor < end:
+            result.append((cursor, end))
+    return result
+
+
+def intersect_intervals(a: List[Interval], b: List[Interval]) -> List[Interval]:
+    """Intersection of two sorted, non-overlapping interval lists."""
+    result: List[Interval] = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start = max(a[i][0], b[j][0])
+        end = min(a[i][1], b[j][1])
+        if start < end:
+            result.append((start, end))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def _segments_from_transitions(transitions: List[Tuple[float, int]], end_jd: float) -> List[Tuple[float, float, int]]:
+    return [
+        (jd, transitions[i + 1][0] if i + 1 < len(transitions) else end_jd, value)
+        for i, (jd, value) in enumerate(transitions)
+    ]
+
+
+class _LabelIndex:
+    """Sorted labelled intervals with O(log n) point lookup."""
+
+    def __init__(self, segments: List[tuple]):
+        self.segments = sorted(segments)
+        self.starts = [s[0] for s in self.segments]
+
+    def at(self, jd: float):
+        i = bisect.bisect_right(self.starts, jd) - 1
+        if i >= 0 and jd < self.segments[i][1]:
+            return self.segments[i][2]
+        return None
+
+
+# ============================================
+# SEARCH
+# ============================================
+
+def find_muhurta(
+    start_date: date,
+    days: int,
+    lat: float,
+    lon: float,
+    tzone: float,
+    activity: str = "general",
+    preferred_nakshatras: Optional[List[str]] = None,
+    preferred_tithis: Optional[List[int]] = None,
+    avoid_rahu_kaal: bool = True,
+    require_preferred_nakshatra: bool = False,
+    min_duration_minutes: int = 30,
+    max_results: int = 5,
+) -> List[dict]:
+    """
+    Search a date window for auspicious time windows.
+
+    Args:
+        start_date: First local date to search
+        days: Number of days to search (e.g. 30)
+        lat, lon, tzone: Location and timezone offset in hours
+        activity: Key of ACTIVITY_RULES (marriage, travel, business, ...)
+        preferred_nakshatras: Extra nakshatra names to prefer
+        preferred_tithis: Tithi indices (0-29) to prefer
+        avoid_rahu_kaal: Exclude Rahu Kaal, Yamaganda and Gulika Kaal
+        require_preferred_nakshatra: Only return windows in a preferred nakshatra
+        min_duration_minutes: Drop windows shorter than this
+        max_results: Number of ranked windows to return
+
+    Returns:
+        Ranked list of window dicts with local start/end datetimes, score and
+        the panchang elements that produced the score.
+    """
+    rules = ACTIVITY_RULES.get(activity, ACTIVITY_RULES["general"])
+    nakshatra_prefs = {
+        i for i in (normalize_nakshatra(n) for n in rules["nakshatras"] + (preferred_nakshatras or []))
+        if i is not None
+    }
+    tithi_prefs = set(preferred_tithis or [])
+    hora_prefs = set(rules["hora_lords"])
+
+    # 1. Panchang arrays for every day in the window
+    panchangs = []
+    for offset in range(days):
+        p = day_panchang(start_date + timedelta(days=offset), lat, lon, tzone)
+        if p:
+            panchangs.append(p)
+    if not panchangs:
+        return []
+
+    window_start = panchangs[0]["sunrise"]
+    window_end = panchangs[-1]["next_sunrise"]
+
+    tithi_segments = _segments_from_transitions(
+        find_transitions(tithi_index, window_start, window_end), window_end
+    )
+    nakshatra_segments = _segments_from_transitions(
+        find_transitions(nakshatra_index, window_start, window_end), window_end
+    )
+
+    choghadiya, hora, blocked = [], [], []
+    for p in panchangs:
+        for start, end, name in p["choghadiya"]:
+            if not rules["allow_night"] and start >= p["sunset"]:
+                continue
+            choghadiya.append((start, end, name))
+        hora.extend(p["hora"])
+        if avoid_rahu_kaal:
+            blocked.extend((s, e) for s, e, _ in p["rahu_kaal"] + p["yamaganda"] + p["gulika"])
+
+    # 2. Interval arithmetic: good choghadiya minus inauspicious periods
+    candidates = merge_intervals((s, e) for s, e, name in choghadiya if name in GOOD_CHOGHADIYA)
+    candidates = subtract_intervals(candidates, blocked)
+    candidates = subtract_intervals(
+        candidates, ((s, e) for s, e, t in tithi_segments if t in rules["avoid_tithis"])
+    )
+    if require_preferred_nakshatra and nakshatra_prefs:
+        candidates = intersect_intervals(
+            candidates,
+            merge_intervals((s, e) for s, e, n in nakshatra_segments if n in nakshatra_prefs),
+        )
+
+    # 3. Split candidates at every panchang boundary and score each piece
+    boundaries = sorted({
+        b
+        for segs in (choghadiya, hora, tithi_segments, nakshatra_segments)
+        for s, e, _ in segs
+        for b in (s, e)
+    })
+    chog_index = _LabelIndex(choghadiya)
+    hora_index = _LabelIndex(hora)
+    tithi_idx = _LabelIndex(tithi_segments)
+    nak_idx = _LabelIndex(nakshatra_segments)
+    # Vedic vara runs sunrise to sunrise, so a window at 00:30 belongs to the previous day
+    vara_idx = _LabelIndex([(p["sunrise"], p["next_sunrise"], p["vara"]) for p in panchangs])
+
+    windows = []
+    for start, end in candidates:
+        lo = bisect.bisect_right(boundaries, start)
+        hi = bisect.bisect_left(boundaries, end)
+        cuts = [start] + boundaries[lo:hi] + [end]
+        for a, b in zip(cuts, cuts[1:]):
+            if (b - a) * 1440 < min_duration_minutes:
+                continue
+            mid = (a + b) / 2
+            chog = chog_index.at(mid)
+            lord = hora_index.at(mid)
+            tithi = tithi_idx.at(mid)
+            nak = nak_idx.at(mid)
+
+            score = CHOGHADIYA_SCORES.get(chog, 0.0)
+            reasons = [f"{chog} choghadiya"]
+            if lord in hora_prefs:
+                score += 1.5
+                reasons.append(f"{lord} hora")
+            if nak in nakshatra_prefs:
+                score += 2.0
+                reasons.append(f"{NAKSHATRAS[nak][0]} nakshatra")
+            if tithi in tithi_prefs:
+                score += 1.5
+                reasons.append(f"{tithi_name(tithi)} tithi")
+            score += min((b - a) * 24, 2.0) * 0.25  # prefer longer windows, capped
+
+            windows.append({
+                "vara": VARAS[vara_idx.at(mid)],
+                "start_jd": a,
+                "end_jd": b,
+                "score": round(score, 2),
+                "choghadiya": chog,
+                "hora": lord,
+                "nakshatra": NAKSHATRAS[nak][0] if nak is not None else None,
+                "tithi": tithi_name(tithi) if tithi is not None else None,
+                "reasons": reasons,
+            })
+
+    windows.sort(key=lambda w: (-w["score"], w["start_jd"]))
+    results = []
+    for w in windows[:max_results]:
+        start_local = jd_to_local(w.pop("start_jd"), tzone)
+        end_local = jd_to_local(w.pop("end_jd"), tzone)
+        w["start"] = start_local
+        w["end"] = end_local
+        results.append(w)
+
+    logger.info(f"Muhurta search: {days} days, {len(candidates)} candidate spans, {len(windows)} windows scored")
+    return results
+
+
+def format_muhurta_results(results: List[dict]) -> str:
+    """Format ranked windows for the LLM / voice response."""
+    if not results:
+        return "No auspicious window found in this period."
+    lines = []
+    for i, w in enumerate(results, 1):
+        lines.append(
+            f"{i}. {w['start'].strftime('%d %b %Y')} ({w['vara']}) "
+            f"{w['start'].strftime('%H:%M')}-{w['end'].strftime('%H:%M')}: "
+            f"{', '.join(w['reasons'])}; Tithi {w['tithi']}, Nakshatra {w['nakshatra']}"
+        )
+    return "\n".join(lines)
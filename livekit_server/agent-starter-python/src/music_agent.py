@@ -17,9 +17,23 @@ from livekit.agents import (
 )
 try:
     from .suno_client import SunoClient
+    from .track_listener import TrackListener
+    from .suno_job_tracker import get_suno_job_tracker, COMPLETED
+    from .track_pool import get_track_pool, match_style
+    from .lyrics_prevalidator import get_lyrics_prevalidator, normalize_lyrics
+    from .lyrics_stream import stream_lyrics
+    from .lyrics_library import get_lyrics_library
+    from .media_cache import get_media_cache
 except ImportError:
     # When running as script, use absolute import
     from suno_client import SunoClient
+    from track_listener import TrackListener
+    from suno_job_tracker import get_suno_job_tracker, COMPLETED
+    from track_pool import get_track_pool, match_style
+    from lyrics_prevalidator import get_lyrics_prevalidator, normalize_lyrics
+    from lyrics_stream import stream_lyrics
+    from lyrics_library import get_lyrics_library
+    from media_cache import get_media_cache
 from firebase_db import FirebaseDB
 
 # Configure logging
@@ -41,7 +55,7 @@ for _env_path in _ENV_PATHS:
         break
 
 class MusicAssistant(Agent):
-    def __init__(self, publish_data_fn=None, user_id=None):
+    def __init__(self, publish_data_fn=None, user_id=None, track_listener: TrackListener = None):
         super().__init__(
             instructions="""You are RRAASI Music Creator, a specialized AI agent for creating healing, spiritual, and meditative music.
 Your goal is to create the PERFECT music track for the user.
@@ -69,7 +83,8 @@ Your goal is to create the PERFECT music track for the user.
     -   Ask: "Any specific deity or subject?" (Krishna, Shiva, meditation, healing)
     -   Ask: "Language preference?" (Hindi, Sanskrit, English, Tamil)
     -   Ask: "Mood?" (peaceful, celebratory, meditative)
-    -   Call `generate_lyrics()` with collected info
+    -   Call `generate_lyrics()` with collected info; it returns matching traditional lyrics instantly when there are any
+    -   Pass specific changes the user wants as `customization`, and `fresh=True` if they want new lyrics instead of traditional ones
     -   Show generated lyrics to user
     -   Get user approval or ask if they want modifications
     -   Once approved, proceed to validate_lyrics()
@@ -126,6 +141,32 @@ generate_music(
         self._publish_data_fn = publish_data_fn
         self.suno_client = SunoClient()
         self.user_id = user_id or "default_user"
+        self._track_listener = track_listener
+        # Set by the entrypoint: plays and announces tracks that became ready
+        self._on_tracks_ready = None
+        # Parameters and text of the last lyrics offered, recorded in the library once used
+        self._last_lyrics = None
+
+    async def _get_tracks(self, limit: int):
+        """Recent tracks, most recent first; None if they could not be fetched."""
+        # Live view kept current by the Firestore listener
+        if self._track_listener and self._track_listener.ready:
+            return self._track_listener.tracks(limit)
+
+        import aiohttp
+
+        # Fallback: auth server
+        auth_server_url = os.getenv("AUTH_SERVER_URL", "https://satsang-auth-server-6ougd45dya-el.a.run.app")
+        url = f"{auth_server_url}/suno/tracks?userId={self.user_id}&limit={limit}"
+
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url) as response:
+                if response.status != 200:
+                    logger.error(f"Failed to fetch tracks: {response.status}")
+                    return None
+
+                data = await response.json()
+                return data.get("tracks", [])
 
     @function_tool
     async def generate_music(
@@ -148,6 +189,8 @@ generate_music(
             title: Title for the track.
         """
         logger.info(f"Generating music: {title} ({style}) - Instrumental: {is_instrumental}")
+        if not is_instrumental:
+            self._record_lyrics_approval(lyrics, title)
         
         try:
             # Use auth server for callbacks (more robust)
@@ -180,9 +223,16 @@ generate_music(
                 logger.warning(f"Could not parse taskId from result: {result}")
                 return "I've sent the request, but I couldn't track the generation status automatically. Please check back in a moment."
 
-            # Callback webhook will handle saving to Firebase when ready
+            # Callback webhook will handle saving to Firebase when ready;
+            # the shared tracker polls only if the callback is late
             logger.info(f"Music generation started. Task ID: {task_id}")
             logger.info(f"Callback webhook will save track automatically")
+            get_suno_job_tracker().track(task_id, self, self._on_job_done, user_id=self.user_id, title=title)
+
+            # Something to listen to right away while the custom track renders
+            pooled = await self._play_pooled_track(style)
+            if pooled:
+                return f"I have started creating your spiritual track: '{title}'. It takes about 60-90 seconds, so meanwhile I'm playing '{pooled['title']}' in a similar style. I will play your own track as soon as it's ready!"
 
             return f"I have started creating your spiritual track: '{title}'. It usually takes about 60-90 seconds to manifest. I will notify you when it's ready, or you can ask me to 'play my last track' in a minute!"
 
@@ -199,7 +249,9 @@ generate_music(
         language: str = "Hindi",
         style: str = "Bhajan",
         mood: str = "Devotional",
-        length: str = "medium"
+        length: str = "medium",
+        customization: str = "",
+        fresh: bool = False
     ) -> str:
         """
         Generate devotional lyrics using AI when user doesn't have their own lyrics.
@@ -211,11 +263,42 @@ generate_music(
             style: Bhajan, Stotram, Mantra, Meditation chant
             mood: Devotional, peaceful, celebratory, introspective
             length: short (4-6 lines), medium (8-12 lines), long (16+ lines)
+            customization: Specific changes the user asked for (e.g., "mention Vrindavan", "add a line for my mother")
+            fresh: True when the user asked for new/different lyrics instead of traditional ones
         
         Returns:
             Generated lyrics text that can be validated and used for music creation
         """
         logger.info(f"Generating {style} lyrics about {deity_or_subject} in {language}")
+        params = {"deity": deity_or_subject, "theme": theme, "language": language, "style": style, "mood": mood}
+        
+        # Traditional texts and lyrics other users approved, instantly; the LLM only customizes
+        base = None
+        if not fresh:
+            matches = get_lyrics_library().find(**params, limit=1)
+            base = matches[0] if matches else None
+        if base and not customization:
+            logger.info(f"Serving lyrics from library: {base['title']} (score {base['score']}, {base['source']})")
+            lines = [line.strip() for line in base["lyrics"].splitlines() if line.strip()]
+            for index, line in enumerate(lines):
+                await self._publish_json({"type": "lyrics_line", "index": index, "line": line})
+            await self._publish_json({"type": "lyrics_complete", "lines": len(lines), "time_to_first_line_ms": 0})
+            get_lyrics_prevalidator().remember_generated(base["lyrics"])
+            self._last_lyrics = dict(params, lyrics=base["lyrics"], title=base["title"], source=base["source"])
+            if base["source"] == "traditional":
+                intro = f'Here are the traditional lyrics of "{base["title"]}" for your {style}:'
+            else:
+                intro = f'Here are lyrics other devotees have sung for a {style} like yours, "{base["title"]}":'
+            return f"""{intro}
+
+{base['lyrics']}
+
+Would you like me to:
+1. Use these lyrics as-is
+2. Modify them (tell me what to change)
+3. Write fresh lyrics instead
+
+Once you approve, I'll validate and proceed with music creation."""
         
         # Map length to line counts
         length_map = {
@@ -253,23 +336,68 @@ For {style} style:
 {"- Devotional verses with chorus" if style == "Bhajan" else ""}
 
 Generate ONLY the lyrics, no explanations or commentary."""
+        if customization:
+            lyrics_prompt += f"\n\nUser's requested changes: {customization}"
+        if base and customization:
+            lyrics_prompt += f"""
+
+Adapt these existing lyrics rather than writing new ones, keeping their refrain and as much of the original as the changes allow:
+{base['lyrics']}"""
 
         try:
             import openai
             client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
             
-            response = await client.chat.completions.create(
+            stream = await client.chat.completions.create(
                 model="gpt-4o",
                 messages=[
                     {"role": "system", "content": "You are a master lyricist of devotional and spiritual music."},
                     {"role": "user", "content": lyrics_prompt}
                 ],
                 temperature=0.8,
-                max_tokens=500
+                max_tokens=500,
+                stream=True
             )
             
-            generated_lyrics = response.choices[0].message.content.strip()
-            logger.info(f"Generated lyrics ({len(generated_lyrics)} chars)")
+            async def deltas():
+                async for chunk in stream:
+                    if chunk.choices:
+                        yield chunk.choices[0].delta.content or ""
+            
+            async def show_line(index: int, line: str):
+                # Lines appear on screen as they are written
+                await self._publish_json({"type": "lyrics_line", "index": index, "line": line})
+            
+            preview_spoken = False
+            
+            def speak_first_stanza(lines):
+                # Start reading aloud while the rest is still generating
+                nonlocal preview_spoken
+                try:
+                    context.session.say("\n".join(lines), add_to_chat_ctx=False)
+                    preview_spoken = True
+                except Exception as e:
+                    logger.warning(f"Could not speak lyrics preview: {e}")
+            
+            streamed = await stream_lyrics(deltas(), on_line=show_line, on_first_stanza=speak_first_stanza)
+            generated_lyrics = streamed["text"]
+            logger.info(f"Generated lyrics ({len(generated_lyrics)} chars), "
+                        f"time to first line: {streamed['time_to_first_line_ms']}ms")
+            await self._publish_json({
+                "type": "lyrics_complete",
+                "lines": len(streamed["lines"]),
+                "time_to_first_line_ms": streamed["time_to_first_line_ms"],
+            })
+            get_lyrics_prevalidator().remember_generated(generated_lyrics)
+            # Lyrics customized for one user (their names, places) stay out of the shared library
+            self._last_lyrics = None if customization else dict(params, lyrics=generated_lyrics, title="", source="generated")
+            
+            if preview_spoken:
+                return f"""I've created these lyrics for your {style} (the first stanza has already been read aloud and the full lyrics are on screen; do not read them again):
+
+{generated_lyrics}
+
+Ask the user whether to use them as-is, modify them, or generate different lyrics. Once they approve, validate and proceed with music creation."""
             
             return f"""I've created these lyrics for your {style}:
 
@@ -286,28 +414,8 @@ Once you approve, I'll validate and proceed with music creation."""
             logger.error(f"Lyrics generation failed: {e}")
             return "I apologize, I couldn't generate lyrics at the moment. Would you like to provide your own lyrics instead?"
 
-    @function_tool
-    async def validate_lyrics(
-        self,
-        context: RunContext,
-        lyrics: str,
-        music_style: str,
-        language: str = "Hindi"
-    ) -> str:
-        """
-        Validate lyrics for quality, meaning, and appropriateness before music generation.
-        Use this when user provides lyrics for a non-instrumental track.
-        
-        Args:
-            lyrics: The lyrics text to validate
-            music_style: Type of music (e.g., "Krishna Bhajan", "Meditation", "Shiva Stotram")
-            language: Language of lyrics (Hindi, Sanskrit, English)
-        
-        Returns:
-            Validation result with feedback
-        """
-        logger.info(f"Validating lyrics for {music_style} in {language}")
-        
+    async def _llm_validate_lyrics(self, lyrics: str, music_style: str, language: str) -> dict:
+        """Rubric check by gpt-4o-mini; returns the parsed JSON verdict."""
         validation_prompt = f"""You are a professional lyricist and music critic specializing in spiritual and devotional music.
 
 Analyze the following lyrics for a {music_style} in {language}:
@@ -342,24 +450,51 @@ Minimum acceptable overall_score: 7.0
 If overall_score < 7.0, set is_valid to false.
 """
 
+        import openai
+        client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        
+        response = await client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": "You are a professional lyricist specializing in devotional music."},
+                {"role": "user", "content": validation_prompt}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.3
+        )
+        
+        result_text = response.choices[0].message.content
+        return json.loads(result_text)
+
+    @function_tool
+    async def validate_lyrics(
+        self,
+        context: RunContext,
+        lyrics: str,
+        music_style: str,
+        language: str = "Hindi"
+    ) -> str:
+        """
+        Validate lyrics for quality, meaning, and appropriateness before music generation.
+        Use this when user provides lyrics for a non-instrumental track.
+        
+        Args:
+            lyrics: The lyrics text to validate
+            music_style: Type of music (e.g., "Krishna Bhajan", "Meditation", "Shiva Stotram")
+            language: Language of lyrics (Hindi, Sanskrit, English)
+        
+        Returns:
+            Validation result with feedback
+        """
+        logger.info(f"Validating lyrics for {music_style} in {language}")
+
         try:
-            # Use OpenAI API directly for validation
-            import openai
-            client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-            
-            response = await client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a professional lyricist specializing in devotional music."},
-                    {"role": "user", "content": validation_prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.3
+            # Clear pass/fail cases and repeated lyrics never reach the LLM
+            result = await get_lyrics_prevalidator().validate(
+                lyrics, music_style, language,
+                lambda: self._llm_validate_lyrics(lyrics, music_style, language),
             )
             
-            result_text = response.choices[0].message.content
-            result = json.loads(result_text)
-            
             logger.info(f"Validation result: {result}")
             
             # Format user-friendly response
@@ -389,20 +524,9 @@ If overall_score < 7.0, set is_valid to false.
         Use this when the user asks for "last track", "recent music", or "my songs".
         """
         try:
-            import aiohttp
-            
-            # Get tracks from auth server (still using auth-server for track retrieval)
-            auth_server_url = os.getenv("AUTH_SERVER_URL", "https://satsang-auth-server-6ougd45dya-el.a.run.app")
-            url = f"{auth_server_url}/suno/tracks?userId={self.user_id}&limit=5"
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status != 200:
-                        logger.error(f"Failed to fetch tracks: {response.status}")
-                        return "I'm sorry, I couldn't retrieve your tracks right now."
-                    
-                    data = await response.json()
-                    tracks = data.get("tracks", [])
+            tracks = await self._get_tracks(5)
+            if tracks is None:
+                return "I'm sorry, I couldn't retrieve your tracks right now."
             
             if not tracks:
                 return "You haven't created any music tracks yet."
@@ -435,22 +559,11 @@ If overall_score < 7.0, set is_valid to false.
             Status message with play link if found, or instruction to check later.
         """
         try:
-            import aiohttp
-            
             logger.info(f"Checking song status for user {self.user_id}, title: '{song_title}'")
             
-            # Get tracks from auth server
-            auth_server_url = os.getenv("AUTH_SERVER_URL", "https://satsang-auth-server-6ougd45dya-el.a.run.app")
-            url = f"{auth_server_url}/suno/tracks?userId={self.user_id}&limit=20"
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status != 200:
-                        logger.error(f"Failed to fetch tracks: {response.status}")
-                        return "I'm having trouble checking your songs right now. Please try again in a moment."
-                    
-                    data = await response.json()
-                    tracks = data.get("tracks", [])
+            tracks = await self._get_tracks(20)
+            if tracks is None:
+                return "I'm having trouble checking your songs right now. Please try again in a moment."
             
             if not tracks:
                 return "You haven't created any music tracks yet. Would you like to create one?"
@@ -499,6 +612,46 @@ If overall_score < 7.0, set is_valid to false.
             logger.error(f"Failed to check song status: {e}")
             return "I'm having trouble checking your songs right now. Please try again in a moment."
                 
+    async def _play_pooled_track(self, style: str):
+        """Play a pre-generated track if the requested style is stocked."""
+        style_key = match_style(style)
+        if not style_key:
+            return None
+        track = get_track_pool().take(style_key)
+        if track:
+            logger.info(f"Playing pooled {style_key} track '{track['title']}' while generation runs")
+            await self._play_audio_url(track["audioUrl"], track["title"])
+        return track
+
+    def _record_lyrics_approval(self, lyrics: str, title: str):
+        """Lyrics we offered and the user turned into a track go into the library."""
+        last = self._last_lyrics
+        if not last or normalize_lyrics(lyrics) != normalize_lyrics(last["lyrics"]):
+            return
+        try:
+            get_lyrics_library().record_approval(
+                lyrics, deity=last["deity"], theme=last["theme"], language=last["language"],
+                style=last["style"], mood=last["mood"], title=last["title"] or title, source=last["source"],
+            )
+        except Exception as e:
+            logger.warning(f"Could not record approved lyrics: {e}")
+
+    async def _on_job_done(self, result: dict):
+        """Completion reported by the Suno job tracker (callback was late or missing)."""
+        if result["status"] == COMPLETED and self._on_tracks_ready:
+            await self._on_tracks_ready(result["tracks"])
+        elif result["status"] != COMPLETED:
+            logger.warning(f"Suno task {result['task_id']} ended with {result['status']}: {result['error']}")
+
+    async def _publish_json(self, payload: dict):
+        """Send a JSON message to the frontend over the data channel."""
+        if not self._publish_data_fn:
+            return
+        try:
+            await self._publish_data_fn(json.dumps(payload).encode("utf-8"))
+        except Exception as e:
+            logger.error(f"Error publishing data: {e}")
+
     async def _play_audio_url(self, url: str, title: str):
         """Internal helper to publish play event to frontend."""
         if not self._publish_data_fn:
@@ -509,7 +662,8 @@ If overall_score < 7.0, set is_valid to false.
             payload = {
                 "name": title,
                 "artist": "RRAASI AI",
-                "audio_url": url,
+                # Local copy when cached; the Suno CDN is slow to start streaming
+                "audio_url": get_media_cache().rewrite_url(url),
                 "message": f"Playing '{title}'..."
             }
             await self._publish_data_fn(json.dumps(payload).encode("utf-8"))
@@ -654,8 +808,13 @@ async def entrypoint(ctx: JobContext):
     
     logger.info(f"Using TTS voice: {tts_voice} for language: {user_language}")
     
+    # Mirror the user's tracks from Firestore; the Suno callback writes them there
+    track_listener = TrackListener(user_id)
+    listener_task = asyncio.create_task(track_listener.start())
+    ctx.add_shutdown_callback(track_listener.stop)
+    
     # Create assistant with userId
-    assistant = MusicAssistant(user_id=user_id)
+    assistant = MusicAssistant(user_id=user_id, track_listener=track_listener)
     
     # Create session
     session = AgentSession(
@@ -701,6 +860,36 @@ async def entrypoint(ctx: JobContext):
         except Exception as e:
             logger.error(f"Error handling chat message: {e}")
     
+    announced = set()
+
+    async def announce_completed(tracks):
+        """Play a track the moment it is ready (callback write or tracker poll)."""
+        # Both paths can report the same clips (Suno IDs are the Firestore doc IDs),
+        # and the second variation of a song arrives after the first
+        fresh = [t for t in tracks if t.get("id") not in announced and t.get("title") not in announced]
+        announced.update(t.get("id") for t in tracks)
+        announced.update(t.get("title") for t in tracks)
+        if not fresh:
+            return
+        get_suno_job_tracker().resolve_from_callback(user_id, [t.get("title") for t in fresh])
+        # Suno returns two variations per request; play the first
+        track = fresh[0]
+        title = track.get("title", "Untitled")
+        await assistant._play_audio_url(track["audioUrl"], title)
+        if user_language == "hi":
+            await session.say(f"आपका गीत '{title}' तैयार है और अब चल रहा है!")
+        else:
+            await session.say(f"Your song '{title}' is ready and playing now!")
+    
+    track_listener.on_completed = announce_completed
+    assistant._on_tracks_ready = announce_completed
+    
+    async def release_suno_jobs():
+        get_suno_job_tracker().release(assistant)
+    
+    ctx.add_shutdown_callback(release_suno_jobs)
+    await listener_task
+    
     # Send language-appropriate welcome message
     if user_language == "hi":
         welcome_msg = (
@@ -251,6 +251,7 @@ RESPONSE STYLE:
             try:
                 # Prefer package-relative import
                 from .osho_discourse_search import search_osho_discourse_async  # type: ignore
+                from .media_cache import get_media_cache  # type: ignore
             except ImportError:
                 import sys
                 from pathlib import Path
@@ -258,6 +259,7 @@ RESPONSE STYLE:
                 if str(src_path) not in sys.path:
                     sys.path.insert(0, str(src_path))
                 from osho_discourse_search import search_osho_discourse_async  # type: ignore
+                from media_cache import get_media_cache  # type: ignore
 
             max_results = max(1, min(int(max_results), 10))
             
@@ -312,7 +314,8 @@ RESPONSE STYLE:
                 play_payload = {
                     "name": first_title,
                     "artist": series_name,
-                    "mp3Url": first_mp3_url,  # Direct MP3 URL for HTML5 audio playback
+                    # Direct MP3 URL for HTML5 audio playback; the local range server's copy once cached
+                    "mp3Url": get_media_cache().rewrite_url(first_mp3_url),
                     "topic": first_topic,
                     "seriesName": series_name,
                     "message": f"Osho discourse '{first_title}' is now playing.",
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Local Panchang calculations.
+
+Low-precision solar/lunar ephemeris (after Meeus, "Astronomical Algorithms")
+good to roughly 0.01° for the Sun and 0.3° for the Moon, which places tithi
+and nakshatra transitions within a few minutes. That is plenty for muhurta
+search and avoids one astrologyapi.com call per candidate day.
+
+All instants are Julian Days (UT). Local times use a fixed timezone offset in
+hours, matching the `tzone` convention of astrologyapi.com.
+"""
+
+import math
+from datetime import datetime, date, timedelta, timezone
+from typing import Optional, List, Tuple
+
+from jyotish_constants import NAKSHATRA_SPAN
+
+J2000 = 2451545.0
+_UNIX_EPOCH_JD = 2440587.5
+
+# Weekday index: 0 = Sunday ... 6 = Saturday (Vedic vara order)
+VARAS = ["Ravivar", "Somvar", "Mangalvar", "Budhvar", "Guruvar", "Shukravar", "Shanivar"]
+VARA_LORDS = ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn"]
+
+TITHIS = [
+    "Pratipada", "Dwitiya", "Tritiya", "Chaturthi", "Panchami",
+    "Shashthi", "Saptami", "Ashtami", "Navami", "Dashami",
+    "Ekadashi", "Dwadashi", "Trayodashi", "Chaturdashi",
+]
+
+# Eighth-of-daytime segment (1-based) for Rahu Kaal, Yamaganda and Gulika by vara
+RAHU_KAAL_SEGMENT = [8, 2, 7, 5, 6, 4, 3]
+YAMAGANDA_SEGMENT = [5, 4, 3, 2, 1, 7, 6]
+GULIKA_SEGMENT = [7, 6, 5, 4, 3, 2, 1]
+
+# Choghadiya cycles and the starting choghadiya for each vara
+DAY_CHOGHADIYA_CYCLE = ["Udveg", "Char", "Labh", "Amrit", "Kaal", "Shubh", "Rog"]
+NIGHT_CHOGHADIYA_CYCLE = ["Shubh", "Amrit", "Char", "Rog", "Kaal", "Labh", "Udveg"]
+DAY_CHOGHADIYA_START = ["Udveg", "Amrit", "Rog", "Labh", "Shubh", "Char", "Kaal"]
+NIGHT_CHOGHADIYA_START = ["Shubh", "Char", "Kaal", "Udveg", "Amrit", "Rog", "Labh"]
+
+# Chaldean order used for successive horas
+HORA_SEQUENCE = ["Saturn", "Jupiter", "Mars", "Sun", "Venus", "Mercury", "Moon"]
+
+
+def _norm360(angle: float) -> float:
+    return angle % 360.0
+
+
+def _sin(deg: float) -> float:
+    return math.sin(math.radians(deg))
+
+
+def _cos(deg: float) -> float:
+    return math.cos(math.radians(deg))
+
+
+def datetime_to_jd(dt: datetime) -> float:
+    """Convert an aware datetime (or naive UTC) to a Julian Day."""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return _UNIX_EPOCH_JD + (dt - datetime(1970, 1, 1)).total_seconds() / 86400.0
+
+
+def jd_to_local(jd: float, tzone: float) -> datetime:
+    """Convert a Julian Day to a naive local datetime for the given offset."""
+    seconds = (jd - _UNIX_EPOCH_JD) * 86400.0 + tzone * 3600.0
+    return datetime(1970, 1, 1) + timedelta(seconds=round(seconds))
+
+
+def local_midnight_jd(day: date, tzone: float) -> float:
+    """Julian Day of local midnight at the start of `day`."""
+    return datetime_to_jd(datetime(day.year, day.month, day.day)) - tzone / 24.0
+
+
+def sun_longitude(jd: float) -> float:
+    """Apparent tropical longitude of the Sun in degrees."""
+    t = (jd - J2000) / 36525.0
+    l0 = 280.46646 + 36000.76983 * t + 0.0003032 * t * t
+    m = 357.52911 + 35999.05029 * t - 0.0001537 * t * t
+    c = (
+        (1.914602 - 0.004817 * t - 0.000014 * t * t) * _sin(m)
+        + (0.019993 - 0.000101 * t) * _sin(2 * m)
+        + 0.000289 * _sin(3 * m)
+    )
+    omega = 125.04 - 1934.136 * t
+    return _norm360(l0 + c - 0.00569 - 0.00478 * _sin(omega))
+
+
+def moon_longitude(jd: float) -> float:
+    """Tropical longitude of the Moon in degrees (main periodic terms only)."""
+    t = (jd - J2000) / 36525.0
+    lp = 218.3164477 + 481267.88123421 * t
+    d = 297.8501921 + 445267.1114034 * t
+    m = 357.5291092 + 35999.0502909 * t
+    mp = 134.9633964 + 477198.8675055 * t
+    f = 93.2720950 + 483202.0175233 * t
+    lon = (
+        lp
+        + 6.288774 * _sin(mp)
+        + 1.274027 * _sin(2 * d - mp)
+        + 0.658314 * _sin(2 * d)
+        + 0.213618 * _sin(2 * mp)
+        - 0.185116 * _sin(m)
+        - 0.114332 * _sin(2 * f)
+        + 0.058793 * _sin(2 * d - 2 * mp)
+        + 0.057066 * _sin(2 * d - m - mp)
+        + 0.053322 * _sin(2 * d + mp)
+        + 0.045758 * _sin(2 * d - m)
+        - 0.040923 * _sin(m - mp)
+        - 0.034720 * _sin(d)
+        - 0.030383 * _sin(m + mp)
+        + 0.015327 * _sin(2 * d - 2 * f)
+        - 0.012528 * _sin(mp + 2 * f)
+        + 0.010980 * _sin(mp - 2 * f)
+        + 0.010675 * _sin(4 * d - mp)
+        + 0.010034 * _sin(3 * mp)
+        + 0.008548 * _sin(4 * d - 2 * mp)
+    )
+    return _norm360(lon)
+
+
+def lahiri_ayanamsa(jd: float) -> float:
+    """Approximate Lahiri (Chitrapaksha) ayanamsa in degrees."""
+    years = (jd - J2000) / 365.25
+    return 23.853 + years * 50.2388 / 3600.0
+
+
+def tithi_index(jd: float) -> int:
+    """Tithi at `jd` as 0..29 (0-14 Shukla paksha, 15-29 Krishna paksha)."""
+    elongation = _norm360(moon_longitude(jd) - sun_longitude(jd))
+    return int(elongation // 12.0) % 30
+
+
+def tithi_name(index: int) -> str:
+    """Human-readable tithi name, e.g. "Shukla Ekadashi" or "Amavasya"."""
+    if index == 14:
+        return "Purnima"
+    if index == 29:
+        return "Amavasya"
+    paksha = "Shukla" if index < 15 else "Krishna"
+    return f"{paksha} {TITHIS[index % 15]}"
+
+
+def nakshatra_index(jd: float) -> int:
+    """Sidereal (Lahiri) nakshatra of the Moon at `jd` as 0..26."""
+    sidereal = _norm360(moon_longitude(jd) - lahiri_ayanamsa(jd))
+    return int(sidereal // NAKSHATRA_SPAN) % 27
+
+
+def _solar_position(jd: float) -> Tuple[float, float]:
+    """Return (declination degrees, equation of time minutes) at `jd`."""
+    t = (jd - J2000) / 36525.0
+    l0 = _norm360(280.46646 + 36000.76983 * t)
+    m = 357.52911 + 35999.05029 * t
+    e = 0.016708634 - 0.000042037 * t
+    omega = 125.04 - 1934.136 * t
+    epsilon = 23.439291 - 0.0130042 * t + 0.00256 * _cos(omega)
+    declination = math.degrees(math.asin(_sin(epsilon) * _sin(sun_longitude(jd))))
+    y = math.tan(math.radians(epsilon / 2)) ** 2
+    eot = 4 * math.degrees(
+        y * _sin(2 * l0)
+        - 2 * e * _sin(m)
+        + 4 * e * y * _sin(m) * _cos(2 * l0)
+        - 0.5 * y * y * _sin(4 * l0)
+        - 1.25 * e * e * _sin(2 * m)
+    )
+    return declination, eot
+
+
+def _sun_event(day: date, lat: float, lon: float, tzone: float, rising: bool) -> Optional[float]:
+    midnight = local_midnight_jd(day, tzone)
+    jd = midnight + 0.5  # first guess: local noon
+    for _ in range(2):
+        declination, eot = _solar_position(jd)
+        cos_h = (_sin(-0.833) - _sin(lat) * _sin(declination)) / (_cos(lat) * _cos(declination))
+        if abs(cos_h) > 1:
+            return None  # polar day/night
+        hour_angle = math.degrees(math.acos(cos_h))
+        noon_utc_minutes = 720 - 4 * lon - eot
+        event_minutes = noon_utc_minutes + (-4 * hour_angle if rising else 4 * hour_angle)
+        jd = datetime_to_jd(datetime(day.year, day.month, day.day)) + event_minutes / 1440.0
+    return jd
+
+
+def sunrise(day: date, lat: float, lon: float, tzone: float) -> Optional[float]:
+    """Julian Day of sunrise on local date `day`, or None at polar latitudes."""
+    return _sun_event(day, lat, lon, tzone, rising=True)
+
+
+def sunset(day: date, lat: float, lon: float, tzone: float) -> Optional[float]:
+    """Julian Day of sunset on local date `day`, or None at polar latitudes."""
+    return _sun_event(day, lat, lon, tzone, rising=False)
+
+
+def vara(day: date) -> int:
+    """Vedic weekday index for a civil date (0 = Sunday)."""
+    return (day.weekday() + 1) % 7
+
+
+def find_transitions(
+    fn,
+    start_jd: float,
+    end_jd: float,
+    step_days: float = 1.0 / 12,
+    tolerance_days: float = 1.0 / 1440,
+) -> List[Tuple[float, int]]:
+    """
+    Sample an integer-valued function of time and bisect each change.
+
+    Returns:
+        List of (jd, new_value) transitions in [start_jd, end_jd], preceded by
+        (start_jd, value_at_start). Step must be shorter than the shortest
+        interval of constant value (tithis and nakshatras last > 19 h).
+    """
+    transitions = [(start_jd, fn(start_jd))]
+    lo, lo_val = start_jd, transitions[0][1]
+    while lo < end_jd:
+        hi = min(lo + step_days, end_jd)
+        hi_val = fn(hi)
+        if hi_val != lo_val:
+            a, b = lo, hi
+            while b - a > tolerance_days:
+                mid = (a + b) / 2
+                if fn(mid) == lo_val:
+                    a = mid
+                else:
+                    b = mid
+            transitions.append((b, hi_val))
+        lo, lo_val = hi, hi_val
+    return transitions
+
+
+def day_panchang(day: date, lat: float, lon: float, tzone: float) -> Optional[dict]:
+    """
+    Compute the sunrise-to-sunrise divisions of a Vedic day.
+
+    Returns:
+        Dict with sunrise/sunset/next_sunrise (JD), vara, and interval lists
+        for rahu_kaal, yamaganda, gulika, choghadiya and hora, where each
+        interval is (start_jd, end_jd, label). None at polar latitudes.
+    """
+    rise = sunrise(day, lat, lon, tzone)
+    set_ = sunset(day, lat, lon, tzone)
+    next_rise = sunrise(day + timedelta(days=1), lat, lon, tzone)
+    if rise is None or set_ is None or next_rise is None:
+        return None
+
+    weekday = vara(day)
+    day_part = (set_ - rise) / 8
+    night_part = (next_rise - set_) / 8
+
+    def eighth(segment: int) -> Tuple[float, float]:
+        start = rise + (segment - 1) * day_part
+        return (start, start + day_part)
+
+    choghadiya = []
+    cycle_start = DAY_CHOGHADIYA_CYCLE.index(DAY_CHOGHADIYA_START[weekday])
+    for i in range(8):
+        name = DAY_CHOGHADIYA_CYCLE[(cycle_start + i) % 7]
+        choghadiya.append((rise + i * day_part, rise + (i + 1) * day_part, name))
+    cycle_start = NIGHT_CHOGHADIYA_CYCLE.index(NIGHT_CHOGHADIYA_START[weekday])
+    for i in range(8):
+        name = NIGHT_CHOGHADIYA_CYCLE[(cycle_start + i) % 7]
+        choghadiya.append((set_ + i * night_part, set_ + (i + 1) * night_part, name))
+
+    hora = []
+    lord_index = HORA_SEQUENCE.index(VARA_LORDS[weekday])
+    day_hora, night_hora = (set_ - rise) / 12, (next_rise - set_) / 12
+    for i in range(24):
+        if i < 12:
+            start, length = rise + i * day_hora, day_hora
+        else:
+            start, length = set_ + (i - 12) * night_hora, night_hora
+        hora.append((start, start + length, HORA_SEQUENCE[(lord_index + i) % 7]))
+
+    return {
+        "date": day,
+        "vara": weekday,
+        "sunrise": rise,
+        "sunset": set_,
+        "next_sunrise": next_rise,
+        "rahu_kaal": [(*eighth(RAHU_KAAL_SEGMENT[weekday]), "Rahu Kaal")],
+        "yamaganda": [(*eighth(YAMAGANDA_SEGMENT[weekday]), "Yamaganda")],
+        "gulika": [(*eighth(GULIKA_SEGMENT[weekday]), "Gulika Kaal")],
+        "choghadiya": choghadiya,
+        "hora": hora,
+    }
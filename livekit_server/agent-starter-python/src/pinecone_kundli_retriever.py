@@ -1,38 +1,314 @@
 import os
+import asyncio
 import logging
-from typing import Optional, Dict, Any, List
-from pinecone import Pinecone
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional, Dict, Any, List, Iterable
+
+from jyotish_constants import PLANETS
+from chart_codec import encode_chart, decode_chart
+from embedding_service import get_embedding_service
+from local_index import open_index
 
 logger = logging.getLogger("pinecone_kundli_retriever")
 
+DASHA_SYSTEMS = ["vimshottari"]
+DOSHA_TYPES = ["manglik", "kalsarpa", "pitra", "sadhesati"]
+
+
+# ============================================
+# DOCUMENT IDS
+# Each chart document is addressable by ID so lookups use `fetch` instead
+# of a zero-vector query with a metadata filter.
+# ============================================
+
+def chart_doc_id(user_id: str) -> str:
+    return f"{user_id}:chart"
+
+
+def planet_doc_id(user_id: str, planet_name: str) -> str:
+    return f"{user_id}:planet:{planet_name.lower()}"
+
+
+def house_doc_id(user_id: str, house_number: int) -> str:
+    return f"{user_id}:house:{int(house_number)}"
+
+
+def dasha_doc_id(user_id: str, dasha_type: str = "vimshottari") -> str:
+    return f"{user_id}:dasha:{dasha_type.lower()}"
+
+
+def dosha_doc_id(user_id: str, dosha_type: str) -> str:
+    return f"{user_id}:dosha:{dosha_type.lower()}"
+
+
+def document_id(user_id: str, metadata: Dict[str, Any]) -> str:
+    """ID for a chart document from its metadata (`data_type` plus the type's key field)."""
+    data_type = metadata.get("data_type", "chart")
+    if data_type == "planet":
+        return planet_doc_id(user_id, metadata["planet_name"])
+    if data_type == "house":
+        return house_doc_id(user_id, metadata["house_number"])
+    if data_type == "dasha":
+        return dasha_doc_id(user_id, metadata.get("dasha_system", "vimshottari"))
+    if data_type == "dosha":
+        return dosha_doc_id(user_id, metadata["dosha_name"])
+    return chart_doc_id(user_id)
+
+
+def chart_embedding_text(user_id: str, chart_data: Dict[str, Any]) -> str:
+    """Text embedded for a chart document (shared by save_basic_chart and bulk ingestion)."""
+    return f"""
+            Birth chart for user {user_id}.
+            Birth Date: {chart_data.get('birthDate', 'N/A')}
+            Birth Time: {chart_data.get('birthTime', 'N/A')}
+            Birth Place: {chart_data.get('birthPlace', 'N/A')}
+            Rashi: {chart_data.get('rashi', 'N/A')}
+            Lagna: {chart_data.get('lagna', 'N/A')}
+            """.strip()
+
+
+def chart_metadata(user_id: str, chart_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Pinecone metadata for a chart document, in the packed chart schema."""
+    return encode_chart({**chart_data, "userId": user_id, "data_type": "chart"})
+
+# The Pinecone SDK is synchronous. All index calls run on this bounded pool
+# so a slow round trip never blocks the agent's event loop (audio, STT, TTS).
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("PINECONE_MAX_WORKERS", "4")),
+            thread_name_prefix="pinecone",
+        )
+    return _executor
+
+
 class KundliRetriever:
     """
     Retrieves user's Kundli data from Pinecone based on Firebase UID.
     """
     
-    def __init__(self):
-        api_key = os.getenv("PINECONE_API_KEY")
-        index_name = os.getenv("PINECONE_INDEX", "rraasi-rag")
+    def __init__(self, index=None, timeout: Optional[float] = None):
+        """
+        Args:
+            index: Pinecone-compatible index to use instead of connecting to
+                PINECONE_INDEX (e.g. for tests or a local index)
+            timeout: Per-call timeout in seconds for reads (default PINECONE_TIMEOUT or 3s)
+        """
+        # Using OpenAI's text-embedding-3-small dimension
+        self.embedding_dimension = 1536
+        self.timeout = timeout or float(os.getenv("PINECONE_TIMEOUT", "3.0"))
+        # Writes carry a 1536-d vector and are not on the conversational hot path
+        self.write_timeout = max(self.timeout, 10.0)
+        
+        # Documents loaded by load_session_documents(), keyed by user
+        self._session_documents: Dict[str, Dict[str, Any]] = {}
         
-        if not api_key:
-            logger.error("PINECONE_API_KEY not set")
-            raise ValueError("PINECONE_API_KEY not set")
+        if index is not None:
+            self.index = index
+            return
         
+        index_name = os.getenv("PINECONE_INDEX", "rraasi-rag")
         logger.info(f"Initializing Pinecone client for index: {index_name}")
         
         try:
-            # Initialize Pinecone
-            self.pc = Pinecone(api_key=api_key)
-            self.index = self.pc.Index(index_name)
-            
-            # Using OpenAI's text-embedding-3-small dimension
-            self.embedding_dimension = 1536
-            
+            # PINECONE_BACKEND=local swaps in the in-memory index
+            self.index = open_index(index_name)
             logger.info("✅ Pinecone client initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Pinecone: {e}")
             raise
     
+    async def _run(self, fn, *args, timeout: Optional[float] = None, **kwargs):
+        """
+        Run a blocking index call on the Pinecone executor.
+        
+        Raises asyncio.TimeoutError if it takes longer than `timeout`; the
+        worker thread finishes in the background but the caller moves on.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(_get_executor(), partial(fn, *args, **kwargs))
+        try:
+            return await asyncio.wait_for(future, timeout or self.timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Pinecone {getattr(fn, '__name__', 'call')} timed out after {timeout or self.timeout:.1f}s")
+            raise
+    
+    async def _query_one(self, filter: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Metadata lookup: zero-vector query with an exact-match filter."""
+        result = await self._run(
+            self.index.query,
+            vector=[0.0] * self.embedding_dimension,
+            filter=filter,
+            top_k=1,
+            include_metadata=True
+        )
+        if result.matches:
+            return decode_chart(result.matches[0].metadata)
+        return None
+    
+    async def _fetch(self, ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch many documents by ID in one request; returns id -> metadata for those found."""
+        result = await self._run(self.index.fetch, ids=list(ids))
+        vectors = result.get("vectors", {}) if isinstance(result, dict) else getattr(result, "vectors", {})
+        documents = {}
+        for vector_id, vector in (vectors or {}).items():
+            metadata = vector.get("metadata") if isinstance(vector, dict) else getattr(vector, "metadata", None)
+            if metadata is not None:
+                documents[vector_id] = decode_chart(metadata)
+        return documents
+    
+    async def get_chart_documents(
+        self,
+        user_id: str,
+        planets: Iterable[str] = (),
+        houses: Iterable[int] = (),
+        dashas: Iterable[str] = (),
+        doshas: Iterable[str] = (),
+        include_chart: bool = True,
+        legacy_fallback: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Load several chart documents for a user with a single fetch.
+        
+        "Tell me about my Saturn, 7th house and current dasha" becomes one
+        request instead of three filtered queries. Served from memory when
+        the session's documents were preloaded.
+        
+        Args:
+            user_id: Firebase UID
+            planets: Planet names (sun, moon, ...)
+            houses: House numbers (1-12)
+            dashas: Dasha systems (vimshottari)
+            doshas: Dosha names (manglik, kalsarpa, pitra, sadhesati)
+            include_chart: Also load the main chart document
+            legacy_fallback: Use the old filtered query for documents not
+                stored under the ID layout yet
+            
+        Returns:
+            {"chart": dict|None, "planets": {name: dict}, "houses": {n: dict},
+             "dashas": {system: dict}, "doshas": {name: dict}}
+        """
+        wanted = {}
+        if include_chart:
+            wanted[chart_doc_id(user_id)] = ("chart", None)
+            # Charts saved before the ID layout live under the bare user ID
+            wanted[user_id] = ("legacy_chart", None)
+        for planet in planets:
+            wanted[planet_doc_id(user_id, planet)] = ("planets", planet.lower())
+        for house in houses:
+            wanted[house_doc_id(user_id, house)] = ("houses", int(house))
+        for dasha in dashas:
+            wanted[dasha_doc_id(user_id, dasha)] = ("dashas", dasha.lower())
+        for dosha in doshas:
+            wanted[dosha_doc_id(user_id, dosha)] = ("doshas", dosha.lower())
+        
+        preloaded = self._session_documents.get(user_id)
+        if preloaded is not None:
+            found = {doc_id: preloaded[doc_id] for doc_id in wanted if doc_id in preloaded}
+        else:
+            found = await self._fetch(wanted)
+        
+        result: Dict[str, Any] = {"chart": None, "planets": {}, "houses": {}, "dashas": {}, "doshas": {}}
+        for doc_id, (section, key) in wanted.items():
+            metadata = found.get(doc_id)
+            if metadata is None:
+                continue
+            if section == "chart":
+                result["chart"] = metadata
+            elif section == "legacy_chart":
+                result["chart"] = result["chart"] or metadata
+            else:
+                result[section][key] = metadata
+        
+        if legacy_fallback:
+            # Per section: a preload only holds documents stored under the ID layout
+            await self._fill_from_legacy_queries(user_id, result, include_chart, wanted)
+            if preloaded is not None:
+                for doc_id, (section, key) in wanted.items():
+                    if section in ("chart", "legacy_chart") or doc_id in found:
+                        continue
+                    if key in result[section]:
+                        preloaded[doc_id] = result[section][key]
+        return result
+    
+    async def _fill_from_legacy_queries(
+        self,
+        user_id: str,
+        result: Dict[str, Any],
+        include_chart: bool,
+        wanted: Dict[str, Any],
+    ):
+        """Query by metadata filter for requested documents the fetch did not find."""
+        lookups = []
+        if include_chart and result["chart"] is None:
+            lookups.append(("chart", None, {"userId": {"$eq": user_id}}))
+        filters = {
+            "planets": lambda k: {"userId": user_id, "data_type": "planet", "planet_name": k},
+            "houses": lambda k: {"userId": user_id, "data_type": "house", "house_number": k},
+            "dashas": lambda k: {"userId": user_id, "data_type": "dasha", "dasha_system": k},
+            "doshas": lambda k: {"userId": user_id, "data_type": "dosha", "dosha_name": k},
+        }
+        for section, key in wanted.values():
+            if section in filters and key not in result[section]:
+                lookups.append((section, key, filters[section](key)))
+        if not lookups:
+            return
+        
+        found = await asyncio.gather(
+            *[self._query_one(f) for _, _, f in lookups],
+            return_exceptions=True
+        )
+        for (section, key, _), metadata in zip(lookups, found):
+            if isinstance(metadata, Exception) or metadata is None:
+                continue
+            if section == "chart":
+                result["chart"] = metadata
+            else:
+                result[section][key] = metadata
+    
+    async def load_session_documents(self, user_id: str) -> Dict[str, Any]:
+        """
+        Fetch all of a user's chart documents (chart, 9 planets, 12 houses,
+        dashas, doshas) in one request and keep them for the session, so
+        later tool calls are answered from memory.
+        """
+        documents = await self.get_chart_documents(
+            user_id,
+            planets=PLANETS,
+            houses=range(1, 13),
+            dashas=DASHA_SYSTEMS,
+            doshas=DOSHA_TYPES,
+            legacy_fallback=False,
+        )
+        if documents["chart"] is None:
+            # Chart only reachable through the old filtered query
+            await self._fill_from_legacy_queries(user_id, documents, True, {})
+        
+        flat: Dict[str, Any] = {}
+        if documents["chart"] is not None:
+            flat[chart_doc_id(user_id)] = documents["chart"]
+        for planet, metadata in documents["planets"].items():
+            flat[planet_doc_id(user_id, planet)] = metadata
+        for house, metadata in documents["houses"].items():
+            flat[house_doc_id(user_id, house)] = metadata
+        for dasha, metadata in documents["dashas"].items():
+            flat[dasha_doc_id(user_id, dasha)] = metadata
+        for dosha, metadata in documents["doshas"].items():
+            flat[dosha_doc_id(user_id, dosha)] = metadata
+        self._session_documents[user_id] = flat
+        
+        logger.info(f"Loaded {len(flat)} chart documents for user {user_id}")
+        return documents
+    
+    def release_session_documents(self, user_id: str):
+        """Drop a user's preloaded documents when their session ends."""
+        self._session_documents.pop(user_id, None)
+    
     async def get_user_kundli(self, user_id: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve user's complete Kundli data from Pinecone.
@@ -46,24 +322,13 @@ class KundliRetriever:
         try:
             logger.info(f"Fetching Kundli for user: {user_id}")
             
-            # Query Pinecone with userId filter
-            # We use a zero vector because we're filtering by metadata for exact match
-            # This is effectively a metadata lookup
-            query_response = self.index.query(
-                vector=[0.0] * self.embedding_dimension,
-                filter={"userId": {"$eq": user_id}},
-                top_k=1,
-                include_metadata=True
-            )
+            documents = await self.get_chart_documents(user_id)
+            kundli_data = documents["chart"]
             
-            if not query_response.matches:
+            if not kundli_data:
                 logger.warning(f"No Kundli found for user: {user_id}")
                 return None
             
-            # Get first match (should be user's birth chart)
-            match = query_response.matches[0]
-            kundli_data = match.metadata
-            
             logger.info(f"✅ Found Kundli for user {user_id}")
             return kundli_data
             
@@ -151,37 +416,26 @@ Beneficial Yogas: {kundli.get('yogas', 'None recorded')}
             chart_data: Dictionary containing birth details and basic chart info
         """
         try:
-            # Generate a simple summary text for embedding
-            summary_text = f"""
-            Birth chart for user {user_id}.
-            Birth Date: {chart_data.get('birthDate', 'N/A')}
-            Birth Time: {chart_data.get('birthTime', 'N/A')}
-            Birth Place: {chart_data.get('birthPlace', 'N/A')}
-            Rashi: {chart_data.get('rashi', 'N/A')}
-            Lagna: {chart_data.get('lagna', 'N/A')}
-            """.strip()
-            
-            # Generate embedding using OpenAI
-            from openai import AsyncOpenAI
-            openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-            
-            embedding_response = await openai_client.embeddings.create(
-                input=summary_text,
-                model="text-embedding-3-small"
-            )
-            embedding = embedding_response.data[0].embedding
+            # Cached by content: re-saving an unchanged chart skips the API call
+            embedding = await get_embedding_service().embed(chart_embedding_text(user_id, chart_data))
             
-            # Upsert to Pinecone
-            # Using user_id as the vector ID
-            self.index.upsert(
+            # Upsert to Pinecone under the chart document ID
+            metadata = chart_metadata(user_id, chart_data)
+            await self._run(
+                self.index.upsert,
                 vectors=[{
-                    "id": user_id,
+                    "id": chart_doc_id(user_id),
                     "values": embedding,
-                    "metadata": chart_data
-                }]
+                    "metadata": metadata
+                }],
+                timeout=self.write_timeout
             )
             
+            # Preloaded documents are stale now
+            self._session_documents.pop(user_id, None)
+            
             logger.info(f"✅ Saved basic chart for user: {user_id}")
+            return True
             
         except Exception as e:
             logger.error(f"Error saving basic chart: {e}")
@@ -203,20 +457,8 @@ Beneficial Yogas: {kundli.get('yogas', 'None recorded')}
             Planet data dict or None
         """
         try:
-            result = self.index.query(
-                vector=[0.0] * self.embedding_dimension,
-                filter={
-                    "userId": user_id,
-                    "data_type": "planet",
-                    "planet_name": planet_name.lower()
-                },
-                top_k=1,
-                include_metadata=True
-            )
-            
-            if result.matches:
-                return result.matches[0].metadata
-            return None
+            documents = await self.get_chart_documents(user_id, planets=[planet_name], include_chart=False)
+            return documents["planets"].get(planet_name.lower())
         except Exception as e:
             logger.error(f"Error fetching planet data: {e}")
             return None
@@ -237,20 +479,8 @@ Beneficial Yogas: {kundli.get('yogas', 'None recorded')}
             House data dict or None
         """
         try:
-            result = self.index.query(
-                vector=[0.0] * self.embedding_dimension,
-                filter={
-                    "userId": user_id,
-                    "data_type": "house",
-                    "house_number": house_number
-                },
-                top_k=1,
-                include_metadata=True
-            )
-            
-            if result.matches:
-                return result.matches[0].metadata
-            return None
+            documents = await self.get_chart_documents(user_id, houses=[house_number], include_chart=False)
+            return documents["houses"].get(int(house_number))
         except Exception as e:
             logger.error(f"Error fetching house data: {e}")
             return None
@@ -271,20 +501,8 @@ Beneficial Yogas: {kundli.get('yogas', 'None recorded')}
             Dasha data dict or None
         """
         try:
-            result = self.index.query(
-                vector=[0.0] * self.embedding_dimension,
-                filter={
-                    "userId": user_id,
-                    "data_type": "dasha",
-                    "dasha_system": dasha_type
-                },
-                top_k=1,
-                include_metadata=True
-            )
-            
-            if result.matches:
-                return result.matches[0].metadata
-            return None
+            documents = await self.get_chart_documents(user_id, dashas=[dasha_type], include_chart=False)
+            return documents["dashas"].get(dasha_type.lower())
         except Exception as e:
             logger.error(f"Error fetching dasha data: {e}")
             return None
@@ -305,20 +523,20 @@ Beneficial Yogas: {kundli.get('yogas', 'None recorded')}
             Dosha data dict or None
         """
         try:
-            result = self.index.query(
-                vector=[0.0] * self.embedding_dimension,
-                filter={
-                    "userId": user_id,
-                    "data_type": "dosha",
-                    "dosha_name": dosha_type.lower()
-                },
-                top_k=1,
-                include_metadata=True
-            )
-            
-            if result.matches:
-                return result.matches[0].metadata
-            return None
+            documents = await self.get_chart_documents(user_id, doshas=[dosha_type], include_chart=False)
+            return documents["doshas"].get(dosha_type.lower())
         except Exception as e:
             logger.error(f"Error fetching dosha data: {e}")
             return None
+
+
+# Process-level retriever: one Pinecone client shared by every job in a worker
+_retriever_instance: Optional[KundliRetriever] = None
+
+
+def get_kundli_retriever() -> KundliRetriever:
+    """Get singleton retriever instance (raises if Pinecone is not configured)."""
+    global _retriever_instance
+    if _retriever_instance is None:
+        _retriever_instance = KundliRetriever()
+    return _retriever_instance
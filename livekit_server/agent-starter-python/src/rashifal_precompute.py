@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Nightly precomputation of daily/weekly/monthly Rashifal.
+
+Fetches all 12 Rashis for every period and language once, with bounded
+concurrency, and derives the 27 Nakshatra entries from the Rashis they fall
+in. Results are written to the local RashifalStore that the Vedic astrology
+agent reads from.
+
+Usage:
+    python src/rashifal_precompute.py
+    python src/rashifal_precompute.py --periods daily --languages en,hi --concurrency 4
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+from dotenv import load_dotenv
+
+from astrology_api_client import AstrologyAPIClient
+from jyotish_constants import RASHIS, NAKSHATRAS, nakshatra_rashis
+from rashifal_store import RashifalStore, PERIODS, make_key
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+)
+logger = logging.getLogger("rashifal_precompute")
+
+# Load environment variables
+env_path = Path(__file__).resolve().parent.parent / ".env.local"
+load_dotenv(str(env_path))
+
+
+async def _fetch_rashi(
+    client: AstrologyAPIClient,
+    semaphore: asyncio.Semaphore,
+    period: str,
+    zodiac: str,
+    language: str,
+    timezone: float,
+) -> Optional[Dict[str, Any]]:
+    fetchers = {
+        "daily": client.get_daily_horoscope,
+        "weekly": client.get_weekly_horoscope,
+        "monthly": client.get_monthly_horoscope,
+    }
+    async with semaphore:
+        result = await fetchers[period](zodiac, timezone=timezone, language=language)
+    if not result:
+        logger.warning(f"No {period} prediction for {zodiac} ({language})")
+    return result
+
+
+def derive_nakshatra_entries(
+    rashi_entries: Dict[str, Any],
+    period: str,
+    language: str,
+) -> Dict[str, Any]:
+    """
+    Derive per-Nakshatra entries from the Rashi predictions.
+
+    A Nakshatra spans one or two Rashis; the entry carries the prediction of
+    each Rashi it falls in so the agent can answer by birth Nakshatra without
+    an extra API call per star.
+    """
+    entries = {}
+    for index, (name, lord) in enumerate(NAKSHATRAS):
+        rashis = nakshatra_rashis(index)
+        predictions = {
+            zodiac: rashi_entries[make_key(period, "rashi", zodiac, language)]
+            for zodiac in rashis
+            if make_key(period, "rashi", zodiac, language) in rashi_entries
+        }
+        if not predictions:
+            continue
+        entries[make_key(period, "nakshatra", str(index), language)] = {
+            "nakshatra": name,
+            "lord": lord,
+            "rashis": rashis,
+            "predictions": predictions,
+        }
+    return entries
+
+
+async def precompute_rashifal(
+    client: AstrologyAPIClient,
+    periods: List[str],
+    languages: List[str],
+    concurrency: int = 4,
+    timezone: float = 5.5,
+) -> Dict[str, Any]:
+    """
+    Fetch every Rashi for each period/language and derive Nakshatra entries.
+
+    Returns:
+        Dict of store key -> entry
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    jobs = [
+        (period, zodiac, language)
+        for period in periods
+        for language in languages
+        for zodiac, _, _ in RASHIS
+    ]
+    results = await asyncio.gather(*[
+        _fetch_rashi(client, semaphore, period, zodiac, language, timezone)
+        for period, zodiac, language in jobs
+    ])
+
+    entries: Dict[str, Any] = {}
+    for (period, zodiac, language), result in zip(jobs, results):
+        if result:
+            entries[make_key(period, "rashi", zodiac, language)] = result
+
+    for period in periods:
+        for language in languages:
+            entries.update(derive_nakshatra_entries(entries, period, language))
+
+    return entries
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Precompute Rashifal for all Rashis and Nakshatras")
+    parser.add_argument("--periods", default=",".join(PERIODS), help="Comma-separated periods (default: daily,weekly,monthly)")
+    parser.add_argument("--languages", default=os.getenv("RASHIFAL_LANGUAGES", "en,hi"), help="Comma-separated language codes")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum concurrent API calls")
+    parser.add_argument("--timezone", type=float, default=5.5, help="Timezone offset for predictions")
+    parser.add_argument("--output", help="Store path (default: RASHIFAL_STORE_PATH or src/cache/rashifal.json)")
+    args = parser.parse_args()
+
+    periods = [p.strip() for p in args.periods.split(",") if p.strip() in PERIODS]
+    languages = [lang.strip() for lang in args.languages.split(",") if lang.strip()]
+
+    client = AstrologyAPIClient()
+    store = RashifalStore(args.output)
+
+    start = time.monotonic()
+    entries = await precompute_rashifal(
+        client,
+        periods=periods,
+        languages=languages,
+        concurrency=args.concurrency,
+        timezone=args.timezone,
+    )
+    elapsed = time.monotonic() - start
+    logger.info(f"API stats: {client.get_stats()}")
+    await client.close()
+
+    expected = len(periods) * len(languages) * (len(RASHIS) + len(NAKSHATRAS))
+    logger.info(f"Precomputed {len(entries)}/{expected} entries in {elapsed:.1f}s")
+
+    if entries:
+        store.write(entries)
+    else:
+        logger.error("No entries fetched; keeping existing store")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
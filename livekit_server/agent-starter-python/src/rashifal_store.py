@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Local keyed store for precomputed Rashifal (horoscope) predictions.
+
+The nightly job in rashifal_precompute.py writes a single JSON snapshot;
+agents read from it with a dict lookup, so answering a horoscope question
+never waits on astrologyapi.com during a conversation.
+
+Every entry records the period it was fetched for (day, ISO week or month
+in RASHIFAL_TZ_OFFSET, IST by default). An entry from an earlier period is
+a miss, so a failed nightly fetch never passes yesterday's prediction off
+as today's.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger("rashifal_store")
+
+_DEFAULT_STORE_PATH = Path(__file__).resolve().parent / "cache" / "rashifal.json"
+
+PERIODS = ("daily", "weekly", "monthly")
+
+# Predictions are fetched for Indian time (rashifal_precompute --timezone)
+DEFAULT_TZ_OFFSET = float(os.getenv("RASHIFAL_TZ_OFFSET", "5.5"))
+
+
+def make_key(period: str, kind: str, name: str, language: str) -> str:
+    """
+    Build a store key.
+
+    Args:
+        period: "daily", "weekly" or "monthly"
+        kind: "rashi" or "nakshatra"
+        name: Zodiac key (e.g. "aries") or nakshatra index as string
+        language: Language code (e.g. "en", "hi")
+    """
+    return f"{period}:{kind}:{name}:{language}"
+
+
+def period_id(period: str, now: Optional[datetime] = None, tz_offset: float = DEFAULT_TZ_OFFSET) -> str:
+    """
+    The day ("2025-03-14"), ISO week ("2025-W11") or month ("2025-03")
+    a prediction for `period` made at `now` (UTC) covers.
+    """
+    now = now or datetime.now(timezone.utc)
+    if now.tzinfo is None:
+        now = now.replace(tzinfo=timezone.utc)
+    local = (now + timedelta(hours=tz_offset)).date()
+    if period == "weekly":
+        year, week, _ = local.isocalendar()
+        return f"{year}-W{week:02d}"
+    if period == "monthly":
+        return local.strftime("%Y-%m")
+    return local.isoformat()
+
+
+class RashifalStore:
+    """
+    Read-mostly snapshot of precomputed predictions.
+
+    The snapshot is loaded once into memory and transparently reloaded when
+    the nightly job replaces the file, so lookups are O(1) dict reads.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or os.getenv("RASHIFAL_STORE_PATH", _DEFAULT_STORE_PATH))
+        self._entries: Dict[str, Any] = {}
+        self._periods: Dict[str, str] = {}
+        self._generated_at: Optional[str] = None
+        self._mtime: Optional[float] = None
+
+    def _maybe_reload(self):
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self._entries = snapshot.get("entries", {})
+            self._periods = snapshot.get("periods", {})
+            self._generated_at = snapshot.get("generated_at")
+            self._mtime = mtime
+            logger.info(f"Loaded {len(self._entries)} rashifal entries (generated {self._generated_at})")
+        except Exception as e:
+            logger.error(f"Failed to load rashifal store {self.path}: {e}")
+
+    def _current(self, key: str, current_period: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None and self._periods.get(key) != current_period:
+            logger.warning(f"Rashifal {key} is for {self._periods.get(key)}, not {current_period}; ignoring it")
+            return None
+        return entry
+
+    def get(
+        self,
+        period: str,
+        kind: str,
+        name: str,
+        language: str = "en",
+        now: Optional[datetime] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Look up a precomputed prediction for the current period.
+
+        Falls back to English if the requested language was not precomputed.
+        Entries fetched for an earlier day/week/month count as missing.
+        """
+        self._maybe_reload()
+        current_period = period_id(period, now)
+        entry = self._current(make_key(period, kind, name, language), current_period)
+        if entry is None and language != "en":
+            entry = self._current(make_key(period, kind, name, "en"), current_period)
+        return entry
+
+    @property
+    def generated_at(self) -> Optional[str]:
+        self._maybe_reload()
+        return self._generated_at
+
+    def write(self, entries: Dict[str, Any], now: Optional[datetime] = None):
+        """
+        Atomically replace the snapshot with new entries.
+
+        Existing entries that were not refreshed (e.g. a failed API call) are
+        kept with the period they were fetched for; get() skips them once
+        that period is over (a weekly entry still serves the rest of its week).
+        """
+        self._maybe_reload()
+        merged = dict(self._entries)
+        merged.update(entries)
+        periods = {key: value for key, value in self._periods.items() if key in merged}
+        for key in entries:
+            periods[key] = period_id(key.split(":", 1)[0], now)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".json.tmp")
+        snapshot = {
+            "generated_at": datetime.utcnow().isoformat(),
+            "entries": merged,
+            "periods": periods,
+        }
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        logger.info(f"Wrote {len(entries)} rashifal entries to {self.path}")
+
+
+def format_prediction(entry: Dict[str, Any]) -> str:
+    """Flatten an astrologyapi.com horoscope response into speakable text."""
+    if "predictions" in entry:
+        # Derived Nakshatra entry: one prediction per Rashi the Nakshatra spans
+        predictions = entry["predictions"]
+        if len(predictions) == 1:
+            return format_prediction(next(iter(predictions.values())))
+        return "\n\n".join(
+            f"{zodiac.capitalize()}:\n{format_prediction(p)}" for zodiac, p in predictions.items()
+        )
+    prediction = entry.get("prediction", entry)
+    if isinstance(prediction, str):
+        return prediction.strip()
+    if isinstance(prediction, list):
+        return " ".join(str(p).strip() for p in prediction if p)
+    if isinstance(prediction, dict):
+        parts = []
+        for field, text in prediction.items():
+            if not text:
+                continue
+            label = field.replace("_", " ").capitalize()
+            parts.append(f"{label}: {str(text).strip()}")
+        return "\n".join(parts)
+    return str(prediction)
+
+
+# Singleton instance
+_store_instance = None
+
+
+def get_rashifal_store() -> RashifalStore:
+    """Get singleton store instance."""
+    global _store_instance
+    if _store_instance is None:
+        _store_instance = RashifalStore()
+    return _store_instance
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Off-peak refill of the instant track pool (track_pool.py).
+
+Tops every pool style up to --target unserved tracks, lowest stock first,
+spending at most --budget Suno generations per run (each generation yields
+two tracks). Completion is picked up by the shared SunoJobTracker. Scheduled
+nightly by pm2 (job-track-pool-refill).
+
+Usage:
+    python src/refill_track_pool.py --status
+    python src/refill_track_pool.py --target 6 --budget 5
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+from dotenv import load_dotenv
+
+from suno_client import SunoClient
+from suno_job_tracker import SunoJobTracker, COMPLETED
+from track_pool import TrackPool, POOL_STYLES
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+)
+logger = logging.getLogger("refill_track_pool")
+
+# Load environment variables
+env_path = Path(__file__).resolve().parent.parent / ".env.local"
+load_dotenv(str(env_path))
+
+# Pool tracks are not a user's creations; the callback files them under this ID
+POOL_USER_ID = "track_pool"
+TRACKS_PER_GENERATION = 2
+
+
+def plan_generations(levels: Dict[str, int], target: int, budget: int) -> List[str]:
+    """Style keys to generate, one entry per generation, emptiest styles first."""
+    deficits = {key: math.ceil(max(0, target - count) / TRACKS_PER_GENERATION) for key, count in levels.items()}
+    planned = []
+    while len(planned) < budget and any(deficits.values()):
+        # Round-robin over the lowest stock, so a small budget is spread evenly
+        key = min((k for k, d in deficits.items() if d), key=lambda k: levels[k] + TRACKS_PER_GENERATION * planned.count(k))
+        planned.append(key)
+        deficits[key] -= 1
+    return planned
+
+
+async def refill(
+    pool: TrackPool,
+    client: SunoClient,
+    tracker: SunoJobTracker,
+    target: int,
+    budget: int,
+    callback_url: Optional[str] = None,
+) -> Dict[str, Any]:
+    styles = {style["key"]: style for style in POOL_STYLES}
+    planned = plan_generations(pool.stock_levels(), target, budget)
+    if not planned:
+        logger.info("Track pool is fully stocked")
+        return {"generations": 0, "stocked": 0, "failed": 0}
+
+    loop = asyncio.get_running_loop()
+    waiting = []
+    for key in planned:
+        style = styles[key]
+        try:
+            result = await client.generate_music(
+                prompt="",
+                is_instrumental=True,
+                custom_mode=True,
+                style=style["style"],
+                title=style["title"],
+                model="V3_5",
+                callback_url=callback_url,
+            )
+            task_id = (result.get("data") or {}).get("taskId") if result.get("code") == 200 else None
+        except Exception as e:
+            logger.error(f"Failed to start generation for {key}: {e}")
+            task_id = None
+        if not task_id:
+            continue
+        done = loop.create_future()
+        tracker.track(task_id, POOL_USER_ID, lambda r, d=done: _resolve(d, r), user_id=POOL_USER_ID, title=style["title"])
+        waiting.append((key, done))
+
+    stocked = failed = 0
+    for key, done in waiting:
+        result = await done
+        if result["status"] == COMPLETED:
+            stocked += pool.add(key, result["tracks"])
+        else:
+            failed += 1
+            logger.warning(f"Pool generation for {key} ended with {result['status']}: {result['error']}")
+
+    logger.info(f"Stocked {stocked} tracks from {len(waiting)} generations ({failed} failed)")
+    return {"generations": len(waiting), "stocked": stocked, "failed": failed}
+
+
+async def _resolve(future: asyncio.Future, result: Dict[str, Any]):
+    if not future.done():
+        future.set_result(result)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Top up the instant track pool")
+    parser.add_argument("--target", type=int, default=int(os.getenv("TRACK_POOL_TARGET", "6")),
+                        help="Unserved tracks to keep per style")
+    parser.add_argument("--budget", type=int, default=int(os.getenv("TRACK_POOL_REFILL_BUDGET", "6")),
+                        help="Maximum Suno generations this run")
+    parser.add_argument("--status", action="store_true", help="Print stock levels and exit")
+    args = parser.parse_args()
+
+    pool = TrackPool()
+    if args.status:
+        print(json.dumps(pool.stock_levels(), indent=2))
+        return
+
+    auth_server_url = os.getenv("AUTH_SERVER_URL", "https://satsang-auth-server-6ougd45dya-el.a.run.app")
+    client = SunoClient()
+    # Poll from the start: nobody is listening for the callback here
+    tracker = SunoJobTracker(first_delay=30)
+    try:
+        stats = await refill(pool, client, tracker, args.target, args.budget,
+                             callback_url=f"{auth_server_url}/suno/callback?userId={POOL_USER_ID}")
+    finally:
+        await tracker.close()
+        await client.close()
+    print(json.dumps({**stats, "stock": pool.stock_levels()}, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Cache of satsang plans and the artifacts derived from them.
+
+Hosted satsangs reuse one plan across scheduled sessions, and each session
+used to re-read it from Firestore, re-read the guru profile from disk and
+rebuild the hosted-mode instructions. Entries are keyed by planId and hold
+the plan, the resolved bhajan (title + YouTube video ID) and the hosted
+instructions per guru. The agent calls prefetch() as soon as a planId shows
+up in participant metadata, so the load overlaps the rest of discovery.
+The YouTube lookup for the bhajan gets BHAJAN_RESOLVE_TIMEOUT seconds; after
+that the entry is returned with the plan's title only and the lookup keeps
+running in the background, filling in entry["bhajan"] when it finishes.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Dict, Any, Callable, Awaitable
+
+logger = logging.getLogger("satsang_plan_cache")
+
+_GURU_PROFILES_DIR = Path(__file__).parent / "guru_profiles"
+
+PlanLoader = Callable[[str], Awaitable[Optional[Dict[str, Any]]]]
+BhajanResolver = Callable[[str], Awaitable[Optional[Dict[str, Any]]]]
+
+BHAJAN_RESOLVE_TIMEOUT = float(os.getenv("SATSANG_BHAJAN_RESOLVE_TIMEOUT", "1.5"))
+
+
+@lru_cache(maxsize=64)
+def _read_guru_profile(guru_id: str) -> str:
+    profile_path = _GURU_PROFILES_DIR / f"{guru_id}.json"
+    if not profile_path.exists():
+        return "{}"
+    return profile_path.read_text(encoding="utf-8")
+
+
+def load_guru_profile(guru_id: str) -> Dict[str, Any]:
+    """Guru profile JSON; each file is read from disk once per process."""
+    try:
+        return json.loads(_read_guru_profile(guru_id))
+    except Exception as e:
+        logger.error(f"Failed to load guru profile {guru_id}: {e}")
+        return {}
+
+
+def build_hosted_instructions(plan: Dict[str, Any], guru_id: str, bhajan: Dict[str, Any]) -> str:
+    """System instructions for strict hosted satsang mode."""
+    guru_profile = load_guru_profile(guru_id)
+    guru_name_display = guru_profile.get('name', guru_id.replace('_', ' ').title())
+    guru_tone = guru_profile.get('personality', {}).get('tone', 'Wise and compassionate')
+    guru_philosophy = guru_profile.get('teachings', {}).get('core_philosophy', 'Spiritual wisdom')
+    guru_signature = (guru_profile.get('personality', {}).get('signature_phrases') or ["Om Shanti"])[0]
+
+    intro_text = plan.get('intro_text', '')
+    pravachan_points = plan.get('pravachan_points', [])
+    closing_text = plan.get('closing_text', '')
+
+    pravachan_text = "\\n".join([f"- {p}" for p in pravachan_points])
+
+    return f"""
+IMPORTANT: YOU ARE IN **HOSTED SATSANG MODE**.
+You are NOT a general assistant. You are executing a formal spiritual session.
+
+IDENTITY & PERSONA (MAINTAIN AT ALL TIMES):
+- You are **{guru_name_display}**.
+- Core Philosophy: {guru_philosophy}
+- Tone: {guru_tone}
+- Speak as {guru_name_display} would, using first-person perspective.
+- Even while following the plan below, embody the wisdom, warmth, and specific style of your character.
+- Signature closing/blessing if appropriate: "{guru_signature}"
+
+SESSION TOPIC: {plan.get('topic', 'Satsang')}
+
+--- HOSTED SESSION RULES ---
+1. **SILENCE ON CONNECT**: Do NOT say "Namaste" or "Hello" when you join. Wait specifically for the 'START' signal from the host.
+2. **STRICT PHASE EXECUTION**:
+   - **INTRO**: When the session starts (you receive START signal), read the INTRO text below with warmth.
+   - **BHAJAN**: When asked for bhajan, play exactly: "{bhajan['title']}" (ID: {bhajan['video_id']}).
+   - **PRAVACHAN**: Deliver the discourse points below. Expand on them using your unique persona ({guru_name_display}) and philosophy.
+   - **CLOSING**: End with the closing message.
+3. **NO SMALL TALK**: Do not ask "How are you?" or "What else can I do?". You are the Guru delivering a sermon.
+
+--- CONTENT TO DELIVER ---
+INTRO TEXT:
+"{intro_text}"
+
+PRAVACHAN POINTS (Discourse) - EXPAND ON THESE AS {guru_name_display}:
+{pravachan_text}
+
+CLOSING TEXT:
+"{closing_text}"
+"""
+
+
+async def _load_plan_from_db(plan_id: str) -> Optional[Dict[str, Any]]:
+    try:
+        from .firebase_db import get_async_firebase_db
+    except ImportError:
+        from firebase_db import get_async_firebase_db
+    return await get_async_firebase_db().get_satsang_plan(plan_id)
+
+
+async def _search_bhajan(query: str) -> Optional[Dict[str, Any]]:
+    try:
+        from .youtube_search import find_youtube_video_async
+    except ImportError:
+        from youtube_search import find_youtube_video_async
+    return await find_youtube_video_async(query)
+
+
+class SatsangPlanCache:
+    """
+    TTL cache of satsang plans keyed by planId.
+
+    Each entry is a dict:
+        plan          the plan document
+        bhajan        {"title", "video_id"}; video_id is looked up on YouTube
+                      when the plan only has a bhajan_query
+        instructions  guru_id -> hosted instruction string
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = None,
+        loader: Optional[PlanLoader] = None,
+        bhajan_resolver: Optional[BhajanResolver] = None,
+    ):
+        self.ttl = ttl_seconds if ttl_seconds is not None else float(os.getenv("SATSANG_PLAN_CACHE_TTL", "43200"))
+        self._loader = loader or _load_plan_from_db
+        self._bhajan_resolver = bhajan_resolver or _search_bhajan
+        self._entries: Dict[str, tuple] = {}  # plan_id -> (entry, loaded_at)
+        self._inflight: Dict[str, tuple] = {}  # plan_id -> (task, embedded plan)
+        self._tasks = set()  # bhajan lookups still running after their entry was returned
+        self.hits = 0
+        self.misses = 0
+
+    def _fresh_entry(self, plan_id: str, plan: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        cached = self._entries.get(plan_id)
+        if not cached or time.monotonic() - cached[1] >= self.ttl:
+            return None
+        # A plan embedded in metadata wins over an older cached copy
+        if plan is not None and plan != cached[0]["plan"]:
+            return None
+        return cached[0]
+
+    def prefetch(self, plan_id: str, guru_id: Optional[str] = None, plan: Optional[Dict[str, Any]] = None):
+        """Start loading a plan in the background; no-op if cached or already loading."""
+        if not plan_id or self._fresh_entry(plan_id, plan) is not None:
+            return
+        inflight = self._inflight.get(plan_id)
+        if inflight is None or (plan is not None and inflight[1] != plan):
+            task = asyncio.get_running_loop().create_task(self._load(plan_id, guru_id, plan))
+            self._inflight[plan_id] = (task, plan)
+            task.add_done_callback(lambda t: self._forget(plan_id, t))
+            logger.info(f"📜 Prefetching satsang plan {plan_id}")
+
+    def _forget(self, plan_id: str, task: asyncio.Task):
+        if plan_id in self._inflight and self._inflight[plan_id][0] is task:
+            del self._inflight[plan_id]
+
+    async def get(
+        self, plan_id: str, guru_id: str, plan: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get the cache entry for a plan, with hosted instructions for guru_id.
+
+        Args:
+            plan_id: planId from participant metadata
+            guru_id: Guru the instructions are written for
+            plan: Full plan if it was embedded in metadata (skips the DB)
+
+        Returns:
+            Entry dict, or None if the plan could not be loaded
+        """
+        entry = self._fresh_entry(plan_id, plan) if plan_id else None
+        if entry is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            if plan_id:
+                self.prefetch(plan_id, guru_id, plan)
+                entry = await asyncio.shield(self._inflight[plan_id][0])
+            elif plan:
+                entry = await self._build_entry(plan)
+        if entry is None:
+            return None
+
+        if guru_id not in entry["instructions"]:
+            entry["instructions"][guru_id] = build_hosted_instructions(entry["plan"], guru_id, entry["bhajan"])
+        return entry
+
+    async def _load(self, plan_id: str, guru_id: Optional[str], plan: Optional[Dict[str, Any]]):
+        try:
+            if plan is None:
+                plan = await self._loader(plan_id)
+            if not plan:
+                logger.warning(f"Satsang plan {plan_id} not found")
+                return None
+            entry = await self._build_entry(plan)
+            if guru_id:
+                entry["instructions"][guru_id] = build_hosted_instructions(plan, guru_id, entry["bhajan"])
+            self._evict_expired()
+            self._entries[plan_id] = (entry, time.monotonic())
+            return entry
+        except Exception as e:
+            logger.error(f"❌ Failed to load satsang plan {plan_id}: {e}")
+            return None
+
+    def _evict_expired(self):
+        """Drop entries past their TTL; otherwise every plan ever seen stays in memory."""
+        cutoff = time.monotonic() - self.ttl
+        for plan_id in [pid for pid, (_, loaded_at) in self._entries.items() if loaded_at <= cutoff]:
+            del self._entries[plan_id]
+
+    async def _build_entry(self, plan: Dict[str, Any]) -> Dict[str, Any]:
+        query = plan.get('bhajan_query', '')
+        entry = {
+            "plan": plan,
+            "bhajan": {"title": plan.get('bhajan_title', query), "video_id": plan.get('bhajan_video_id', '')},
+            "instructions": {},
+        }
+        if entry["bhajan"]["video_id"] or not query:
+            return entry
+
+        task = asyncio.get_running_loop().create_task(self._resolve_bhajan(entry, query))
+        try:
+            await asyncio.wait_for(asyncio.shield(task), BHAJAN_RESOLVE_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"Bhajan lookup '{query}' still running, continuing without video ID")
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return entry
+
+    async def _resolve_bhajan(self, entry: Dict[str, Any], query: str):
+        plan = entry["plan"]
+        try:
+            result = await self._bhajan_resolver(query)
+        except Exception as e:
+            logger.error(f"Failed to resolve bhajan '{query}': {e}")
+            return
+        if result and result.get("video_id"):
+            entry["bhajan"] = {"title": plan.get('bhajan_title') or result.get("title", query),
+                               "video_id": result["video_id"]}
+            # Instructions built before the lookup finished name the bhajan without its ID
+            entry["instructions"].clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+# Singleton instance
+_plan_cache = None
+
+
+def get_satsang_plan_cache() -> SatsangPlanCache:
+    """Get singleton plan cache instance."""
+    global _plan_cache
+    if _plan_cache is None:
+        _plan_cache = SatsangPlanCache()
+    return _plan_cache
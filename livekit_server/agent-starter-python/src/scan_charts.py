@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Full-index chart completeness scan.
+
+Pages through every vector ID with `list` and reads metadata with batched
+`fetch`, instead of sampling the top 50 matches of a zero-vector query.
+Documents are grouped by the `userId` in their metadata, not by ID, because
+documents written before the ID layout have random IDs and sort anywhere in
+the listing. Per user only a few bitmasks and counters are kept (about 200
+bytes), never the documents themselves; rows are written once the listing
+is exhausted.
+
+Outputs:
+- A columnar report with one row per user: Parquet if pyarrow is installed,
+  otherwise CSV
+- A JSONL backlog of users whose charts need recomputing, one
+  {"userId", "missing", "completeness"} object per line
+- Aggregate statistics on stdout
+
+Usage:
+    python src/scan_charts.py
+    python src/scan_charts.py --output reports/charts.parquet --backlog reports/backlog.jsonl
+    PINECONE_BACKEND=local python src/scan_charts.py --page-size 50
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import time
+from collections import deque
+from functools import partial
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Iterator
+
+from dotenv import load_dotenv
+
+from chart_codec import decode_chart
+from jyotish_constants import PLANETS
+from local_index import open_index
+from pinecone_kundli_retriever import DASHA_SYSTEMS, DOSHA_TYPES
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+)
+logger = logging.getLogger("scan_charts")
+
+# Load environment variables
+env_path = Path(__file__).resolve().parent.parent / ".env.local"
+load_dotenv(str(env_path))
+
+_CACHE_DIR = Path(__file__).resolve().parent / "cache"
+
+# Chart fields counted for completeness (same set find_complete_charts.py uses)
+ASTRO_FIELDS = [
+    'rashi', 'lagna', 'nakshatra', 'nakshatraPada',
+    'mahadasha', 'antardasha', 'manglik',
+    'sun_sign', 'sun_house', 'moon_sign', 'moon_house',
+    'mars_sign', 'mars_house', 'mercury_sign', 'mercury_house',
+    'jupiter_sign', 'jupiter_house', 'venus_sign', 'venus_house',
+    'saturn_sign', 'saturn_house', 'rahu_sign', 'rahu_house',
+    'ketu_sign', 'ketu_house'
+]
+_EMPTY_VALUES = {'unknown', 'n/a', 'none', ''}
+
+_PLANET_BITS = {planet.lower(): 1 << i for i, planet in enumerate(PLANETS)}
+_DASHA_BITS = {dasha: 1 << i for i, dasha in enumerate(DASHA_SYSTEMS)}
+_DOSHA_BITS = {dosha: 1 << i for i, dosha in enumerate(DOSHA_TYPES)}
+_ALL_PLANETS = (1 << len(PLANETS)) - 1
+_ALL_HOUSES = ((1 << 12) - 1) << 1  # bits 1-12
+_ALL_DASHAS = (1 << len(DASHA_SYSTEMS)) - 1
+_ALL_DOSHAS = (1 << len(DOSHA_TYPES)) - 1
+
+REPORT_COLUMNS = [
+    "user_id", "has_chart", "legacy_chart", "chart_fields", "completeness",
+    "planets", "houses", "dashas", "doshas", "documents", "missing", "needs_recompute",
+]
+
+# Fetch requests carry IDs in the URL; keep pages well under its length limit
+DEFAULT_PAGE_SIZE = 100
+
+
+def _filled(value: Any) -> bool:
+    return value is not None and str(value).strip().lower() not in _EMPTY_VALUES
+
+
+class UserAccumulator:
+    """Documents seen so far for one user, as bitmasks."""
+
+    __slots__ = ("user_id", "chart_mask", "has_chart", "legacy_chart",
+                 "planets", "houses", "dashas", "doshas", "documents")
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.chart_mask = 0  # bit i set when ASTRO_FIELDS[i] is filled
+        self.has_chart = False
+        self.legacy_chart = False
+        self.planets = 0
+        self.houses = 0
+        self.dashas = 0
+        self.doshas = 0
+        self.documents = 0
+
+    def add(self, vector_id: str, metadata: Dict[str, Any]):
+        self.documents += 1
+        data_type = metadata.get("data_type", "chart")
+        if data_type == "planet":
+            self.planets |= _PLANET_BITS.get(str(metadata.get("planet_name", "")).lower(), 0)
+        elif data_type == "house":
+            house = str(metadata.get("house_number", ""))
+            if house.isdigit() and 1 <= int(house) <= 12:
+                self.houses |= 1 << int(house)
+        elif data_type == "dasha":
+            self.dashas |= _DASHA_BITS.get(str(metadata.get("dasha_system", "")).lower(), 0)
+        elif data_type == "dosha":
+            self.doshas |= _DOSHA_BITS.get(str(metadata.get("dosha_name", "")).lower(), 0)
+        elif not self.has_chart or vector_id.endswith(":chart"):
+            # Prefer the ID-addressed chart over an old randomly keyed copy
+            self.chart_mask = sum(1 << i for i, field in enumerate(ASTRO_FIELDS) if _filled(metadata.get(field)))
+            self.has_chart = True
+            self.legacy_chart = not vector_id.endswith(":chart")
+
+    def row(self) -> Dict[str, Any]:
+        chart_fields = bin(self.chart_mask).count("1")
+        missing = []
+        if not self.has_chart:
+            missing.append("chart")
+        elif chart_fields < len(ASTRO_FIELDS):
+            missing.append("chart_fields")
+        for label, have, expected in (
+            ("planets", self.planets, _ALL_PLANETS),
+            ("houses", self.houses, _ALL_HOUSES),
+            ("dashas", self.dashas, _ALL_DASHAS),
+            ("doshas", self.doshas, _ALL_DOSHAS),
+        ):
+            if have & expected != expected:
+                missing.append(label)
+        return {
+            "user_id": self.user_id,
+            "has_chart": self.has_chart,
+            "legacy_chart": self.legacy_chart,
+            "chart_fields": chart_fields,
+            "completeness": round(100.0 * chart_fields / len(ASTRO_FIELDS), 1),
+            "planets": bin(self.planets).count("1"),
+            "houses": bin(self.houses).count("1"),
+            "dashas": bin(self.dashas).count("1"),
+            "doshas": bin(self.doshas).count("1"),
+            "documents": self.documents,
+            "missing": ",".join(missing),
+            "needs_recompute": bool(missing),
+        }
+
+
+class ScanStats:
+    """Streaming aggregates: counters and fixed-size histograms only."""
+
+    def __init__(self):
+        self.vectors = 0
+        self.users = 0
+        self.with_chart = 0
+        self.legacy_charts = 0
+        self.complete = 0
+        self.backlog = 0
+        self.completeness_histogram = [0] * 11  # 0-9%, 10-19%, ... 100%
+        self.field_fill = {field: 0 for field in ASTRO_FIELDS}
+        self.missing = {}
+
+    def add(self, row: Dict[str, Any], chart_mask: int):
+        self.users += 1
+        self.with_chart += row["has_chart"]
+        self.legacy_charts += row["legacy_chart"]
+        self.complete += not row["needs_recompute"]
+        self.backlog += row["needs_recompute"]
+        self.completeness_histogram[int(row["completeness"] // 10)] += 1
+        for i, field in enumerate(ASTRO_FIELDS):
+            if chart_mask >> i & 1:
+                self.field_fill[field] += 1
+        for reason in filter(None, row["missing"].split(",")):
+            self.missing[reason] = self.missing.get(reason, 0) + 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "vectors": self.vectors,
+            "users": self.users,
+            "with_chart": self.with_chart,
+            "legacy_charts": self.legacy_charts,
+            "complete": self.complete,
+            "backlog": self.backlog,
+            "missing": self.missing,
+            "completeness_histogram": {
+                (f"{i * 10}-{i * 10 + 9}%" if i < 10 else "100%"): n
+                for i, n in enumerate(self.completeness_histogram)
+            },
+            "field_fill_pct": {
+                field: round(100.0 * n / self.users, 1) if self.users else 0.0
+                for field, n in self.field_fill.items()
+            },
+        }
+
+
+class ReportWriter:
+    """Row sink that flushes to Parquet row groups, or CSV when pyarrow is absent."""
+
+    def __init__(self, path: Path, row_group_size: int = 10000):
+        self.row_group_size = row_group_size
+        self._rows: List[Dict[str, Any]] = []
+        self._parquet = None
+        self._csv_file = None
+        if pa is not None and path.suffix != ".csv":
+            self.path = path.with_suffix(".parquet")
+        else:
+            if pa is None and path.suffix == ".parquet":
+                logger.warning("pyarrow not installed; writing CSV instead of Parquet")
+            self.path = path.with_suffix(".csv")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.suffix == ".csv":
+            self._csv_file = open(self.path, "w", newline="", encoding="utf-8")
+            self._csv = csv.DictWriter(self._csv_file, fieldnames=REPORT_COLUMNS)
+            self._csv.writeheader()
+
+    def write(self, row: Dict[str, Any]):
+        if self._csv_file is not None:
+            self._csv.writerow(row)
+            return
+        self._rows.append(row)
+        if len(self._rows) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._rows:
+            return
+        table = pa.Table.from_pylist(self._rows)
+        if self._parquet is None:
+            self._parquet = pq.ParquetWriter(str(self.path), table.schema)
+        self._parquet.write_table(table)
+        self._rows = []
+
+    def close(self):
+        if self._csv_file is not None:
+            self._csv_file.close()
+            return
+        self._flush()
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def _user_key(vector_id: str, metadata: Dict[str, Any]) -> str:
+    """Owner of a document: its metadata userId, else the ID's user prefix."""
+    return str(metadata.get("userId") or vector_id.split(":", 1)[0])
+
+
+def _fetch_metadata(index, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    result = index.fetch(ids=ids)
+    vectors = result.get("vectors", {}) if isinstance(result, dict) else getattr(result, "vectors", {})
+    documents = {}
+    for vector_id, vector in (vectors or {}).items():
+        metadata = vector.get("metadata") if isinstance(vector, dict) else getattr(vector, "metadata", None)
+        documents[vector_id] = decode_chart(metadata) or {}
+    return documents
+
+
+async def scan(
+    index,
+    report: ReportWriter,
+    backlog_file,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    concurrency: int = 4,
+    prefix: Optional[str] = None,
+    log_every: int = 50,
+) -> ScanStats:
+    """
+    Scan the whole index.
+
+    Up to `concurrency` fetches are in flight. Users are reported in user ID
+    order after the last page.
+    """
+    loop = asyncio.get_running_loop()
+    stats = ScanStats()
+    users: Dict[str, UserAccumulator] = {}
+    start = time.perf_counter()
+    pages = 0
+
+    def finish(acc: UserAccumulator):
+        row = acc.row()
+        stats.add(row, acc.chart_mask)
+        report.write(row)
+        if row["needs_recompute"]:
+            backlog_file.write(json.dumps({
+                "userId": row["user_id"],
+                "missing": row["missing"].split(","),
+                "completeness": row["completeness"],
+            }) + "\n")
+
+    def consume(ids: List[str], documents: Dict[str, Dict[str, Any]]):
+        for vector_id in ids:
+            stats.vectors += 1
+            metadata = documents.get(vector_id, {})
+            user_id = _user_key(vector_id, metadata)
+            acc = users.get(user_id)
+            if acc is None:
+                acc = users[user_id] = UserAccumulator(user_id)
+            acc.add(vector_id, metadata)
+
+    id_pages: Iterator[List[str]] = index.list(prefix=prefix, limit=page_size) if prefix else index.list(limit=page_size)
+    in_flight: deque = deque()
+    while True:
+        # list() pages are lazy network calls, so step the iterator off the loop
+        ids = await loop.run_in_executor(None, next, id_pages, None)
+        if ids is None:
+            break
+        ids = list(ids)
+        in_flight.append((ids, loop.run_in_executor(None, partial(_fetch_metadata, index, ids))))
+        if len(in_flight) >= concurrency:
+            done_ids, future = in_flight.popleft()
+            consume(done_ids, await future)
+            pages += 1
+            if pages % log_every == 0:
+                logger.info(f"{stats.vectors} vectors, {stats.users} users, "
+                            f"{stats.vectors / (time.perf_counter() - start):.0f} vectors/s")
+    while in_flight:
+        done_ids, future = in_flight.popleft()
+        consume(done_ids, await future)
+    for user_id in sorted(users):
+        finish(users.pop(user_id))
+
+    logger.info(f"Scanned {stats.vectors} vectors in {time.perf_counter() - start:.1f}s")
+    return stats
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Scan every chart in the index for completeness")
+    parser.add_argument("--output", default=str(_CACHE_DIR / "chart_scan.parquet"),
+                        help="Report path (.parquet, or .csv; CSV is used when pyarrow is missing)")
+    parser.add_argument("--backlog", default=str(_CACHE_DIR / "recompute_backlog.jsonl"),
+                        help="JSONL file of users whose charts need recomputing")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="IDs per list page / fetch")
+    parser.add_argument("--concurrency", type=int, default=4, help="Fetches in flight")
+    parser.add_argument("--prefix", help="Only scan IDs with this prefix (e.g. one user)")
+    args = parser.parse_args()
+
+    index = open_index()
+    report = ReportWriter(Path(args.output))
+    backlog_path = Path(args.backlog)
+    backlog_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with open(backlog_path, "w", encoding="utf-8") as backlog_file:
+            stats = await scan(index, report, backlog_file, args.page_size, args.concurrency, args.prefix)
+    finally:
+        report.close()
+
+    print(json.dumps(stats.as_dict(), indent=2))
+    print(f"\nReport:  {report.path}")
+    print(f"Backlog: {backlog_path} ({stats.backlog} users)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
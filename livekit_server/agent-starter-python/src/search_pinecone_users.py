@@ -7,7 +7,8 @@ import os
 import asyncio
 from pathlib import Path
 from dotenv import load_dotenv
-from pinecone import Pinecone
+from chart_codec import decode_chart
+from local_index import open_index
 
 # Load environment variables
 env_path = Path(__file__).resolve().parent.parent / ".env.local"
@@ -20,8 +21,7 @@ async def search_for_user():
     print("SEARCHING FOR USER DATA")
     print("=" * 70)
     
-    pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
-    index = pc.Index(os.getenv("PINECONE_INDEX"))
+    index = open_index(os.getenv("PINECONE_INDEX"))
     
     # Test variations
     test_ids = [
@@ -42,7 +42,7 @@ async def search_for_user():
             )
             if result.matches:
                 print(f"   ✅ Found: {user_id}")
-                print(f"      Metadata: {result.matches[0].metadata}")
+                print(f"      Metadata: {decode_chart(result.matches[0].metadata)}")
             else:
                 print(f"   ❌ Not found: {user_id}")
         except Exception as e:
@@ -61,7 +61,7 @@ async def search_for_user():
         if result.matches:
             print(f"\n   Found {len(result.matches)} sample vectors:")
             for i, match in enumerate(result.matches, 1):
-                metadata = match.metadata
+                metadata = decode_chart(match.metadata) or {}
                 user_id = metadata.get('userId', 'N/A')
                 name = metadata.get('name', metadata.get('birthPlace', 'N/A'))
                 print(f"   {i}. ID: {user_id}, Name/Place: {name}")
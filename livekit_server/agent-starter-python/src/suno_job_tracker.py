@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Per-process tracker for pending Suno generation tasks.
+
+Suno normally reports completion through the auth server callback. When
+that callback is late, something has to poll; before this tracker every
+session polled on its own, with its own HTTP session and task. Now all
+pending task IDs live here and one loop polls whichever are due, backing
+off exponentially per task. A task is dropped as soon as the callback's
+tracks show up (resolve_from_callback), when it completes or fails, or when
+the last session waiting for it goes away.
+
+The record-info endpoint takes a single taskId, so a polling round sends
+the due requests concurrently over the client's shared session.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Optional, Dict, Any, List, Callable, Awaitable, Hashable, Iterable
+
+try:
+    from .suno_client import SunoClient
+except ImportError:
+    from suno_client import SunoClient
+
+logger = logging.getLogger("suno_job_tracker")
+
+COMPLETED = "COMPLETED"
+FAILED = "FAILED"
+TIMEOUT = "TIMEOUT"
+
+# record-info status values
+_DONE_STATUSES = {"SUCCESS", "FIRST_SUCCESS"}
+_FAILED_STATUSES = {
+    "CREATE_TASK_FAILED",
+    "GENERATE_AUDIO_FAILED",
+    "CALLBACK_EXCEPTION",
+    "SENSITIVE_WORD_ERROR",
+}
+
+JobCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class _Job:
+    def __init__(self, task_id: str, user_id: str, title: str, first_delay: float, timeout: float):
+        self.task_id = task_id
+        self.user_id = user_id
+        self.title = title
+        self.delay = first_delay
+        self.next_poll = time.monotonic() + first_delay
+        self.deadline = time.monotonic() + timeout
+        self.waiters: Dict[Hashable, JobCallback] = {}
+        self.polls = 0
+
+
+def _result(job: _Job, status: str, tracks: Optional[List[Dict[str, Any]]] = None, error: str = None) -> Dict[str, Any]:
+    return {"task_id": job.task_id, "title": job.title, "status": status, "tracks": tracks or [], "error": error}
+
+
+def _tracks_from_record(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    clips = ((data.get("response") or {}).get("sunoData")) or []
+    return [
+        {"id": clip.get("id"), "title": clip.get("title", "Untitled"), "audioUrl": clip.get("audioUrl")}
+        for clip in clips if clip.get("audioUrl")
+    ]
+
+
+class SunoJobTracker:
+    """
+    Polls pending Suno tasks in a single loop.
+
+    Args:
+        client: SunoClient used for record-info requests
+        first_delay: Seconds before the first poll (callbacks usually land in 60-90s)
+        max_delay: Upper bound of the per-task backoff
+        timeout: Give up on a task after this many seconds
+        concurrency: Status requests in flight at once
+    """
+
+    def __init__(
+        self,
+        client: Optional[SunoClient] = None,
+        first_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        timeout: Optional[float] = None,
+        concurrency: int = 4,
+        backoff: float = 1.6,
+    ):
+        self.client = client or SunoClient()
+        self.first_delay = first_delay if first_delay is not None else float(os.getenv("SUNO_POLL_FIRST_DELAY", "45"))
+        self.max_delay = max_delay if max_delay is not None else float(os.getenv("SUNO_POLL_MAX_DELAY", "60"))
+        self.timeout = timeout if timeout is not None else float(os.getenv("SUNO_POLL_TIMEOUT", "600"))
+        self.concurrency = concurrency
+        self.backoff = backoff
+        self._jobs: Dict[str, _Job] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.stats = {"polls": 0, "completed": 0, "failed": 0, "resolved_by_callback": 0}
+
+    def track(self, task_id: str, owner: Hashable, on_done: JobCallback, user_id: str = "", title: str = ""):
+        """
+        Wait for a task on behalf of owner (e.g. a session's agent).
+
+        on_done receives {"task_id", "title", "status", "tracks", "error"}.
+        Tracking a task that is already pending only adds the waiter.
+        """
+        job = self._jobs.get(task_id)
+        if job is None:
+            job = _Job(task_id, user_id, title, self.first_delay, self.timeout)
+            self._jobs[task_id] = job
+            logger.info(f"Tracking Suno task {task_id} ('{title}'), {len(self._jobs)} pending")
+        job.waiters[owner] = on_done
+        self._ensure_running()
+
+    def release(self, owner: Hashable):
+        """Forget owner's waiters; tasks nobody waits for any more stop being polled."""
+        for task_id, job in list(self._jobs.items()):
+            job.waiters.pop(owner, None)
+            if not job.waiters:
+                del self._jobs[task_id]
+        self._stop_if_idle()
+
+    def resolve_from_callback(self, user_id: str, titles: Iterable[str]) -> int:
+        """
+        Drop pending tasks whose tracks already arrived through the Suno callback.
+
+        The callback documents do not carry the taskId, so tasks are matched on
+        user and title. Waiters are not notified: the callback path delivered.
+        """
+        titles = {t.strip().lower() for t in titles if t}
+        resolved = [
+            task_id for task_id, job in self._jobs.items()
+            if job.user_id == user_id and job.title.strip().lower() in titles
+        ]
+        for task_id in resolved:
+            del self._jobs[task_id]
+        self.stats["resolved_by_callback"] += len(resolved)
+        self._stop_if_idle()
+        return len(resolved)
+
+    def _stop_if_idle(self):
+        # The loop exits (and closes the HTTP session) once nothing is pending
+        if not self._jobs and self._task is not None and not self._task.done():
+            self._wakeup.set()
+
+    def pending(self) -> List[str]:
+        return list(self._jobs)
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        else:
+            self._wakeup.set()
+
+    async def _run(self):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        while True:
+            try:
+                while self._jobs:
+                    now = time.monotonic()
+                    due = [job for job in self._jobs.values() if job.next_poll <= now or job.deadline <= now]
+                    if due:
+                        await asyncio.gather(*[self._poll(job, semaphore) for job in due])
+                        continue
+                    next_poll = min(min(job.next_poll, job.deadline) for job in self._jobs.values())
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, next_poll - now))
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                await self.client.close()
+            # track() during the close above saw this task still running and only woke it
+            if not self._jobs:
+                return
+
+    async def _poll(self, job: _Job, semaphore: asyncio.Semaphore):
+        if time.monotonic() >= job.deadline:
+            self._finish(job, _result(job, TIMEOUT, error=f"no result after {job.polls} polls"))
+            return
+        async with semaphore:
+            job.polls += 1
+            self.stats["polls"] += 1
+            try:
+                record = await self.client.get_generation_status(job.task_id)
+            except Exception as e:
+                record = None
+                logger.warning(f"Suno status check for {job.task_id} failed: {e}")
+        if self._jobs.get(job.task_id) is not job:
+            return  # released or resolved while the request was in flight
+
+        data = (record or {}).get("data") or {}
+        status = data.get("status")
+        tracks = _tracks_from_record(data)
+        if status in _DONE_STATUSES and tracks:
+            self.stats["completed"] += 1
+            self._finish(job, _result(job, COMPLETED, tracks))
+        elif status in _FAILED_STATUSES:
+            self.stats["failed"] += 1
+            self._finish(job, _result(job, FAILED, error=data.get("errorMessage") or status))
+        else:
+            # Still generating (or the request failed): back off, with jitter so tasks spread out
+            job.delay = min(job.delay * self.backoff, self.max_delay)
+            job.next_poll = time.monotonic() + job.delay * random.uniform(0.8, 1.2)
+
+    def _finish(self, job: _Job, result: Dict[str, Any]):
+        self._jobs.pop(job.task_id, None)
+        logger.info(f"Suno task {job.task_id} {result['status']} after {job.polls} polls")
+        for on_done in job.waiters.values():
+            asyncio.get_running_loop().create_task(self._deliver(on_done, result))
+
+    async def _deliver(self, on_done: JobCallback, result: Dict[str, Any]):
+        try:
+            await on_done(result)
+        except Exception as e:
+            logger.error(f"Suno job handler failed: {e}")
+
+    async def close(self):
+        """Stop polling and drop all pending tasks."""
+        self._jobs.clear()
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self.client.close()
+
+
+# Singleton instance
+_tracker = None
+
+
+def get_suno_job_tracker() -> SunoJobTracker:
+    """Get singleton job tracker instance."""
+    global _tracker
+    if _tracker is None:
+        _tracker = SunoJobTracker()
+    return _tracker
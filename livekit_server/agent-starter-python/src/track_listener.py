@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Live view of a user's music tracks.
+
+Keeps a Firestore on_snapshot listener on the user's `music_tracks` documents
+for the length of a session and mirrors them in memory, so "is my song
+ready?" is answered without a round trip. When the Suno callback (auth
+server) writes a track as COMPLETED, on_completed is called with the newly
+completed tracks of that write.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Callable, Awaitable
+
+logger = logging.getLogger("track_listener")
+
+COMPLETED = "COMPLETED"
+
+OnCompleted = Callable[[List[Dict[str, Any]]], Awaitable[None]]
+
+
+def _is_completed(track: Optional[Dict[str, Any]]) -> bool:
+    return bool(track) and track.get("status") == COMPLETED and bool(track.get("audioUrl"))
+
+
+def _created_at(track: Dict[str, Any]) -> float:
+    created = track.get("createdAt")
+    if isinstance(created, datetime):
+        return created.timestamp()
+    # Server timestamp not resolved yet: the write is the newest one
+    return float("inf") if created is None else 0.0
+
+
+class TrackListener:
+    """
+    Materialized view of one user's music_tracks.
+
+    Args:
+        user_id: Owner of the tracks
+        on_completed: Async callback for tracks that became playable during the session
+    """
+
+    def __init__(self, user_id: str, on_completed: Optional[OnCompleted] = None):
+        self.user_id = user_id
+        self.on_completed = on_completed
+        self._tracks: Dict[str, Dict[str, Any]] = {}
+        self._watch = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready = asyncio.Event()
+
+    @property
+    def ready(self) -> bool:
+        """True once the initial snapshot has arrived."""
+        return self._ready.is_set()
+
+    async def start(self) -> bool:
+        """Subscribe to the user's tracks. Returns False if Firestore is unavailable."""
+        try:
+            from .firebase_db import FirebaseDB
+            from .firestore_executor import get_firestore_executor
+        except ImportError:
+            from firebase_db import FirebaseDB
+            from firestore_executor import get_firestore_executor
+
+        self._loop = asyncio.get_running_loop()
+
+        def subscribe():
+            db = FirebaseDB().db
+            if not db:
+                return None
+            query = db.collection("music_tracks").where("userId", "==", self.user_id)
+            return query.on_snapshot(self._on_snapshot)
+
+        try:
+            self._watch = await self._loop.run_in_executor(get_firestore_executor(), subscribe)
+        except Exception as e:
+            logger.error(f"Failed to listen for tracks of {self.user_id}: {e}")
+            return False
+        if self._watch is None:
+            logger.warning("Firebase not initialized, track listener disabled")
+            return False
+        logger.info(f"👂 Listening for music tracks of user {self.user_id}")
+        return True
+
+    def _on_snapshot(self, docs, changes, read_time):
+        """Runs on the Firestore watch thread; hands the changes to the event loop."""
+        batch = [(change.type.name, change.document.id, change.document.to_dict() or {}) for change in changes]
+        self._loop.call_soon_threadsafe(self.apply_changes, batch)
+
+    def apply_changes(self, changes: List[tuple]):
+        """Apply (change type, document ID, data) tuples from one snapshot."""
+        initial = not self.ready
+        completed = []
+        for change_type, doc_id, data in changes:
+            if change_type == "REMOVED":
+                self._tracks.pop(doc_id, None)
+                continue
+            previous = self._tracks.get(doc_id)
+            track = dict(data, id=doc_id)
+            self._tracks[doc_id] = track
+            if not initial and _is_completed(track) and not _is_completed(previous):
+                completed.append(track)
+        self._ready.set()
+
+        if completed:
+            logger.info(f"🎵 {len(completed)} track(s) completed for {self.user_id}: "
+                        f"{[t.get('title') for t in completed]}")
+            if self.on_completed:
+                asyncio.get_running_loop().create_task(self._notify(completed))
+
+    async def _notify(self, tracks: List[Dict[str, Any]]):
+        try:
+            await self.on_completed(tracks)
+        except Exception as e:
+            logger.error(f"Track completion handler failed: {e}")
+
+    async def wait_ready(self, timeout: float = 2.0) -> bool:
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.ready
+
+    def tracks(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Tracks ordered most recent first."""
+        ordered = sorted(self._tracks.values(), key=_created_at, reverse=True)
+        return ordered[:limit] if limit else ordered
+
+    async def stop(self):
+        if self._watch is not None:
+            watch, self._watch = self._watch, None
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, watch.unsubscribe)
+            except Exception as e:
+                logger.error(f"Failed to stop track listener: {e}")
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Stock of pre-generated instrumental tracks for the most requested styles.
+
+A Suno generation takes 60-90 s. When a music request closely matches one
+of POOL_STYLES, the music agent takes a stocked track and plays it at once
+while the custom track renders. Each stocked track is served once; the
+off-peak refill job (refill_track_pool.py) tops the stock back up.
+
+Stored in SQLite (WAL) so the refill job and every agent process share it.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+logger = logging.getLogger("track_pool")
+
+# Each style matches when the request mentions a word from every keyword group
+POOL_STYLES: List[Dict[str, Any]] = [
+    {
+        "key": "bansuri_meditation",
+        "title": "Bansuri Dhyan",
+        "style": "Slow peaceful meditation music with solo bamboo flute (bansuri), soft tanpura drone, no percussion",
+        "keywords": [{"bansuri", "flute", "बांसुरी"}, {"meditation", "meditative", "dhyan", "peaceful", "calm", "ध्यान"}],
+    },
+    {
+        "key": "crystal_bowls_432",
+        "title": "432Hz Crystal Bowls",
+        "style": "Healing ambient music tuned to 432Hz with crystal singing bowls, gentle drones and nature sounds",
+        "keywords": [{"bowl", "bowls", "crystal", "singing"}, {"432", "432hz", "healing", "ambient", "meditation"}],
+    },
+    {
+        "key": "tabla_bhajan",
+        "title": "Tabla Bhajan",
+        "style": "Devotional bhajan instrumental with tabla, harmonium and manjira, medium tempo",
+        "keywords": [{"tabla", "तबला"}, {"bhajan", "devotional", "kirtan", "भजन"}],
+    },
+]
+
+_STYLES_BY_KEY = {style["key"]: style for style in POOL_STYLES}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pool_tracks (
+    id TEXT PRIMARY KEY,
+    style_key TEXT NOT NULL,
+    title TEXT NOT NULL,
+    audio_url TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    served_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_pool_tracks_stock ON pool_tracks (style_key, served_at, created_at);
+"""
+
+
+def match_style(style: str) -> Optional[str]:
+    """Key of the stocked style a request's style description matches, if any."""
+    # Split on spaces/punctuation only: \w would break Devanagari words at vowel signs
+    words = set(re.findall(r"[^\s,.;:!?/()\-]+", (style or "").lower()))
+    for pool_style in POOL_STYLES:
+        if all(words & group for group in pool_style["keywords"]):
+            return pool_style["key"]
+    return None
+
+
+class TrackPool:
+    """Shared stock of ready-to-play tracks, keyed by POOL_STYLES key."""
+
+    _default_file = Path(__file__).parent / "cache" / "track_pool.sqlite3"
+
+    def __init__(self, db_file: Optional[Path] = None):
+        self.db_file = Path(db_file or os.getenv("TRACK_POOL_PATH", self._default_file))
+        self._lock = threading.Lock()
+        self._conn = None
+        try:
+            self.db_file.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_file), timeout=10, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+        except Exception as e:
+            logger.error(f"Failed to open track pool: {e}")
+            self._conn = None
+
+    def add(self, style_key: str, tracks: List[Dict[str, Any]]) -> int:
+        """Stock tracks ({"id", "title", "audioUrl"}); already stocked IDs are ignored."""
+        if not self._conn:
+            return 0
+        rows = [
+            (t["id"], style_key, t.get("title") or _STYLES_BY_KEY[style_key]["title"], t["audioUrl"], time.time())
+            for t in tracks if t.get("id") and t.get("audioUrl")
+        ]
+        with self._lock, self._conn:
+            cursor = self._conn.executemany(
+                "INSERT OR IGNORE INTO pool_tracks (id, style_key, title, audio_url, created_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        return cursor.rowcount
+
+    def take(self, style_key: str) -> Optional[Dict[str, Any]]:
+        """Hand out the oldest unserved track of a style, or None if out of stock."""
+        if not self._conn:
+            return None
+        try:
+            with self._lock:
+                # Write lock first, so two agent processes never serve the same track
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    row = self._conn.execute(
+                        "SELECT id, title, audio_url FROM pool_tracks "
+                        "WHERE style_key = ? AND served_at IS NULL ORDER BY created_at LIMIT 1",
+                        (style_key,),
+                    ).fetchone()
+                    if row:
+                        self._conn.execute("UPDATE pool_tracks SET served_at = ? WHERE id = ?", (time.time(), row[0]))
+                    self._conn.commit()
+                except Exception:
+                    self._conn.rollback()
+                    raise
+        except Exception as e:
+            logger.error(f"Failed to take pooled track: {e}")
+            return None
+        if not row:
+            logger.info(f"Track pool out of stock for {style_key}")
+            return None
+        return {"id": row[0], "title": row[1], "audioUrl": row[2], "style_key": style_key}
+
+    def stock_levels(self) -> Dict[str, int]:
+        levels = {style["key"]: 0 for style in POOL_STYLES}
+        if not self._conn:
+            return levels
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT style_key, COUNT(*) FROM pool_tracks WHERE served_at IS NULL GROUP BY style_key"
+            ).fetchall()
+        levels.update(dict(rows))
+        return levels
+
+
+# Singleton instance
+_pool = None
+
+
+def get_track_pool() -> TrackPool:
+    """Get singleton track pool instance."""
+    global _pool
+    if _pool is None:
+        _pool = TrackPool()
+    return _pool
@@ -4,6 +4,8 @@ import os
 import asyncio
 import signal
 import json
+from datetime import datetime, timedelta
+from typing import Optional
 
 from dotenv import load_dotenv
 from livekit.agents import (
@@ -21,7 +23,13 @@ from livekit.agents import (
     RunContext,
 )
 # from livekit.plugins import noise_cancellation, silero
-from pinecone_kundli_retriever import KundliRetriever
+from pinecone_kundli_retriever import get_kundli_retriever
+from rashifal_store import get_rashifal_store, format_prediction
+from jyotish_constants import RASHIS, NAKSHATRAS, normalize_rashi, normalize_nakshatra
+from muhurta import find_muhurta, format_muhurta_results, ACTIVITY_RULES
+from gazetteer import get_gazetteer, resolve_birth_place
+from astrology_api_client import get_api_client, birth_data_from_chart
+from astrology_summarizer import summarize_response
 
 # Configure logging early
 logging.basicConfig(
@@ -32,6 +40,14 @@ logging.basicConfig(
 
 logger = logging.getLogger("vedic_astrology_agent")
 
+# astrologyapi.com endpoint answering each dosha get_chart_details can ask for
+DOSHA_ENDPOINTS = {
+    "manglik": "manglik",
+    "kalsarpa": "kalsarpa_details",
+    "pitra": "pitra_dosha_report",
+    "sadhesati": "sadhesati_current_status",
+}
+
 # Load .env.local from the project root
 _ENV_PATHS = [
     Path(__file__).resolve().parent.parent / ".env.local",
@@ -57,15 +73,24 @@ else:
 
 
 class VedicAstrologyAgent(Agent):
-    def __init__(self, user_id: str = "default_user", publish_data_fn=None) -> None:
+    def __init__(
+        self,
+        user_id: str = "default_user",
+        publish_data_fn=None,
+        user_language: str = "hi",
+        kundli_retriever=None,
+        user_chart_summary: Optional[str] = None,
+    ) -> None:
         self.user_id = user_id
-        self.kundli_retriever = None
-        self.user_chart_summary = None
+        self.user_language = user_language
+        self.kundli_retriever = kundli_retriever
+        self.user_chart_summary = user_chart_summary
         
-        try:
-            self.kundli_retriever = KundliRetriever()
-        except Exception as e:
-            logger.error(f"Failed to initialize KundliRetriever: {e}")
+        if self.kundli_retriever is None:
+            try:
+                self.kundli_retriever = get_kundli_retriever()
+            except Exception as e:
+                logger.error(f"Failed to initialize KundliRetriever: {e}")
         
         super().__init__(
             instructions=self._get_instructions(),
@@ -87,6 +112,7 @@ CORE EXPERTISE:
    - 12 Houses, 9 Planets, 12 Rashis, 27 Nakshatras
    - Dasha systems (Vimshottari)
    - Yogas and Transits
+   - Muhurta (auspicious timing) using find_shubh_muhurat
 
 2. MATCHMAKING & KUNDLI MILAN:
    - Ashtakoot System (36 points)
@@ -100,11 +126,22 @@ PROACTIVE ENGAGEMENT:
 - Provide context and explain concepts
 - Be compassionate and wise
 - Use search_jyotish_teaching for educational videos
+- Use get_chart_details for specific planets, houses, dasha or doshas - ask for all of them in one call
 
 RESPONSE STYLE:
 - Default to Hindi if user prefers, else English
 - Conversational, warm, wise
 - Use simple language
+"""
+        if self.user_chart_summary and self.user_chart_summary != "User's birth chart data is not available.":
+            base_instructions += f"""
+🔮 USER'S PERSONAL CHART DATA (Use this to give personalized answers):
+{self.user_chart_summary}
+
+IMPORTANT: When answering questions, refer to the user's actual chart data above. 
+For example:
+- "Based on your chart, your Moon is in [Sign] in the [House]th house..."
+- "Currently you are in [Mahadasha] Mahadasha..."
 """
         return base_instructions
 
@@ -148,6 +185,81 @@ Would you like to know more about any specific aspect?"""
 
         return response
 
+    @function_tool
+    async def get_chart_details(
+        self,
+        context: RunContext,
+        planets: str = "",
+        houses: str = "",
+        include_dasha: bool = False,
+        doshas: str = "",
+    ) -> str:
+        """Get detailed data for specific planets, houses, dasha or doshas in the user's chart.
+        
+        Use this for questions like "tell me about my Saturn, 7th house and current dasha".
+        Ask for everything the question needs in one call.
+        
+        Args:
+            planets: Comma-separated planet names (e.g., "saturn,jupiter")
+            houses: Comma-separated house numbers (e.g., "7,10")
+            include_dasha: Include the Vimshottari dasha periods
+            doshas: Comma-separated doshas (manglik, kalsarpa, pitra, sadhesati)
+        """
+        logger.info(f"Chart details for {self.user_id}: planets={planets} houses={houses} dasha={include_dasha} doshas={doshas}")
+        
+        if not self.kundli_retriever:
+            return "I apologize, but I cannot access the chart database at the moment."
+        
+        planet_list = [p.strip().lower() for p in planets.split(",") if p.strip()]
+        house_list = [int(h) for h in houses.replace(" ", "").split(",") if h.isdigit() and 1 <= int(h) <= 12]
+        dosha_list = [d.strip().lower() for d in doshas.split(",") if d.strip()]
+        
+        try:
+            documents = await self.kundli_retriever.get_chart_documents(
+                self.user_id,
+                planets=planet_list,
+                houses=house_list,
+                dashas=["vimshottari"] if include_dasha else [],
+                doshas=dosha_list,
+                # Birth details for dasha/doshas that were never stored
+                include_chart=bool(include_dasha or dosha_list),
+            )
+        except Exception as e:
+            logger.error(f"Error loading chart details: {e}", exc_info=True)
+            return "I apologize, but I couldn't load those chart details right now."
+        
+        birth_data = birth_data_from_chart(documents["chart"])
+        
+        async def _describe(endpoint: str, data: Optional[dict]) -> str:
+            if data:
+                data = {k: v for k, v in data.items() if k not in ("userId", "data_type")}
+                return summarize_response(endpoint, data, max_tokens=150)
+            if birth_data and endpoint not in ("planet", "house"):
+                # Not stored for this user: ask the API and pass on the summary only
+                summary = await get_api_client().get_summary(endpoint, birth_data, max_tokens=150)
+                if summary:
+                    return summary
+            return "not available"
+        
+        labels, pending = [], []
+        for planet in planet_list:
+            labels.append(planet.capitalize())
+            pending.append(_describe("planet", documents["planets"].get(planet)))
+        for house in house_list:
+            labels.append(f"House {house}")
+            pending.append(_describe("house", documents["houses"].get(house)))
+        if include_dasha:
+            labels.append("Vimshottari Dasha")
+            pending.append(_describe("current_vdasha", documents["dashas"].get("vimshottari")))
+        for dosha in dosha_list:
+            labels.append(f"{dosha.capitalize()} Dosha")
+            pending.append(_describe(DOSHA_ENDPOINTS.get(dosha, dosha), documents["doshas"].get(dosha)))
+        sections = [f"{label}: {text}" for label, text in zip(labels, await asyncio.gather(*pending))]
+        
+        if not sections:
+            return "Please tell me which planets, houses, dasha or doshas you'd like to know about."
+        return "\n".join(sections)
+
     @function_tool
     async def save_birth_details(
         self,
@@ -186,6 +298,17 @@ Would you like to know more about any specific aspect?"""
             # For now, these will be updated when comprehensive data is fetched
         }
         
+        # Resolve coordinates and the timezone offset in force at birth locally
+        location = resolve_birth_place(birth_place, birth_date, birth_time)
+        if location:
+            chart_data.update({
+                "latitude": location["latitude"],
+                "longitude": location["longitude"],
+                "timezone": location["timezone"],
+                "tzone": location["tzone"],
+            })
+            logger.info(f"Resolved birth place to {location['place']} ({location['latitude']}, {location['longitude']}, UTC{location['tzone']:+g})")
+        
         try:
             # Save to Pinecone
             success = await self.kundli_retriever.save_basic_chart(
@@ -203,7 +326,7 @@ Would you like to know more about any specific aspect?"""
                 
 📅 Birth Date: {birth_date}
 🕐 Birth Time: {birth_time}  
-📍 Birth Place: {birth_place}
+📍 Birth Place: {location['place'] if location else birth_place}
 
 Your basic Kundli has been created! I'm analyzing it now. You can start asking me questions about your chart, Rashifal, or any astrological guidance you need."""
             else:
@@ -219,41 +342,117 @@ Your basic Kundli has been created! I'm analyzing it now. You can start asking m
         self,
         context: RunContext,
         rashi: str,
+        period: str = "daily",
     ) -> str:
-        """Get daily horoscope (Rashifal) for a specific Rashi (moon sign).
+        """Get the horoscope (Rashifal) for a specific Rashi (moon sign) or Nakshatra.
 
-        Use this when the user asks for today's horoscope or Rashifal.
+        Use this when the user asks for today's, this week's or this month's horoscope or Rashifal.
         
         Args:
-            rashi: The Rashi/moon sign (e.g., "Mesha", "Vrishabha", "Mithuna", "Karka", etc.)
+            rashi: The Rashi/moon sign (e.g., "Mesha", "Vrishabha", "Mithuna", "Karka", etc.) or a Nakshatra name (e.g., "Rohini")
+            period: "daily", "weekly" or "monthly" (default: "daily")
         
         Returns:
-            Daily predictions and guidance for the Rashi.
+            Predictions and guidance for the Rashi.
         """
-        logger.info(f"User requested daily Rashifal for: {rashi}")
-        
-        # TODO: Integrate with a Rashifal API or generate based on current transits
-        # For now, return a placeholder
+        logger.info(f"User requested {period} Rashifal for: {rashi}")
         
         try:
-            # Normalize Rashi name
-            rashi_lower = rashi.lower()
+            period = period.lower() if period and period.lower() in ("daily", "weekly", "monthly") else "daily"
+            store = get_rashifal_store()
             
-            placeholder_rashifal = (
-                f"Today is a favorable day for {rashi}. "
-                f"Your ruling planet is well-placed, bringing positive energy. "
-                f"Focus on spiritual practices in the morning. "
-                f"Avoid major financial decisions after 3 PM. "
-                f"Wearing yellow or white today will be auspicious."
-            )
+            zodiac = normalize_rashi(rashi)
+            if zodiac:
+                entry = store.get(period, "rashi", zodiac, self.user_language)
+                display_name = next(sanskrit for key, sanskrit, _ in RASHIS if key == zodiac)
+            else:
+                nakshatra_index = normalize_nakshatra(rashi)
+                if nakshatra_index is None:
+                    return f"I couldn't recognize '{rashi}' as a Rashi or Nakshatra. Could you tell me your moon sign?"
+                entry = store.get(period, "nakshatra", str(nakshatra_index), self.user_language)
+                display_name = NAKSHATRAS[nakshatra_index][0]
             
-            logger.info(f"Rashifal generated for {rashi}")
+            if not entry:
+                logger.warning(f"No precomputed {period} Rashifal for {rashi}")
+                return f"The {period} Rashifal for {rashi} is not available right now. Please ask me again a little later."
             
-            return placeholder_rashifal
+            logger.info(f"Rashifal served from local store for {display_name}")
+            return f"{period.capitalize()} Rashifal for {display_name}:\n{format_prediction(entry)}"
         except Exception as e:
-            logger.error(f"Rashifal generation failed: {e}")
+            logger.error(f"Rashifal lookup failed: {e}")
             return "I apologize, but I couldn't fetch the Rashifal at the moment. Please try again."
 
+    @function_tool
+    async def find_shubh_muhurat(
+        self,
+        context: RunContext,
+        activity: str = "general",
+        start_date: str = "today",
+        days: int = 1,
+        preferred_nakshatras: str = "",
+        place: str = "New Delhi, India",
+    ) -> str:
+        """Find auspicious time windows (Shubh Muhurat) for an activity.
+
+        Use this when the user asks "kal ka shubh muhurat kya hai?", "best time to start a business this month", etc.
+        Rahu Kaal, Yamaganda, Gulika Kaal and inauspicious tithis are avoided automatically.
+        
+        Args:
+            activity: One of general, marriage, griha_pravesh, business, travel, vehicle_purchase, education
+            start_date: "today", "tomorrow"/"kal", "parso", or a date as YYYY-MM-DD or DD/MM/YYYY
+            days: Number of days to search from start_date (1-30)
+            preferred_nakshatras: Optional comma-separated nakshatra names to prefer
+            place: City where the activity will happen (default: New Delhi, India)
+        
+        Returns:
+            The best time windows with the reasons they are auspicious.
+        """
+        logger.info(f"Muhurta search: activity={activity}, start={start_date}, days={days}")
+        
+        try:
+            location = resolve_birth_place(place or "New Delhi, India")
+            if not location:
+                # Muhurat timings depend on sunrise at the place; another city's would be wrong
+                return (f"I couldn't find the place '{place}'. Please tell me the name of a nearby larger city "
+                        f"(with the state or country) so I can calculate the muhurat for it.")
+            lat, lon, tzone = location["latitude"], location["longitude"], location["tzone"]
+            
+            today = (datetime.utcnow() + timedelta(hours=tzone)).date()
+            key = (start_date or "today").strip().lower()
+            relative = {"today": 0, "aaj": 0, "tomorrow": 1, "kal": 1, "parso": 2}
+            if key in relative:
+                first_day = today + timedelta(days=relative[key])
+            else:
+                first_day = None
+                for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y"):
+                    try:
+                        first_day = datetime.strptime(start_date.strip(), fmt).date()
+                        break
+                    except ValueError:
+                        continue
+                if first_day is None:
+                    return f"I couldn't understand the date '{start_date}'. Please tell me the date as day/month/year."
+            
+            days = max(1, min(int(days), 30))
+            activity_key = activity.strip().lower().replace(" ", "_")
+            if activity_key not in ACTIVITY_RULES:
+                activity_key = "general"
+            
+            results = find_muhurta(
+                first_day,
+                days,
+                lat,
+                lon,
+                tzone,
+                activity=activity_key,
+                preferred_nakshatras=[n.strip() for n in preferred_nakshatras.split(",") if n.strip()],
+            )
+            
+            return f"Shubh Muhurat for {activity_key.replace('_', ' ')} in {location['place']}:\n{format_muhurta_results(results)}"
+        except Exception as e:
+            logger.error(f"Muhurta search failed: {e}", exc_info=True)
+            return "I apologize, but I couldn't calculate the muhurat at the moment. Please try again."
+
     @function_tool
     async def search_jyotish_teaching(
         self,
@@ -325,6 +524,18 @@ Your basic Kundli has been created! I'm analyzing it now. You can start asking m
 
 def prewarm(proc: JobProcess):
     """Prewarm function to load models before processing jobs."""
+    try:
+        # Build (first run only) and map the place index before any job arrives
+        get_gazetteer()
+    except Exception as e:
+        logger.error(f"Failed to load gazetteer: {e}")
+    
+    try:
+        # Pinecone client setup happens once per worker, not on the first chart question
+        get_kundli_retriever()
+    except Exception as e:
+        logger.error(f"Failed to initialize KundliRetriever: {e}")
+    
     try:
         try:
             import torch
@@ -341,6 +552,23 @@ def prewarm(proc: JobProcess):
         proc.userdata["vad"] = None
 
 
+async def _preload_chart(user_id: str) -> Optional[str]:
+    """Load the user's chart documents for the session and return the chart summary."""
+    if user_id == "default_user":
+        return None
+    try:
+        retriever = get_kundli_retriever()
+        logger.info(f"🔮 Fetching chart data for user: {user_id}")
+        # One fetch for all chart documents; later tool calls read from memory
+        await retriever.load_session_documents(user_id)
+        summary = await retriever.get_user_chart_summary(user_id)
+        logger.info(f"✅ Loaded Kundli data")
+        return summary
+    except Exception as e:
+        logger.error(f"Failed to load Kundli data: {e}")
+        return None
+
+
 async def entrypoint(ctx: JobContext):
     """Main entrypoint for the Vedic Astrology Agent."""
     ctx.log_context_fields = {
@@ -372,7 +600,9 @@ async def entrypoint(ctx: JobContext):
     
     # Detect language preference from participant metadata
     # Default to Hindi ('hi') for Vedic Jyotish agent
+    # The same metadata carries the userId, which starts the chart preload
     user_language = 'hi'
+    user_id = "default_user"
     try:
         await asyncio.sleep(1.0)  # Give time for participants to connect
         
@@ -380,6 +610,9 @@ async def entrypoint(ctx: JobContext):
             if participant.metadata:
                 try:
                     metadata = json.loads(participant.metadata)
+                    if isinstance(metadata, dict) and metadata.get('userId') and user_id == "default_user":
+                        user_id = metadata['userId']
+                        logger.info(f"👤 User ID extracted: {user_id}")
                     if isinstance(metadata, dict) and 'language' in metadata:
                         raw_lang = str(metadata.get("language", "")).strip().lower()
                         if raw_lang in ["hi", "hindi", "hin"]:
@@ -396,6 +629,9 @@ async def entrypoint(ctx: JobContext):
     except Exception as e:
         logger.warning(f"Could not read language preference, defaulting to Hindi: {e}")
 
+    # Fetch the chart while STT/TTS and the session are set up
+    chart_task = asyncio.create_task(_preload_chart(user_id))
+    
     if user_language not in {'hi', 'en'}:
         logger.warning(f"Unsupported language '{user_language}', defaulting to 'hi'")
         user_language = 'hi'
@@ -478,8 +714,14 @@ async def entrypoint(ctx: JobContext):
     async def log_usage():
         summary = usage_collector.get_summary()
         logger.info(f"Usage: {summary}")
+        logger.info(f"Astrology API: {get_api_client().get_stats()}")
 
     ctx.add_shutdown_callback(log_usage)
+    
+    # Optional Prometheus endpoint for astrologyapi.com latency/breaker metrics
+    metrics_port = os.getenv("ASTROLOGY_API_METRICS_PORT")
+    if metrics_port:
+        await get_api_client().start_metrics_server(int(metrics_port))
 
     # Publisher function for data channel
     async def _publish_data_bytes(data_bytes: bytes):
@@ -497,46 +739,30 @@ async def entrypoint(ctx: JobContext):
         except Exception as e:
             logger.error(f"❌ Failed to publish data: {e}", exc_info=True)
 
-    # Extract User ID from metadata
-    user_id = "default_user"
+    # Chart summary goes into the instructions before the greeting
+    user_chart_summary = None
     try:
-        await asyncio.sleep(1.5)  # Give time for participants to connect
-        for participant in ctx.room.remote_participants.values():
-            if participant.metadata:
-                try:
-                    metadata = json.loads(participant.metadata)
-                    if 'userId' in metadata:
-                        user_id = metadata['userId']
-                        logger.info(f"👤 User ID extracted: {user_id}")
-                        break
-                except Exception as e:
-                    logger.warning(f"Could not parse metadata for userId: {e}")
-    except Exception as e:
-        logger.warning(f"Error extracting userId: {e}")
-
-    # Create Vedic Astrology agent instance with user ID
-    vedic_agent = VedicAstrologyAgent(user_id=user_id, publish_data_fn=_publish_data_bytes)
+        user_chart_summary = await asyncio.wait_for(
+            asyncio.shield(chart_task),
+            timeout=float(os.getenv("CHART_PRELOAD_TIMEOUT", "5.0")),
+        )
+    except asyncio.TimeoutError:
+        # Keeps loading in the background; tools fetch on demand until it lands
+        logger.warning("Chart preload still running; starting without chart context")
     
-    # Fetch user's Kundli data from Pinecone
-    if vedic_agent.kundli_retriever:
-        try:
-            logger.info(f"🔮 Fetching chart data for user: {user_id}")
-            vedic_agent.user_chart_summary = await vedic_agent.kundli_retriever.get_user_chart_summary(user_id)
-            logger.info(f"✅ Loaded Kundli data")
-            
-            # Update agent instructions with user's chart
-            vedic_agent.instructions = f"""{vedic_agent.instructions}
-
-🔮 USER'S PERSONAL CHART DATA (Use this to give personalized answers):
-{vedic_agent.user_chart_summary}
-
-IMPORTANT: When answering questions, refer to the user's actual chart data above. 
-For example:
-- "Based on your chart, your Moon is in [Sign] in the [House]th house..."
-- "Currently you are in [Mahadasha] Mahadasha..."
-"""
-        except Exception as e:
-            logger.error(f"Failed to load Kundli data: {e}")
+    vedic_agent = VedicAstrologyAgent(
+        user_id=user_id,
+        publish_data_fn=_publish_data_bytes,
+        user_language=user_language,
+        user_chart_summary=user_chart_summary,
+    )
+    
+    async def release_chart():
+        chart_task.cancel()
+        if vedic_agent.kundli_retriever:
+            vedic_agent.kundli_retriever.release_session_documents(user_id)
+    
+    ctx.add_shutdown_callback(release_chart)
     
     await session.start(
         agent=vedic_agent,
@@ -0,0 +1,173 @@
+import asyncio
+import time
+
+from api_resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, EndpointPolicy, TokenBucket, UpstreamError
+from astrology_api_client import AstrologyAPIClient
+from astrology_cache import AstrologyCache
+
+
+class NoCache:
+    def get(self, endpoint, **params):
+        return None
+
+    get_stale = get
+
+    def set(self, value, endpoint, **params):
+        pass
+
+
+def _client(monkeypatch) -> AstrologyAPIClient:
+    monkeypatch.setenv("ASTROLOGY_API_USER_ID", "user")
+    monkeypatch.setenv("ASTROLOGY_API_KEY", "key")
+    client = AstrologyAPIClient()
+    client.cache = NoCache()
+    return client
+
+
+def _half_open(client: AstrologyAPIClient, family: str) -> CircuitBreaker:
+    client._policy(family)
+    breaker = client.metrics.breakers[family]
+    breaker.recovery_timeout = 0
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    return breaker
+
+
+def test_breaker_opens_and_admits_one_probe() -> None:
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.cancel_probe()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.failures == 0
+
+
+def test_token_bucket_limits_and_adapts() -> None:
+    async def run():
+        bucket = TokenBucket(rate_per_sec=10, burst=2)
+        assert await bucket.acquire(timeout=0) and await bucket.acquire(timeout=0)
+        assert not await bucket.acquire(timeout=0.01)
+        assert await bucket.acquire(timeout=0.5)
+
+        # A short timeout is not held up by a caller waiting longer for a token
+        slow = TokenBucket(rate_per_sec=1, burst=1)
+        await slow.acquire(timeout=0)
+        waiter = asyncio.create_task(slow.acquire(timeout=5))
+        await asyncio.sleep(0)
+        started = time.monotonic()
+        assert not await slow.acquire(timeout=0.1)
+        assert time.monotonic() - started < 0.5
+        waiter.cancel()
+
+        bucket.on_throttled()
+        bucket.on_throttled()
+        assert bucket.rate == 2.5
+        for _ in range(100):
+            bucket.on_success()
+        assert bucket.rate == 10
+        for _ in range(10):
+            bucket.on_throttled()
+        assert bucket.rate == bucket.min_rate
+
+    asyncio.run(run())
+
+
+def test_throttled_or_cancelled_probe_is_released(monkeypatch) -> None:
+    async def run():
+        client = _client(monkeypatch)
+        breaker = _half_open(client, "manglik")
+
+        async def throttled(*args):
+            raise UpstreamError("API error 429", status=429)
+
+        client._hedged = throttled
+        assert await client._call_api("manglik", {"day": 1}) is None
+        assert breaker.state == HALF_OPEN and breaker.allow()
+        breaker.cancel_probe()
+
+        started = asyncio.Event()
+
+        async def hanging(*args):
+            started.set()
+            await asyncio.sleep(60)
+
+        client._hedged = hanging
+        task = asyncio.create_task(client._call_api("manglik", {"day": 1}))
+        await started.wait()
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        assert breaker.allow()
+
+    asyncio.run(run())
+
+
+def test_slow_primary_is_hedged(monkeypatch) -> None:
+    async def run():
+        client = _client(monkeypatch)
+        policy = EndpointPolicy(timeout=2.0, min_hedge_delay=0.02, min_samples=1)
+        client._policy("planets")
+        client.metrics.latency["planets"].record(0.01)
+        calls = []
+
+        async def attempt(url, data, headers, timeout):
+            calls.append(url)
+            if len(calls) == 1:
+                await asyncio.sleep(1)
+                return {"from": "primary"}
+            return {"from": "backup"}
+
+        client._attempt = attempt
+        result = await client._hedged("planets", "https://api/planets", {}, None, policy)
+
+        assert result == {"from": "backup"} and len(calls) == 2
+        assert client.metrics.counters["planets"]["hedged"] == 1
+        assert client.metrics.counters["planets"]["hedge_wins"] == 1
+
+        # No latency history yet: a single request, no hedge
+        client._policy("manglik")
+        calls.clear()
+        calls.append("warm")  # the next attempt answers immediately
+        assert await client._hedged("manglik", "https://api/manglik", {}, None, policy) == {"from": "backup"}
+        assert "manglik" not in client.metrics.counters
+
+    asyncio.run(run())
+
+
+def test_cache_keeps_stale_entries_within_bounds() -> None:
+    cache = AstrologyCache(ttl_minutes=0, max_entries=2)
+    for day in range(3):
+        cache.set({"day": day}, "panchang", day=day)
+
+    assert cache.get("panchang", day=2) is None
+    assert cache.get_stale("panchang", day=2) == {"day": 2}
+    assert cache.get_stale("panchang", day=0) is None
+    assert len(cache.cache) == 2
+
+    cache.max_stale_age = cache.ttl
+    assert cache.get_stale("panchang", day=2) is None
+
+
+def test_metrics_server_started_once_per_process(monkeypatch) -> None:
+    async def run():
+        client = _client(monkeypatch)
+        first = await client.start_metrics_server(0)
+        try:
+            assert first is not None
+            assert await client.start_metrics_server(0) is first
+        finally:
+            await first.cleanup()
+
+    asyncio.run(run())
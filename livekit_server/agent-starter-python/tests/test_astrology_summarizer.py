@@ -0,0 +1,57 @@
+import asyncio
+import json
+from pathlib import Path
+
+from astrology_api_client import AstrologyAPIClient, birth_data_from_chart
+from astrology_summarizer import estimate_tokens, summarize_response
+
+FIXTURES = json.loads(
+    (Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures" / "astrology_responses.json").read_text()
+)
+
+
+def test_projections_keep_the_quoted_facts() -> None:
+    dasha = summarize_response("current_vdasha", FIXTURES["current_vdasha"])
+    assert "- Mahadasha: Jupiter (2020-05-15 to 2036-05-15)" in dasha
+    assert "planet_id" not in dasha
+
+    manglik = summarize_response("manglik", FIXTURES["manglik"])
+    assert manglik.startswith("Manglik Status:") and "PARTIAL" in manglik
+
+    # Parameterized endpoints use their family's projector
+    assert summarize_response("horoscope_prediction/daily/cancer", FIXTURES["horoscope_prediction/daily/cancer"]) \
+        == summarize_response("horoscope_prediction/daily", FIXTURES["horoscope_prediction/daily/cancer"])
+
+
+def test_budget_and_generic_fallback() -> None:
+    planets = summarize_response("planets/extended", FIXTURES["planets/extended"], max_tokens=30)
+    assert planets.endswith("...") and estimate_tokens(planets) <= 32
+
+    # A stored document that is not shaped like the endpoint's response is flattened instead
+    stored = {"dasha_system": "vimshottari", "mahadasha": "Rahu", "antardasha": "", "notes": None}
+    assert summarize_response("current_vdasha", stored) == "dasha_system: vimshottari\nmahadasha: Rahu"
+    assert summarize_response("manglik", None) == "No data available."
+
+
+def test_get_summary_projects_the_api_response(monkeypatch) -> None:
+    monkeypatch.setenv("ASTROLOGY_API_USER_ID", "user")
+    monkeypatch.setenv("ASTROLOGY_API_KEY", "key")
+    client = AstrologyAPIClient()
+    calls = []
+
+    async def fake_call_api(endpoint, data, language=None):
+        calls.append((endpoint, data))
+        return FIXTURES.get(endpoint)
+
+    client._call_api = fake_call_api
+    payload = birth_data_from_chart(
+        {"birthDate": "15/05/1990", "birthTime": "14:30", "latitude": 19.07, "longitude": 72.88, "tzone": 5.5}
+    )
+
+    summary = asyncio.run(client.get_summary("current_vdasha", payload))
+    assert summary.startswith("Current Dasha Periods:")
+    assert calls == [("current_vdasha", {
+        "day": 15, "month": 5, "year": 1990, "hour": 14, "min": 30, "lat": 19.07, "lon": 72.88, "tzone": 5.5,
+    })]
+    assert asyncio.run(client.get_summary("pitra_dosha_report", payload)) is None
+    assert birth_data_from_chart({"birthDate": "15/05/1990", "birthTime": "14:30"}) is None
@@ -0,0 +1,58 @@
+import io
+import json
+
+from chart_codec import PACKED_FIELD, decode_chart, encode_chart
+from jyotish_constants import PLANETS
+from local_index import InMemoryIndex
+from migrate_chart_metadata import migrate, rollback
+from pinecone_kundli_retriever import KundliRetriever, chart_doc_id
+
+
+def _loose_chart(user_id):
+    chart = {
+        "userId": user_id, "data_type": "chart", "birthPlace": "Pune",
+        "rashi": "Karka", "lagna": "Mesha", "nakshatra": "Pushya", "nakshatraPada": "2",
+        "mahadasha": "Jupiter", "antardasha": "Saturn", "manglik": "true", "yogas": "Gajakesari",
+    }
+    for n, planet in enumerate(PLANETS):
+        chart[f"{planet}_sign"] = ["Simha", "Karka", "Tula"][n % 3]
+        chart[f"{planet}_house"] = str(n + 1)
+    return chart
+
+
+def test_round_trip_and_size() -> None:
+    chart = _loose_chart("u1")
+    chart["ketu_sign"] = "Aquarius"  # English among Sanskrit names stays loose
+
+    packed = encode_chart(chart)
+    decoded = decode_chart(packed)
+
+    assert len(json.dumps(packed)) < len(json.dumps(chart)) / 2
+    assert packed["ketu_sign"] == "Aquarius" and "sun_sign" not in packed
+    assert decoded["sun_house"] == 1 and decoded["manglik"] is True
+    assert {k: str(v).lower() for k, v in decoded.items()} == {k: str(v).lower() for k, v in chart.items()}
+    assert encode_chart({"data_type": "planet", "planet_name": "sun"}) == {"data_type": "planet", "planet_name": "sun"}
+
+
+async def test_migration_and_rollback(tmp_path) -> None:
+    index = InMemoryIndex(dimension=2)
+    index.upsert(vectors=[
+        {"id": chart_doc_id(f"u{n}"), "values": [1, 0], "metadata": _loose_chart(f"u{n}")} for n in range(25)
+    ] + [{"id": "u1:planet:sun", "values": [0, 1], "metadata": {"data_type": "planet", "planet_name": "sun"}}])
+
+    backup = io.StringIO()
+    stats = await migrate(index, backup, page_size=10, concurrency=2)
+    assert (stats.scanned, stats.migrated) == (26, 25)
+    stored = index.fetch([chart_doc_id("u3")]).vectors[chart_doc_id("u3")]
+    assert PACKED_FIELD in stored.metadata and stored["values"] == [1, 0]
+
+    kundli = await KundliRetriever(index=index).get_user_kundli("u3")
+    assert (kundli["rashi"], kundli["sun_house"], kundli["mahadasha"]) == ("Karka", 1, "Jupiter")
+
+    # Re-running is a no-op
+    assert (await migrate(index, io.StringIO())).migrated == 0
+
+    backup_path = tmp_path / "backup.jsonl"
+    backup_path.write_text(backup.getvalue())
+    assert rollback(index, backup_path) == 25
+    assert index.fetch([chart_doc_id("u3")]).vectors[chart_doc_id("u3")].metadata == _loose_chart("u3")
@@ -0,0 +1,85 @@
+import asyncio
+from types import SimpleNamespace
+
+from embedding_service import EmbeddingCache, EmbeddingService
+
+
+class FakeEmbeddings:
+    """Stand-in for client.embeddings; records each request's inputs."""
+
+    def __init__(self):
+        self.requests = []
+
+    async def create(self, input, model):
+        self.requests.append(list(input))
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(data=[
+            SimpleNamespace(index=i, embedding=[float(len(text)), float(i)])
+            for i, text in enumerate(input)
+        ])
+
+
+def _service(tmp_path, **kwargs):
+    fake = FakeEmbeddings()
+    service = EmbeddingService(
+        client=SimpleNamespace(embeddings=fake),
+        cache=EmbeddingCache(tmp_path / "embeddings.sqlite"),
+        **kwargs,
+    )
+    return service, fake
+
+
+async def test_concurrent_requests_share_one_call(tmp_path) -> None:
+    service, fake = _service(tmp_path)
+
+    vectors = await asyncio.gather(*[service.embed(f"chart {i}") for i in range(20)], service.embed("chart 3"))
+
+    assert len(fake.requests) == 1
+    assert len(fake.requests[0]) == 20
+    assert vectors[3] == vectors[20]
+
+
+async def test_batches_split_at_limit(tmp_path) -> None:
+    service, fake = _service(tmp_path, max_batch=8)
+
+    await service.embed_many([f"house {i}" for i in range(20)])
+
+    assert [len(r) for r in fake.requests] == [8, 8, 4]
+
+
+async def test_unchanged_text_skips_api(tmp_path) -> None:
+    service, fake = _service(tmp_path)
+    first = await service.embed("Birth chart for u1")
+
+    # A new process reads the same cache file
+    restarted, restarted_fake = _service(tmp_path)
+    second = await restarted.embed("Birth chart for u1")
+
+    assert first == second
+    assert len(fake.requests) == 1
+    assert restarted_fake.requests == []
+    assert restarted.get_stats()["cache_hits"] == 1
+
+
+async def test_send_tasks_are_tracked(tmp_path) -> None:
+    service, fake = _service(tmp_path, max_batch=4)
+
+    pending = asyncio.ensure_future(service.embed_many([f"planet {i}" for i in range(10)]))
+    await asyncio.sleep(0)
+    while not service._tasks and not pending.done():
+        await asyncio.sleep(0.001)
+    assert len(service._tasks) == 3
+    await pending
+
+    assert service._tasks == set()
+
+
+def test_cache_is_capped(tmp_path) -> None:
+    cache = EmbeddingCache(tmp_path / "embeddings.sqlite", max_entries=10)
+    for i in range(12):
+        cache.set_many({f"key {i}": [float(i)]})
+
+    assert len(cache) == 10
+    assert cache.get_many(["key 0", "key 1"]) == {}
+    assert cache.get_many(["key 2"]) == {"key 2": [2.0]}
+    assert cache.get_many(["key 11"]) == {"key 11": [11.0]}
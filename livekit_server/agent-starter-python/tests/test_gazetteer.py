@@ -0,0 +1,33 @@
+from datetime import datetime
+from pathlib import Path
+
+from gazetteer import Gazetteer, timezone_offset
+
+SOURCE = Path(__file__).resolve().parent.parent / "src" / "data" / "cities.tsv"
+
+
+def test_lookup_aliases_and_fuzzy(tmp_path) -> None:
+    gazetteer = Gazetteer(source_path=SOURCE, index_path=tmp_path / "gazetteer.idx")
+
+    assert gazetteer.resolve("Bombay")["name"] == "Mumbai"
+    assert gazetteer.resolve("वाराणसी")["name"] == "Varanasi"
+    assert gazetteer.resolve("Bangalor")["name"] == "Bengaluru"
+    assert gazetteer.resolve("Dehradun, UK")["country"] == "IN"
+    assert gazetteer.resolve("Varansi")["name"] == "Varanasi"
+    assert gazetteer.resolve("xyzzy") is None
+
+
+def test_rejects_weak_and_mismatched_places(tmp_path) -> None:
+    gazetteer = Gazetteer(source_path=SOURCE, index_path=tmp_path / "gazetteer.idx")
+
+    # Not in the bundled list; the nearest names are other towns
+    assert gazetteer.resolve("Sitapur") is None
+    assert gazetteer.resolve("Ghazipur") is None
+    assert gazetteer.resolve("Hyderabad, Pakistan") is None
+    assert gazetteer.resolve("Hyderabad, India")["country"] == "IN"
+
+
+def test_historical_timezone_offset() -> None:
+    assert timezone_offset("Asia/Kolkata", datetime(1943, 5, 15, 10, 0)) == 6.5
+    assert timezone_offset("Asia/Kolkata", datetime(1990, 5, 15, 10, 0)) == 5.5
+    assert timezone_offset("Europe/London", datetime(1990, 7, 1, 10, 0)) == 1.0
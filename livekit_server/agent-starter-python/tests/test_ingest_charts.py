@@ -0,0 +1,86 @@
+import json
+
+import ingest_charts
+from embedding_service import HashingEmbedder
+from ingest_charts import Checkpoint, ingest, normalize_record, read_jsonl
+from local_index import InMemoryIndex
+from pinecone_kundli_retriever import chart_doc_id
+
+
+class FlakyIndex(InMemoryIndex):
+    """Fails every upsert after the first `healthy` calls."""
+
+    def __init__(self, healthy: int):
+        super().__init__(dimension=8)
+        self.healthy = healthy
+
+    def upsert(self, vectors, **kwargs):
+        if self.healthy <= 0:
+            raise ConnectionError("upstream unavailable")
+        self.healthy -= 1
+        return super().upsert(vectors, **kwargs)
+
+
+def _write_records(path, count):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            f.write(json.dumps({"userId": f"user{i}", "rashi": "Karka", "birthDate": "1990-01-01"}) + "\n")
+        f.write(json.dumps({"rashi": "Simha"}) + "\n")  # no user ID
+
+
+async def test_ingest_upserts_in_batches(tmp_path) -> None:
+    source = tmp_path / "charts.jsonl"
+    _write_records(source, 250)
+    index = InMemoryIndex(dimension=8)
+    checkpoint = Checkpoint(tmp_path / "checkpoint.json", str(source))
+
+    stats = await ingest(read_jsonl(str(source)), index, HashingEmbedder(dimension=8),
+                         batch_size=100, concurrency=2, checkpoint=checkpoint)
+
+    assert (stats["upserted"], stats["skipped"], stats["batches"]) == (250, 1, 3)
+    assert index.describe_index_stats()["total_vector_count"] == 250
+    assert index.fetch([chart_doc_id("user7")])["vectors"][chart_doc_id("user7")]["metadata"]["data_type"] == "chart"
+    assert checkpoint.position == 251
+
+
+async def test_ingest_resumes_from_checkpoint(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(ingest_charts, "UPSERT_RETRY_DELAY", 0)
+    source = tmp_path / "charts.jsonl"
+    _write_records(source, 250)
+    checkpoint = Checkpoint(tmp_path / "checkpoint.json", str(source))
+
+    index = FlakyIndex(healthy=1)
+    stats = await ingest(read_jsonl(str(source)), index, HashingEmbedder(dimension=8),
+                         batch_size=100, concurrency=1, checkpoint=checkpoint)
+    assert "error" in stats
+    assert checkpoint.position == 100
+
+    resumed = Checkpoint(tmp_path / "checkpoint.json", str(source))
+    resumed.load()
+    index.healthy = 10
+    stats = await ingest(read_jsonl(str(source), skip=resumed.position), index, HashingEmbedder(dimension=8),
+                         batch_size=100, checkpoint=resumed, start_position=resumed.position)
+
+    assert stats["upserted"] == 150
+    assert index.describe_index_stats()["total_vector_count"] == 250
+    assert resumed.position == 251
+
+
+def test_only_chart_and_birth_fields_are_kept() -> None:
+    user_id, metadata = normalize_record({
+        "uid": "user1", "email": "a@example.com", "phone": "+911234567890", "displayName": "Asha",
+        "birthDate": "1990-01-01", "birthPlace": "Pune, India",
+        "kundli": {"rashi": "Karka", "moon_house": 4, "fcmToken": "secret"},
+    })
+
+    assert user_id == "user1"
+    assert metadata == {"birthDate": "1990-01-01", "birthPlace": "Pune, India", "rashi": "Karka",
+                        "moon_house": 4, "userId": "user1", "data_type": "chart"}
+
+
+def test_jsonl_resume_counts_records_not_lines(tmp_path) -> None:
+    source = tmp_path / "charts.jsonl"
+    source.write_text('{"userId": "a"}\n\n{"userId": "b"}\n\n{"userId": "c"}\n', encoding="utf-8")
+
+    # ingest() saves position 2 after the first two records
+    assert [record["userId"] for _, record in read_jsonl(str(source), skip=2)] == ["c"]
@@ -0,0 +1,161 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from pinecone_kundli_retriever import KundliRetriever, chart_doc_id, dasha_doc_id, house_doc_id, planet_doc_id
+
+FRAME_INTERVAL = 0.02  # 20 ms audio frames
+
+
+class BlockingIndex:
+    """Stands in for the synchronous Pinecone index: every call blocks its thread."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def query(self, vector, filter, top_k, include_metadata):
+        time.sleep(self.delay)
+        return SimpleNamespace(matches=[SimpleNamespace(metadata={"userId": "u1", "rashi": "Karka"})])
+
+    def fetch(self, ids):
+        # Nothing stored under the ID layout: forces the legacy query path
+        time.sleep(self.delay)
+        return SimpleNamespace(vectors={})
+
+    def upsert(self, vectors):
+        time.sleep(self.delay)
+
+
+class DictIndex:
+    """In-memory index with the ID layout; counts round trips."""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.fetch_calls = 0
+        self.query_calls = 0
+
+    def fetch(self, ids):
+        self.fetch_calls += 1
+        return {"vectors": {i: {"id": i, "metadata": self.documents[i]} for i in ids if i in self.documents}}
+
+    def query(self, filter, **kwargs):
+        self.query_calls += 1
+        for doc_id, metadata in self.documents.items():
+            if ":" not in doc_id and all(metadata.get(k) == v for k, v in filter.items()):
+                # Legacy random-ID document
+                return SimpleNamespace(matches=[SimpleNamespace(metadata=metadata)])
+        return SimpleNamespace(matches=[])
+
+
+async def _pump_frames(stop: asyncio.Event) -> float:
+    """Simulate the audio loop; return the worst gap between frames."""
+    worst = 0.0
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(FRAME_INTERVAL)
+        now = time.perf_counter()
+        worst = max(worst, now - last)
+        last = now
+    return worst
+
+
+async def test_lookups_do_not_block_event_loop() -> None:
+    retriever = KundliRetriever(index=BlockingIndex(delay=0.3))
+    stop = asyncio.Event()
+    pump = asyncio.create_task(_pump_frames(stop))
+
+    results = await asyncio.gather(
+        retriever.get_user_kundli("u1"),
+        retriever.get_planet_data("u1", "moon"),
+        retriever.get_house_data("u1", 4),
+        retriever.get_dosha_data("u1", "manglik"),
+    )
+    stop.set()
+    worst_gap = await pump
+
+    assert all(r and r["rashi"] == "Karka" for r in results)
+    # A blocking call on the loop would stall frames for the full 300 ms
+    assert worst_gap < FRAME_INTERVAL + 0.05
+
+
+async def test_lookup_times_out() -> None:
+    retriever = KundliRetriever(index=BlockingIndex(delay=1.0), timeout=0.1)
+
+    start = time.perf_counter()
+    result = await retriever.get_dasha_data("u1")
+
+    assert result is None
+    assert time.perf_counter() - start < 0.5
+
+
+async def test_multiple_documents_in_one_fetch() -> None:
+    index = DictIndex({
+        chart_doc_id("u1"): {"rashi": "Karka"},
+        planet_doc_id("u1", "saturn"): {"planet_name": "saturn", "sign": "Aquarius"},
+        house_doc_id("u1", 7): {"house_number": 7, "sign": "Aries"},
+        dasha_doc_id("u1"): {"mahadasha": "Jupiter"},
+    })
+    retriever = KundliRetriever(index=index)
+
+    documents = await retriever.get_chart_documents(
+        "u1", planets=["Saturn"], houses=[7], dashas=["vimshottari"], include_chart=False
+    )
+
+    assert documents["planets"]["saturn"]["sign"] == "Aquarius"
+    assert documents["houses"][7]["sign"] == "Aries"
+    assert documents["dashas"]["vimshottari"]["mahadasha"] == "Jupiter"
+    assert (index.fetch_calls, index.query_calls) == (1, 0)
+
+    await retriever.load_session_documents("u1")
+    assert (await retriever.get_user_kundli("u1"))["rashi"] == "Karka"
+    assert (await retriever.get_house_data("u1", 7))["sign"] == "Aries"
+    assert index.fetch_calls == 2
+
+
+async def test_session_documents_released() -> None:
+    index = DictIndex({chart_doc_id("u1"): {"rashi": "Karka"}})
+    retriever = KundliRetriever(index=index)
+
+    await retriever.load_session_documents("u1")
+    await retriever.get_user_kundli("u1")
+    assert index.fetch_calls == 1
+
+    retriever.release_session_documents("u1")
+    assert (await retriever.get_user_kundli("u1"))["rashi"] == "Karka"
+    assert index.fetch_calls == 2
+
+
+async def test_preload_falls_back_per_missing_section() -> None:
+    index = DictIndex({
+        chart_doc_id("u1"): {"rashi": "Karka"},
+        house_doc_id("u1", 7): {"house_number": 7, "sign": "Aries"},
+        # Written before the ID layout: only reachable by filtered query
+        "legacy-4f2a": {"userId": "u1", "data_type": "dosha", "dosha_name": "manglik", "is_present": True},
+    })
+    retriever = KundliRetriever(index=index)
+    await retriever.load_session_documents("u1")
+
+    assert (await retriever.get_house_data("u1", 7))["sign"] == "Aries"
+    assert index.query_calls == 0
+    assert (await retriever.get_dosha_data("u1", "manglik"))["is_present"] is True
+    assert index.query_calls == 1
+
+    # Kept with the session's documents once found
+    assert (await retriever.get_dosha_data("u1", "manglik"))["is_present"] is True
+    assert (index.fetch_calls, index.query_calls) == (1, 1)
+
+
+async def test_preload_of_a_legacy_user() -> None:
+    # Everything written before the ID layout: the chart under the bare user ID, sections under random IDs
+    index = DictIndex({
+        "u1": {"userId": "u1", "rashi": "Karka"},
+        "legacy-9c1e": {"userId": "u1", "data_type": "planet", "planet_name": "saturn", "sign": "Aquarius"},
+    })
+    retriever = KundliRetriever(index=index)
+
+    await retriever.load_session_documents("u1")
+    documents = await retriever.get_chart_documents("u1", planets=["saturn"], houses=[7])
+
+    assert documents["chart"]["rashi"] == "Karka"
+    assert documents["planets"]["saturn"]["sign"] == "Aquarius"
+    assert documents["houses"] == {}
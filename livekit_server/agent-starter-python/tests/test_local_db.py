@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from local_db import LocalDB
+
+
+@pytest.fixture
+def make_db(tmp_path, monkeypatch):
+    def make(legacy=None):
+        monkeypatch.setattr(LocalDB, "_instance", None)
+        legacy_file = tmp_path / "music_tracks.json"
+        if legacy is not None:
+            legacy_file.write_text(json.dumps(legacy))
+        return LocalDB(db_file=tmp_path / "tracks.sqlite3", legacy_json_file=legacy_file)
+    return make
+
+
+def test_recent_tracks_per_user(make_db) -> None:
+    db = make_db()
+    for n in range(8):
+        db.save_music_track("u1" if n % 2 else "u2", {"title": f"Bhajan {n}"})
+
+    tracks = db.get_user_tracks("u1", limit=3)
+
+    assert [t["title"] for t in tracks] == ["Bhajan 7", "Bhajan 5", "Bhajan 3"]
+    assert all(t["userId"] == "u1" for t in tracks)
+
+
+def test_legacy_json_migrated_once(make_db, tmp_path) -> None:
+    legacy = [
+        {"title": "Old", "userId": "u1", "createdAt": "2024-01-01T00:00:00"},
+        {"title": "Older", "userId": "u1", "createdAt": "2023-01-01T00:00:00"},
+    ]
+    db = make_db(legacy)
+    assert [t["title"] for t in db.get_user_tracks("u1")] == ["Old", "Older"]
+    assert (tmp_path / "music_tracks.json.migrated").exists()
+
+    # A restart does not import again
+    db = make_db()
+    assert len(db.get_user_tracks("u1")) == 2
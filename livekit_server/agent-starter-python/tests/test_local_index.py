@@ -0,0 +1,60 @@
+import time
+
+from local_index import InMemoryIndex, matches_filter
+from pinecone_kundli_retriever import KundliRetriever, chart_doc_id
+
+
+def _index(**kwargs):
+    index = InMemoryIndex(dimension=3, **kwargs)
+    index.upsert(vectors=[
+        {"id": "a", "values": [1, 0, 0], "metadata": {"userId": "u1", "data_type": "planet", "house": 1}},
+        {"id": "b", "values": [0.9, 0.1, 0], "metadata": {"userId": "u1", "data_type": "house", "house": 7}},
+        {"id": "c", "values": [0, 1, 0], "metadata": {"userId": "u2", "tags": ["manglik", "kalsarpa"]}},
+    ])
+    return index
+
+
+def test_filters() -> None:
+    metadata = {"userId": "u1", "house": 7, "tags": ["manglik"]}
+    assert matches_filter(metadata, {"userId": "u1", "house": {"$gte": 7}})
+    assert matches_filter(metadata, {"tags": {"$in": ["manglik", "pitra"]}})
+    assert matches_filter(metadata, {"$or": [{"userId": "u2"}, {"house": {"$lt": 8}}]})
+    assert not matches_filter(metadata, {"userId": {"$nin": ["u1"]}})
+    assert not matches_filter(metadata, {"missing": {"$exists": True}})
+
+
+def test_query_ranks_by_cosine_and_filters() -> None:
+    index = _index()
+
+    result = index.query(vector=[1, 0, 0], top_k=2, include_metadata=True)
+    assert [m.id for m in result.matches] == ["a", "b"]
+    assert result.matches[0].score > 0.99
+
+    result = index.query(vector=[1, 0, 0], top_k=5, filter={"userId": {"$eq": "u2"}}, include_metadata=True)
+    assert [m.id for m in result.matches] == ["c"]
+    assert result.matches[0].metadata["tags"] == ["manglik", "kalsarpa"]
+
+
+def test_list_fetch_delete() -> None:
+    index = _index()
+
+    assert list(index.list(limit=2)) == [["a", "b"], ["c"]]
+    page = index.list_paginated(limit=2)
+    assert page.pagination.next == "b"
+
+    index.delete(filter={"userId": "u1"})
+    assert set(index.fetch(["a", "b", "c"]).vectors) == {"c"}
+    assert index.describe_index_stats().total_vector_count == 1
+
+
+async def test_retriever_with_injected_latency() -> None:
+    index = InMemoryIndex(dimension=4, latency={"fetch": 0.05})
+    index.upsert(vectors=[{"id": chart_doc_id("u1"), "values": [0.1] * 4, "metadata": {"rashi": "Karka"}}])
+    retriever = KundliRetriever(index=index)
+
+    start = time.perf_counter()
+    kundli = await retriever.get_user_kundli("u1")
+
+    assert kundli["rashi"] == "Karka"
+    assert time.perf_counter() - start >= 0.05
+    assert index.calls == {"upsert": 1, "fetch": 1}
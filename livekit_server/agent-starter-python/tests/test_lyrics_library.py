@@ -0,0 +1,47 @@
+from lyrics_library import LyricsLibrary, infer_deity, normalize_deity
+
+NEW_BHAJAN = """Kanha re Kanha, murli wale Kanha
+Vrindavan ki galiyon mein Kanha
+Kanha re Kanha, murli wale Kanha
+Gopiyon ke sang naache Kanha"""
+
+
+def test_find_ranks_by_parameters(tmp_path) -> None:
+    library = LyricsLibrary(tmp_path / "lyrics.sqlite3")
+
+    best = library.find("Govinda", "devotion", "Hindi", "Bhajan")
+    assert best[0]["deity"] == "krishna" and best[0]["style"] == "bhajan" and best[0]["language"] == "hindi"
+    assert all(entry["deity"] in {"krishna", "divine"} for entry in best)
+
+    assert library.find("Mahadev", "meditation", "Sanskrit", "Mantra")[0]["deity"] == "shiva"
+    assert library.find("Krishna", "devotion", "Tamil", "Kirtan") == []
+
+
+def test_language_is_a_hard_filter(tmp_path) -> None:
+    library = LyricsLibrary(tmp_path / "lyrics.sqlite3")
+
+    assert library.find("Krishna", "devotion", "English", "Bhajan") == []
+    # Sanskrit texts still serve Hindi requests
+    assert {e["language"] for e in library.find("Krishna", "devotion", "Hindi", "Mantra")} <= {"hindi", "sanskrit"}
+    assert library.find("Krishna", "devotion", "Hindi", "Mantra")[0]["title"] == "Hare Krishna Mahamantra"
+
+
+def test_approved_lyrics_persist_and_rank(tmp_path) -> None:
+    db_file = tmp_path / "lyrics.sqlite3"
+    library = LyricsLibrary(db_file)
+    entry_id = library.record_approval(NEW_BHAJAN, deity="", theme="devotion", language="Hindi", style="Bhajan")
+    library.record_approval(NEW_BHAJAN + "\n", deity="", theme="devotion", language="Hindi", style="Bhajan")
+
+    reloaded = LyricsLibrary(db_file)
+    best = reloaded.find("Krishna", "devotion", "Hindi", "Bhajan")[0]
+
+    assert best["id"] == entry_id
+    assert best["deity"] == "krishna" and best["approvals"] == 2
+    assert len(reloaded) == len(library)
+
+
+def test_deity_names() -> None:
+    assert normalize_deity("Durga") == "devi"
+    assert normalize_deity("") == "divine"
+    assert infer_deity("Om namah shivaya, Shiva Shambhu") == "shiva"
+    assert infer_deity("Peace within, light without") == "divine"
@@ -0,0 +1,71 @@
+import asyncio
+
+from lyrics_prevalidator import LyricsPrevalidator, detect_script, prevalidate
+
+BHAJAN = """Govinda Gopala, Radha Ramana
+Nanda ke lala, Krishna Murari
+Govinda Gopala, Radha Ramana
+Murlidhar Giridhari, Hari Hari"""
+
+
+def test_clear_cases_settled_locally() -> None:
+    assert prevalidate("Peace now", "Ambient", "English")["is_valid"] is False
+    style_text = "Slow devotional bhajan track with bansuri flute, tabla and harmonium, ambient background"
+    assert prevalidate(style_text + "\n" + style_text, "Bhajan", "Hindi")["is_valid"] is False
+    assert prevalidate("गोविंद गोपाल राधा रमण\nनंद के लाला कृष्ण मुरारी", "Bhajan", "English")["is_valid"] is False
+    assert prevalidate(BHAJAN, "Krishna Bhajan", "Hindi")["is_valid"] is True
+
+
+def test_short_mantras_go_to_llm() -> None:
+    assert prevalidate("Om Namah Shivaya\nOm Namah Shivaya", "Mantra", "Sanskrit") is None
+    assert prevalidate("ॐ नमः शिवाय\nॐ नमः शिवाय", "Mantra", "Sanskrit") is None
+
+
+def test_detect_script() -> None:
+    assert detect_script("गोविंद गोपाल") == "devanagari"
+    assert detect_script("கோவிந்தா") == "tamil"
+    assert detect_script("Govinda Gopala") == "latin"
+
+
+def test_llm_verdicts_cached_by_normalized_lyrics() -> None:
+    calls = []
+    lyrics = "In the quiet of the morning\nI sit and breathe the light\nThe river carries all my fears\nInto the arms of night"
+
+    async def llm():
+        calls.append(1)
+        return {"is_valid": True, "overall_score": 7.5, "feedback": "ok", "suggestions": ""}
+
+    async def run():
+        validator = LyricsPrevalidator()
+        first = await validator.validate(lyrics, "Meditation", "English", llm)
+        second = await validator.validate(lyrics.upper().replace("\n", ",\n\n"), "meditation", "English", llm)
+        local = await validator.validate("too short", "Meditation", "English", llm)
+        return validator, [first["source"], second["source"], local["source"]]
+
+    validator, sources = asyncio.run(run())
+
+    assert sources == ["llm", "cache", "local"]
+    assert len(calls) == 1
+    assert validator.get_stats()["llm_calls_avoided"] == 2
+
+
+def test_generated_lyrics_skip_llm() -> None:
+    lyrics = "Peace flows like a gentle stream\nThrough every breath I take\nStillness holds me in its dream\nAs morning light will wake"
+    validator = LyricsPrevalidator()
+    validator.remember_generated(lyrics)
+
+    async def llm():
+        raise AssertionError("generated lyrics should not reach the LLM")
+
+    verdict = asyncio.run(validator.validate(lyrics, "Meditation", "English", llm))
+
+    assert verdict["is_valid"] and verdict["source"] == "local"
+
+
+def test_generated_hashes_bounded() -> None:
+    validator = LyricsPrevalidator(cache_size=2)
+    for n in range(3):
+        validator.remember_generated(f"verse {n}")
+
+    assert not validator._is_generated("verse 0")
+    assert validator._is_generated("verse 2")
@@ -0,0 +1,30 @@
+import asyncio
+
+from lyrics_stream import get_lyrics_stream_stats, stream_lyrics
+
+
+def test_lines_emitted_as_they_complete() -> None:
+    tokens = ["Govinda Go", "pala\nRadha Ra", "mana\n\nNanda ke ", "lala\nKrishna", " Murari"]
+    events = []
+
+    async def deltas():
+        for token in tokens:
+            events.append(("token", token))
+            yield token
+
+    async def run():
+        return await stream_lyrics(
+            deltas(),
+            on_line=lambda i, line: events.append(("line", line)),
+            on_first_stanza=lambda lines: events.append(("stanza", tuple(lines))),
+        )
+
+    result = asyncio.run(run())
+
+    assert result["lines"] == ["Govinda Gopala", "Radha Ramana", "Nanda ke lala", "Krishna Murari"]
+    # The first stanza is handed out before the rest of the completion is read
+    stanza_at = events.index(("stanza", ("Govinda Gopala", "Radha Ramana")))
+    assert events.index(("token", "lala\nKrishna")) > stanza_at
+    assert events.index(("line", "Govinda Gopala")) < events.index(("token", "mana\n\nNanda ke "))
+    assert result["time_to_first_line_ms"] <= result["total_ms"]
+    assert get_lyrics_stream_stats()["count"] >= 1
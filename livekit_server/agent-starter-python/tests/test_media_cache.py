@@ -0,0 +1,110 @@
+import asyncio
+import os
+
+import aiohttp
+from aiohttp import web
+
+from media_cache import MediaCache, create_app
+
+AUDIO = bytes(range(256)) * 64
+
+
+async def _serve(app) -> tuple:
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_fetch_serve_range_and_rewrite(tmp_path) -> None:
+    async def run():
+        async def track(request):
+            return web.Response(body=AUDIO, content_type="audio/mpeg")
+
+        origin = web.Application()
+        origin.router.add_get("/track.mp3", track)
+        origin_runner, origin_url = await _serve(origin)
+        cache = MediaCache(tmp_path, public_url="http://media.local")
+        media_runner, media_url = await _serve(create_app(cache))
+        try:
+            url = f"{origin_url}/track.mp3"
+            assert cache.rewrite_url(url) == url
+            await asyncio.gather(*cache._inflight.values())
+
+            local = cache.rewrite_url(url)
+            assert local.startswith("http://media.local/media/") and local.endswith(".mp3")
+
+            path = local.replace("http://media.local", media_url)
+            async with aiohttp.ClientSession() as session:
+                async with session.get(path, headers={"Range": "bytes=100-199"}) as response:
+                    assert response.status == 206
+                    assert response.headers["Content-Range"] == f"bytes 100-199/{len(AUDIO)}"
+                    assert "immutable" in response.headers["Cache-Control"]
+                    assert await response.read() == AUDIO[100:200]
+                async with session.get(f"{media_url}/media/unknown.mp3") as response:
+                    assert response.status == 404
+        finally:
+            await cache.close()
+            await media_runner.cleanup()
+            await origin_runner.cleanup()
+
+    asyncio.run(run())
+
+
+def test_lru_eviction_under_quota(tmp_path) -> None:
+    cache = MediaCache(tmp_path, max_bytes=250, public_url="http://media.local")
+    for index, key in enumerate(["old", "recent", "new"]):
+        (tmp_path / f"{key}.mp3").write_bytes(b"x" * 100)
+        with cache._conn:
+            cache._conn.execute(
+                "INSERT INTO media VALUES (?, ?, ?, 100, 'audio/mpeg', ?, ?)",
+                (key, f"https://cdn/{key}.mp3", f"{key}.mp3", index, index),
+            )
+    cache.lookup("old")  # touched: now the most recently used
+
+    assert cache.evict() == 1
+    assert cache.lookup("recent", touch=False) is None
+    assert not (tmp_path / "recent.mp3").exists()
+    assert cache.lookup("old", touch=False) and cache.lookup("new", touch=False)
+
+
+def test_cancelled_and_stale_downloads_leave_no_part_files(tmp_path) -> None:
+    async def run():
+        started = asyncio.Event()
+
+        async def slow_track(request):
+            response = web.StreamResponse(headers={"Content-Type": "audio/mpeg"})
+            await response.prepare(request)
+            await response.write(AUDIO)
+            started.set()
+            await asyncio.sleep(1)
+            return response
+
+        origin = web.Application()
+        origin.router.add_get("/slow.mp3", slow_track)
+        origin_runner, origin_url = await _serve(origin)
+        cache = MediaCache(tmp_path, public_url="http://media.local")
+        try:
+            task = cache.prefetch(f"{origin_url}/slow.mp3")
+            await started.wait()
+            await asyncio.sleep(0.05)
+            assert list(tmp_path.glob(".*.part"))
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            assert not list(tmp_path.glob(".*.part"))
+        finally:
+            await cache.close()
+            await origin_runner.cleanup()
+
+    asyncio.run(run())
+
+    cache = MediaCache(tmp_path)
+    stale, live = tmp_path / ".a.mp3.1.part", tmp_path / ".b.mp3.2.part"
+    stale.write_bytes(b"x")
+    live.write_bytes(b"x")
+    os.utime(stale, (0, 0))
+
+    assert cache.sweep_partial_downloads() == 1
+    assert not stale.exists() and live.exists()
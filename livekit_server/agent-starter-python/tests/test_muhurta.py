@@ -0,0 +1,40 @@
+from datetime import date, datetime
+
+from muhurta import find_muhurta, intersect_intervals, merge_intervals, subtract_intervals
+from panchang import day_panchang, jd_to_local
+
+DELHI = (28.6139, 77.2090, 5.5)
+
+
+def test_interval_arithmetic() -> None:
+    a = datetime(2025, 1, 1, 6)
+    b = datetime(2025, 1, 1, 9)
+    c = datetime(2025, 1, 1, 12)
+    d = datetime(2025, 1, 1, 15)
+
+    assert merge_intervals([(a, c), (b, d)]) == [(a, d)]
+    assert subtract_intervals([(a, d)], [(b, c)]) == [(a, b), (c, d)]
+    assert intersect_intervals([(a, c)], [(b, d)]) == [(b, c)]
+
+
+def test_day_panchang_sunrise_delhi() -> None:
+    panchang = day_panchang(date(2024, 6, 21), *DELHI)
+    sunrise = jd_to_local(panchang["sunrise"], DELHI[2])
+
+    assert (sunrise.hour, sunrise.minute) in ((5, 23), (5, 24), (5, 25))
+    assert len(panchang["choghadiya"]) == 16
+    assert len(panchang["hora"]) == 24
+
+
+def test_muhurta_avoids_rahu_kaal() -> None:
+    start = date(2025, 3, 14)
+    results = find_muhurta(start, 3, *DELHI, activity="business")
+
+    assert results
+    blocked = []
+    for offset in range(3):
+        day = date.fromordinal(start.toordinal() + offset)
+        blocked.extend((jd_to_local(s, DELHI[2]), jd_to_local(e, DELHI[2])) for s, e, _ in day_panchang(day, *DELHI)["rahu_kaal"])
+    for result in results:
+        for s, e in blocked:
+            assert result["end"] <= s or result["start"] >= e
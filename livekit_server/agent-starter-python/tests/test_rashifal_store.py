@@ -0,0 +1,65 @@
+import asyncio
+from datetime import datetime
+
+from jyotish_constants import NAKSHATRAS, RASHIS
+from rashifal_precompute import precompute_rashifal
+from rashifal_store import RashifalStore, make_key, period_id
+
+# 20:00 UTC is already the next day in India
+MONDAY = datetime(2025, 3, 10, 12, 0)
+MONDAY_NIGHT = datetime(2025, 3, 10, 20, 0)
+TUESDAY = datetime(2025, 3, 11, 12, 0)
+
+
+class FakeClient:
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = 0
+
+    async def _horoscope(self, zodiac, timezone=5.5, language="en"):
+        self.calls += 1
+        if zodiac in self.failing:
+            return None
+        return {"prediction": f"{zodiac} {language} prediction"}
+
+    get_daily_horoscope = get_weekly_horoscope = get_monthly_horoscope = _horoscope
+
+
+def test_period_ids_follow_indian_time() -> None:
+    assert period_id("daily", MONDAY) == "2025-03-10"
+    assert period_id("daily", MONDAY_NIGHT) == "2025-03-11"
+    assert period_id("weekly", TUESDAY) == "2025-W11"
+    assert period_id("monthly", TUESDAY) == "2025-03"
+
+
+def test_stale_daily_entry_is_a_miss(tmp_path) -> None:
+    store = RashifalStore(tmp_path / "rashifal.json")
+    store.write({
+        make_key("daily", "rashi", "aries", "en"): {"prediction": "monday"},
+        make_key("weekly", "rashi", "aries", "en"): {"prediction": "this week"},
+    }, now=MONDAY)
+    # Tuesday's run fails for aries daily; only taurus is refreshed
+    store.write({make_key("daily", "rashi", "taurus", "en"): {"prediction": "tuesday"}}, now=TUESDAY)
+
+    reader = RashifalStore(tmp_path / "rashifal.json")
+    assert reader.get("daily", "rashi", "aries", now=MONDAY) == {"prediction": "monday"}
+    assert reader.get("daily", "rashi", "aries", now=TUESDAY) is None
+    assert reader.get("daily", "rashi", "taurus", now=TUESDAY) == {"prediction": "tuesday"}
+    assert reader.get("weekly", "rashi", "aries", now=TUESDAY) == {"prediction": "this week"}
+    # Hindi not precomputed: English of the same day
+    assert reader.get("daily", "rashi", "taurus", "hi", now=TUESDAY) == {"prediction": "tuesday"}
+
+
+def test_precompute_fetches_rashis_and_derives_nakshatras() -> None:
+    client = FakeClient(failing={"aries"})
+
+    entries = asyncio.run(precompute_rashifal(client, ["daily"], ["en"], concurrency=2))
+
+    assert client.calls == len(RASHIS)
+    assert make_key("daily", "rashi", "aries", "en") not in entries
+    assert make_key("daily", "rashi", "pisces", "en") in entries
+    # Ashwini lies wholly in Aries, so without Aries it has nothing to derive from
+    assert make_key("daily", "nakshatra", "0", "en") not in entries
+    krittika = entries[make_key("daily", "nakshatra", "2", "en")]
+    assert krittika["nakshatra"] == NAKSHATRAS[2][0]
+    assert list(krittika["predictions"]) == ["taurus"]
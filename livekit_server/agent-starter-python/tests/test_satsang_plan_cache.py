@@ -0,0 +1,97 @@
+import asyncio
+
+from satsang_plan_cache import SatsangPlanCache
+
+PLAN = {
+    "topic": "Bhakti",
+    "intro_text": "Welcome",
+    "bhajan_query": "hare krishna",
+    "pravachan_points": ["Surrender"],
+    "closing_text": "Om Shanti",
+}
+
+
+def test_prefetched_plan_reused() -> None:
+    loads, searches = [], []
+
+    async def loader(plan_id):
+        loads.append(plan_id)
+        await asyncio.sleep(0.01)
+        return dict(PLAN)
+
+    async def resolver(query):
+        searches.append(query)
+        return {"video_id": "abc123", "title": "Hare Krishna Kirtan"}
+
+    async def run():
+        cache = SatsangPlanCache(ttl_seconds=60, loader=loader, bhajan_resolver=resolver)
+        cache.prefetch("plan-1", "vivekananda")
+        first = await cache.get("plan-1", "vivekananda")
+        second = await cache.get("plan-1", "vivekananda")
+        return cache, first, second
+
+    cache, first, second = asyncio.run(run())
+
+    assert loads == ["plan-1"] and searches == ["hare krishna"]
+    assert first is second
+    assert first["bhajan"] == {"title": "Hare Krishna Kirtan", "video_id": "abc123"}
+    assert '"Hare Krishna Kirtan" (ID: abc123)' in first["instructions"]["vivekananda"]
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_embedded_plan_skips_loader() -> None:
+    async def loader(plan_id):
+        raise AssertionError("loader should not be called")
+
+    async def run():
+        cache = SatsangPlanCache(ttl_seconds=60, loader=loader, bhajan_resolver=loader)
+        plan = dict(PLAN, bhajan_video_id="xyz", bhajan_title="Govind Bolo")
+        return await cache.get("plan-2", "prabhupada", plan)
+
+    entry = asyncio.run(run())
+
+    assert entry["bhajan"] == {"title": "Govind Bolo", "video_id": "xyz"}
+    assert "SESSION TOPIC: Bhakti" in entry["instructions"]["prabhupada"]
+
+
+def test_slow_bhajan_lookup_does_not_block(monkeypatch) -> None:
+    import satsang_plan_cache
+
+    monkeypatch.setattr(satsang_plan_cache, "BHAJAN_RESOLVE_TIMEOUT", 0.01)
+
+    async def loader(plan_id):
+        return dict(PLAN, bhajan_title="Hare Krishna")
+
+    async def resolver(query):
+        await asyncio.sleep(0.05)
+        return {"video_id": "late1", "title": "Hare Krishna Kirtan"}
+
+    async def run():
+        cache = SatsangPlanCache(ttl_seconds=60, loader=loader, bhajan_resolver=resolver)
+        entry = await cache.get("plan-3", "vivekananda")
+        before = dict(entry["bhajan"])
+        await asyncio.sleep(0.1)
+        refreshed = await cache.get("plan-3", "vivekananda")
+        return before, entry, refreshed
+
+    before, entry, refreshed = asyncio.run(run())
+
+    assert before == {"title": "Hare Krishna", "video_id": ""}
+    assert entry["bhajan"] == {"title": "Hare Krishna", "video_id": "late1"}
+    assert "(ID: late1)" in refreshed["instructions"]["vivekananda"]
+
+
+def test_expired_plans_are_evicted() -> None:
+    async def loader(plan_id):
+        return dict(PLAN, bhajan_video_id="v1")
+
+    async def run():
+        cache = SatsangPlanCache(ttl_seconds=0.05, loader=loader, bhajan_resolver=loader)
+        await cache.get("old", "vivekananda")
+        await asyncio.sleep(0.1)
+        await cache.get("new", "vivekananda")
+        return cache
+
+    cache = asyncio.run(run())
+
+    assert list(cache._entries) == ["new"]
@@ -0,0 +1,52 @@
+import csv
+import io
+import json
+
+from jyotish_constants import PLANETS
+from local_index import InMemoryIndex
+from pinecone_kundli_retriever import (
+    DASHA_SYSTEMS, DOSHA_TYPES, chart_doc_id, dasha_doc_id, dosha_doc_id, house_doc_id, planet_doc_id,
+)
+from scan_charts import ASTRO_FIELDS, ReportWriter, scan
+
+
+def _add_user(vectors, user_id, complete=True):
+    chart = {field: "x" for field in ASTRO_FIELDS} if complete else {"rashi": "Karka"}
+    docs = [(chart_doc_id(user_id), {**chart, "userId": user_id, "data_type": "chart"})]
+    docs += [(planet_doc_id(user_id, p), {"data_type": "planet", "planet_name": p.lower()}) for p in PLANETS]
+    houses = range(1, 13) if complete else range(1, 7)
+    docs += [(house_doc_id(user_id, h), {"data_type": "house", "house_number": h}) for h in houses]
+    docs += [(dasha_doc_id(user_id, d), {"data_type": "dasha", "dasha_system": d}) for d in DASHA_SYSTEMS]
+    docs += [(dosha_doc_id(user_id, d), {"data_type": "dosha", "dosha_name": d}) for d in DOSHA_TYPES]
+    vectors += [{"id": i, "values": [0.5, 0.5], "metadata": {"userId": user_id, **m}} for i, m in docs]
+
+
+async def test_scan_whole_index(tmp_path) -> None:
+    index = InMemoryIndex(dimension=2)
+    vectors = []
+    for n in range(30):
+        _add_user(vectors, f"user{n:02d}", complete=n % 3 != 0)
+    vectors.append({"id": "legacy-1", "values": [1, 0], "metadata": {"userId": "old", "rashi": "Simha"}})
+    # Pre-ID-layout house documents of user03 under random IDs, listed apart from user03's other documents
+    vectors += [{"id": f"a{h}f3e9", "values": [0, 1],
+                 "metadata": {"userId": "user03", "data_type": "house", "house_number": h}} for h in range(7, 13)]
+    index.upsert(vectors=vectors)
+
+    report = ReportWriter(tmp_path / "report.csv")
+    backlog = io.StringIO()
+    # Page size smaller than one user's documents, so users span pages
+    stats = await scan(index, report, backlog, page_size=7, concurrency=3)
+    report.close()
+
+    assert stats.vectors == len(vectors)
+    assert (stats.users, stats.complete, stats.backlog) == (31, 20, 11)
+    assert stats.legacy_charts == 1
+
+    with open(report.path, newline="", encoding="utf-8") as f:
+        rows = {row["user_id"]: row for row in csv.DictReader(f)}
+    assert rows["user03"]["missing"] == "chart_fields"
+    assert rows["user06"]["missing"] == "chart_fields,houses"
+    assert rows["user04"]["documents"] == "27"
+
+    queued = [json.loads(line) for line in backlog.getvalue().splitlines()]
+    assert {entry["userId"] for entry in queued} == {f"user{n:02d}" for n in range(0, 30, 3)} | {"old"}
@@ -0,0 +1,113 @@
+import asyncio
+
+from suno_job_tracker import SunoJobTracker, COMPLETED
+
+
+class FakeSuno:
+    def __init__(self, pending_polls: int):
+        self.pending_polls = pending_polls
+        self.requests = []
+        self.closed = False
+        self.on_close = None
+
+    async def get_generation_status(self, task_id):
+        self.requests.append(task_id)
+        if self.requests.count(task_id) <= self.pending_polls:
+            return {"code": 200, "data": {"taskId": task_id, "status": "PENDING"}}
+        clip = {"id": f"{task_id}-clip", "title": "Om", "audioUrl": f"https://cdn/{task_id}.mp3"}
+        return {"code": 200, "data": {"taskId": task_id, "status": "SUCCESS", "response": {"sunoData": [clip]}}}
+
+    async def close(self):
+        self.closed = True
+        if self.on_close:
+            await self.on_close()
+
+
+def make_tracker(client):
+    return SunoJobTracker(client=client, first_delay=0.01, max_delay=0.02, timeout=5)
+
+
+def test_shared_task_polled_once_per_round() -> None:
+    results = []
+
+    async def on_done(result):
+        results.append(result)
+
+    async def run():
+        client = FakeSuno(pending_polls=2)
+        tracker = make_tracker(client)
+        tracker.track("t1", "room-a", on_done, user_id="u1", title="Om")
+        tracker.track("t1", "room-b", on_done, user_id="u1", title="Om")
+        await tracker._task
+        await asyncio.sleep(0)
+        return client
+
+    client = asyncio.run(run())
+
+    assert client.requests == ["t1", "t1", "t1"]
+    assert [r["status"] for r in results] == [COMPLETED, COMPLETED]
+    assert results[0]["tracks"][0]["audioUrl"] == "https://cdn/t1.mp3"
+    assert client.closed
+
+
+def test_callback_arrival_stops_polling() -> None:
+    async def on_done(result):
+        raise AssertionError("callback path already delivered")
+
+    async def run():
+        client = FakeSuno(pending_polls=1000)
+        tracker = make_tracker(client)
+        tracker.track("t1", "room-a", on_done, user_id="u1", title="Om Shanti")
+        await asyncio.sleep(0.05)
+        assert tracker.resolve_from_callback("u1", ["om shanti"]) == 1
+        await asyncio.wait_for(tracker._task, 1)
+        return tracker
+
+    tracker = asyncio.run(run())
+
+    assert tracker.pending() == []
+    assert tracker.stats["resolved_by_callback"] == 1
+
+
+def test_release_drops_unwatched_tasks() -> None:
+    async def on_done(result):
+        pass
+
+    async def run():
+        tracker = make_tracker(FakeSuno(pending_polls=1000))
+        tracker.track("t1", "room-a", on_done)
+        tracker.track("t2", "room-b", on_done)
+        tracker.release("room-a")
+        pending = tracker.pending()
+        await tracker.close()
+        return pending
+
+    assert asyncio.run(run()) == ["t2"]
+
+
+def test_task_tracked_while_session_closes_is_polled() -> None:
+    results = []
+
+    async def on_done(result):
+        results.append(result)
+
+    async def run():
+        client = FakeSuno(pending_polls=0)
+        tracker = make_tracker(client)
+
+        async def track_during_close():
+            client.on_close = None
+            await asyncio.sleep(0)
+            tracker.track("b", "room-b", on_done)
+
+        tracker.track("a", "room-a", on_done)
+        client.on_close = track_during_close
+        tracker.release("room-a")
+        await asyncio.wait_for(tracker._task, 1)
+        await asyncio.sleep(0)
+        return tracker
+
+    tracker = asyncio.run(run())
+
+    assert tracker.pending() == []
+    assert [r["task_id"] for r in results] == ["b"]
@@ -0,0 +1,35 @@
+import asyncio
+from datetime import datetime
+
+from track_listener import TrackListener
+
+
+def test_completed_tracks_announced_once() -> None:
+    announced = []
+
+    async def on_completed(tracks):
+        announced.append([t["id"] for t in tracks])
+
+    async def run():
+        listener = TrackListener("u1", on_completed=on_completed)
+        # Initial snapshot: existing tracks are not announced
+        listener.apply_changes([
+            ("ADDED", "old", {"title": "Old", "status": "COMPLETED", "audioUrl": "a.mp3",
+                              "createdAt": datetime(2024, 1, 1)}),
+        ])
+        listener.apply_changes([
+            ("ADDED", "new1", {"title": "Om", "status": "COMPLETED", "audioUrl": "b.mp3", "createdAt": None}),
+            ("ADDED", "new2", {"title": "Om", "status": "COMPLETED", "audioUrl": "c.mp3", "createdAt": None}),
+        ])
+        # The "complete" callback rewrites the same documents
+        listener.apply_changes([
+            ("MODIFIED", "new1", {"title": "Om", "status": "COMPLETED", "audioUrl": "b.mp3",
+                                  "createdAt": datetime(2024, 6, 1)}),
+        ])
+        await asyncio.sleep(0)
+        return listener
+
+    listener = asyncio.run(run())
+
+    assert announced == [["new1", "new2"]]
+    assert [t["id"] for t in listener.tracks(2)] == ["new2", "new1"]
@@ -0,0 +1,59 @@
+import asyncio
+
+from refill_track_pool import plan_generations, refill
+from suno_job_tracker import SunoJobTracker
+from track_pool import TrackPool, match_style
+
+
+def test_match_style() -> None:
+    assert match_style("Peaceful meditation music with bansuri") == "bansuri_meditation"
+    assert match_style("बांसुरी ध्यान संगीत") == "bansuri_meditation"
+    assert match_style("Healing 432Hz crystal bowls") == "crystal_bowls_432"
+    assert match_style("Energetic tabla bhajan") == "tabla_bhajan"
+    assert match_style("Bansuri and sitar jugalbandi") is None
+
+
+def test_each_track_served_once(tmp_path) -> None:
+    pool = TrackPool(tmp_path / "pool.sqlite3")
+    pool.add("tabla_bhajan", [{"id": "a", "title": "A", "audioUrl": "a.mp3"},
+                              {"id": "b", "title": "B", "audioUrl": "b.mp3"}])
+    pool.add("tabla_bhajan", [{"id": "a", "title": "A", "audioUrl": "a.mp3"}])
+
+    served = [pool.take("tabla_bhajan"), pool.take("tabla_bhajan"), pool.take("tabla_bhajan")]
+
+    assert [t and t["id"] for t in served] == ["a", "b", None]
+    assert pool.stock_levels()["tabla_bhajan"] == 0
+
+
+def test_refill_plan_respects_budget() -> None:
+    levels = {"bansuri_meditation": 0, "crystal_bowls_432": 4, "tabla_bhajan": 6}
+    assert plan_generations(levels, target=6, budget=2) == ["bansuri_meditation", "bansuri_meditation"]
+    assert sorted(plan_generations(levels, target=6, budget=10)) == [
+        "bansuri_meditation", "bansuri_meditation", "bansuri_meditation", "crystal_bowls_432"]
+
+
+class FakeSuno:
+    def __init__(self):
+        self.generated = 0
+
+    async def generate_music(self, **kwargs):
+        self.generated += 1
+        return {"code": 200, "data": {"taskId": f"task{self.generated}"}}
+
+    async def get_generation_status(self, task_id):
+        clips = [{"id": f"{task_id}-{n}", "title": "Pool", "audioUrl": f"{task_id}-{n}.mp3"} for n in range(2)]
+        return {"code": 200, "data": {"status": "SUCCESS", "response": {"sunoData": clips}}}
+
+    async def close(self):
+        pass
+
+
+def test_refill_stocks_generated_tracks(tmp_path) -> None:
+    pool = TrackPool(tmp_path / "pool.sqlite3")
+    client = FakeSuno()
+    tracker = SunoJobTracker(client=client, first_delay=0.01, timeout=5)
+
+    stats = asyncio.run(refill(pool, client, tracker, target=2, budget=2))
+
+    assert stats == {"generations": 2, "stocked": 4, "failed": 0}
+    assert sorted(pool.stock_levels().values()) == [0, 2, 2]